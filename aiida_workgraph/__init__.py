@@ -1,8 +1,28 @@
-from .workgraph import WorkGraph
+import importlib
+
+# the submodule `task` is imported before the `task` decorator, which replaces it
+# as an attribute of the package
 from .task import Task
 from .decorator import task, build_task
 
-
 __version__ = "0.3.5"
 
 __all__ = ["WorkGraph", "Task", "task", "build_task"]
+
+# the workgraph is imported from its module on first access, so importing the
+# package does not load the engine and the widget
+_LAZY_IMPORTS = {
+    "WorkGraph": "aiida_workgraph.workgraph",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -17,10 +17,58 @@ from aiida.orm import (
     RemoteData,
     to_aiida_type,
 )
+from aiida_workgraph.orm.array import NumpyArrayData
 
 
 __all__ = ("PythonJob",)
 
+# the code of the script to load the arrays of the inputs from the `.npy` files of
+# the nodes, and to save the arrays of the results as `.npy` files, so the arrays are
+# not pickled; it follows the layout of `aiida_workgraph.orm.array.NumpyArrayData`
+ARRAY_SCRIPT = """
+import json
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def load_arrays(folder, kind, keys, size):
+    # the arrays are copied in memory only when they are modified
+    arrays = [
+        numpy.load(os.path.join(folder, f"array_{i}.npy"), mmap_mode="c")
+        for i in range(size)
+    ]
+    if kind == "array":
+        return arrays[0]
+    if kind == "dict":
+        return dict(zip(keys, arrays))
+    return arrays
+
+
+def save_arrays(value, folder):
+    if numpy is None:
+        return None
+    if isinstance(value, numpy.ndarray):
+        kind, keys, arrays = "array", None, [value]
+    elif isinstance(value, list) and value and all(isinstance(v, numpy.ndarray) for v in value):
+        kind, keys, arrays = "list", None, value
+    elif (
+        isinstance(value, dict)
+        and value
+        and all(isinstance(v, numpy.ndarray) for v in value.values())
+    ):
+        kind, keys, arrays = "dict", list(value.keys()), list(value.values())
+    else:
+        return None
+    os.makedirs(folder, exist_ok=True)
+    for i, array in enumerate(arrays):
+        numpy.save(os.path.join(folder, f"array_{i}.npy"), array, allow_pickle=False)
+    return {"folder": folder, "kind": kind, "keys": keys, "size": len(arrays)}
+"""
+
 
 class PythonJob(CalcJob):
     """Calcjob to run a Python function on a remote computer."""
@@ -31,6 +79,17 @@ class PythonJob(CalcJob):
 
     _DEFAULT_INPUT_FILE = "script.py"
     _DEFAULT_OUTPUT_FILE = "aiida.out"
+    # the arrays of the results, see `ARRAY_SCRIPT`
+    _RESULT_ARRAYS_FILE = "results_arrays.json"
+    _RESULT_ARRAYS_FOLDER = "results_arrays"
+    # the outputs which are not returned by the function
+    _builtin_outputs = [
+        "_wait",
+        "_outputs",
+        "remote_folder",
+        "remote_stash",
+        "retrieved",
+    ]
 
     _default_parser = "workgraph.python"
 
@@ -147,25 +206,76 @@ class PythonJob(CalcJob):
         dirpath = pathlib.Path(folder._abspath)
         inputs: dict[str, t.Any]
 
-        if self.inputs.function_kwargs:
+        if self.inputs.get("function_kwargs"):
             inputs = dict(self.inputs.function_kwargs)
         else:
             inputs = {}
+        # the arrays are copied from the repository of the nodes as `.npy` files
+        array_inputs = {
+            key: value
+            for key, value in inputs.items()
+            if isinstance(value, NumpyArrayData)
+        }
+        array_layouts = {
+            key: (
+                f"inputs_arrays/{key}",
+                value.base.attributes.get("kind"),
+                value.base.attributes.get("keys", None),
+                len(value.get_arraynames()),
+            )
+            for key, value in array_inputs.items()
+        }
+        output_name_list = (
+            self.inputs.output_name_list.get_list()
+            if "output_name_list" in self.inputs
+            else []
+        )
+        number_of_outputs = len(
+            [name for name in output_name_list if name not in self._builtin_outputs]
+        )
         # get the value of pickled function
         function_source_code = self.inputs.function_source_code.value
         # create python script to run the function
         script = f"""
 import pickle
-
+{ARRAY_SCRIPT}
 # define the function
 {function_source_code}
 
 # load the inputs from the pickle file
 with open('inputs.pickle', 'rb') as handle:
     inputs = pickle.load(handle)
+for key, layout in {array_layouts!r}.items():
+    inputs[key] = load_arrays(*layout)
 
 # run the function
 result = {self.inputs.function_name.value}(**inputs)
+# save the arrays of the result as .npy files, the same way as the parser splits the result
+arrays = []
+if isinstance(result, tuple):
+    result = list(result)
+    for i, value in enumerate(result):
+        layout = save_arrays(value, f"{self._RESULT_ARRAYS_FOLDER}/{{i}}")
+        if layout is not None:
+            arrays.append(dict(layout, path=[i]))
+            result[i] = None
+    result = tuple(result)
+elif isinstance(result, dict) and len(result) == {number_of_outputs}:
+    for i, (key, value) in enumerate(list(result.items())):
+        # the keys of the layouts are saved as json
+        if not isinstance(key, str):
+            continue
+        layout = save_arrays(value, f"{self._RESULT_ARRAYS_FOLDER}/{{i}}")
+        if layout is not None:
+            arrays.append(dict(layout, path=[key]))
+            result[key] = None
+else:
+    layout = save_arrays(result, "{self._RESULT_ARRAYS_FOLDER}/result")
+    if layout is not None:
+        arrays.append(dict(layout, path=[]))
+        result = None
+with open('{self._RESULT_ARRAYS_FILE}', 'w') as handle:
+    json.dump(arrays, handle)
 # save the result as a pickle file
 with open('results.pickle', 'wb') as handle:
     pickle.dump(result, handle)
@@ -209,7 +319,8 @@ with open('results.pickle', 'wb') as handle:
                 )
             elif isinstance(source, SinglefileData):
                 local_copy_list.append((source.uuid, source.filename, source.filename))
-        if self.inputs.upload_files:
+        # the empty namespaces are not set on a restarted job
+        if self.inputs.get("upload_files"):
             upload_files = self.inputs.upload_files
             for key, source in upload_files.items():
                 # replace "_dot_" with "." in the key
@@ -232,9 +343,17 @@ Only AiiDA SinglefileData and FolderData are allowed."""
                 key = key.replace("_dot_", ".")
                 dirpath = pathlib.Path(source.get_remote_path())
                 remote_list.append((source.computer.uuid, str(dirpath), key))
+        # the .npy files are copied one by one, so they are not nested in a folder
+        for key, value in array_inputs.items():
+            for name in value.get_arraynames():
+                local_copy_list.append(
+                    (value.uuid, f"{name}.npy", f"inputs_arrays/{key}/{name}.npy")
+                )
         # create pickle file for the inputs
         input_values = {}
         for key, value in inputs.items():
+            if key in array_inputs:
+                continue
             if isinstance(value, Data) and hasattr(value, "value"):
                 # get the value of the pickled data
                 input_values[key] = value.value
@@ -265,7 +384,12 @@ Only AiiDA SinglefileData and FolderData are allowed."""
         calcinfo.local_copy_list = local_copy_list
         calcinfo.remote_copy_list = remote_copy_list
         calcinfo.remote_symlink_list = remote_symlink_list
-        calcinfo.retrieve_list = ["results.pickle", self.options.output_filename]
+        calcinfo.retrieve_list = [
+            "results.pickle",
+            self.options.output_filename,
+            self._RESULT_ARRAYS_FILE,
+            self._RESULT_ARRAYS_FOLDER,
+        ]
         if self.inputs.additional_retrieve_list is not None:
             calcinfo.retrieve_list += self.inputs.additional_retrieve_list.get_list()
         calcinfo.retrieve_list += self._internal_retrieve_list
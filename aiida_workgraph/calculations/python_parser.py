@@ -1,6 +1,9 @@
 """Parser for an `PythonJob` job."""
+from typing import Any, Dict
 from aiida.parsers.parser import Parser
+from aiida_workgraph.calculations.python import PythonJob
 from aiida_workgraph.orm import serialize_to_aiida_nodes
+from aiida_workgraph.orm.array import NumpyArrayData
 
 
 class PythonParser(Parser):
@@ -13,19 +16,13 @@ class PythonParser(Parser):
         try:
             with self.retrieved.base.repository.open("results.pickle", "rb") as handle:
                 results = pickle.load(handle)
+                arrays = self.parse_arrays()
                 output_name_list = self.node.inputs.output_name_list.get_list()
                 # output_name_list exclude ['_wait', '_outputs', 'remote_folder', 'remote_stash', 'retrieved']
                 output_name_list = [
                     name
                     for name in output_name_list
-                    if name
-                    not in [
-                        "_wait",
-                        "_outputs",
-                        "remote_folder",
-                        "remote_stash",
-                        "retrieved",
-                    ]
+                    if name not in PythonJob._builtin_outputs
                 ]
                 outputs = {}
                 if isinstance(results, tuple):
@@ -34,17 +31,53 @@ class PythonParser(Parser):
                             "The number of results does not match the number of output_name_list."
                         )
                     for i in range(len(output_name_list)):
-                        outputs[output_name_list[i].name] = results[i]
-                        outputs = serialize_to_aiida_nodes(outputs)
+                        outputs[output_name_list[i]] = arrays.get((i,), results[i])
+                    outputs = serialize_to_aiida_nodes(outputs)
                 elif isinstance(results, dict) and len(results) == len(
                     output_name_list
                 ):
+                    results = {
+                        key: arrays.get((key,), value) for key, value in results.items()
+                    }
                     outputs = serialize_to_aiida_nodes(results)
                 else:
-                    outputs = serialize_to_aiida_nodes({"result": results})
+                    outputs = serialize_to_aiida_nodes(
+                        {"result": arrays.get((), results)}
+                    )
                 for key, value in outputs.items():
                     self.out(key, value)
         except OSError:
             return self.exit_codes.ERROR_READING_OUTPUT_FILE
         except ValueError:
             return self.exit_codes.ERROR_INVALID_OUTPUT
+
+    def parse_arrays(self) -> Dict[tuple, Any]:
+        """Create the nodes of the arrays that the script saved as `.npy` files.
+
+        The files are added to the nodes as they are, so the arrays are not loaded.
+
+        Returns:
+            dict: the nodes, keyed by the path of the array in the results.
+        """
+        import json
+        from contextlib import ExitStack
+
+        repository = self.retrieved.base.repository
+        if PythonJob._RESULT_ARRAYS_FILE not in repository.list_object_names():
+            return {}
+        layouts = json.loads(
+            repository.get_object_content(PythonJob._RESULT_ARRAYS_FILE)
+        )
+        nodes = {}
+        for layout in layouts:
+            node = NumpyArrayData()
+            with ExitStack() as stack:
+                handles = [
+                    stack.enter_context(
+                        repository.open(f"{layout['folder']}/array_{i}.npy", "rb")
+                    )
+                    for i in range(layout["size"])
+                ]
+                node.set_npy_files(layout["kind"], layout["keys"], handles)
+            nodes[tuple(layout["path"])] = node
+        return nodes
@@ -6,7 +6,6 @@ from aiida.cmdline.params import arguments, options, types
 from aiida.cmdline.utils import decorators, echo
 from aiida.common.log import LOG_LEVELS
 from aiida.manage import get_manager
-from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
 
 REPAIR_INSTRUCTIONS = """\
 If one ore more processes are unreachable, you can run the following commands to try and repair them:
@@ -22,6 +21,8 @@ def valid_projections():
 
     This indirection is necessary to prevent loading the imported module which slows down tab-completion.
     """
+    from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
+
     return WorkGraphQueryBuilder.valid_projections
 
 
@@ -30,6 +31,8 @@ def default_projections():
 
     This indirection is necessary to prevent loading the imported module which slows down tab-completion.
     """
+    from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
+
     return WorkGraphQueryBuilder.default_projections
 
 
@@ -83,6 +86,7 @@ def process_list(
     from aiida.cmdline.utils.common import print_last_process_state_change
     from aiida.engine.daemon.client import get_daemon_client
     from aiida.orm import ProcessNode, QueryBuilder
+    from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
 
     relationships = {}
 
@@ -4,7 +4,6 @@ import click
 from aiida_workgraph.cli.cmd_workgraph import workgraph
 from aiida.cmdline.params import arguments, options
 from aiida.cmdline.utils import decorators, echo
-from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
 
 REPAIR_INSTRUCTIONS = """\
 If one ore more processes are unreachable, you can run the following commands to try and repair them:
@@ -20,6 +19,8 @@ def default_projections():
 
     This indirection is necessary to prevent loading the imported module which slows down tab-completion.
     """
+    from aiida_workgraph.cli.query_workgraph import WorkGraphQueryBuilder
+
     return WorkGraphQueryBuilder.default_projections
 
 
@@ -1,4 +1,5 @@
 """The main `workgraph` click group."""
+import importlib
 import click
 
 from aiida_workgraph import __version__
@@ -7,9 +8,37 @@ from aiida.cmdline.groups import VerdiCommandGroup
 from aiida.cmdline.params import options, types
 
 
+class LazyVerdiCommandGroup(VerdiCommandGroup):
+    """A command group which imports the modules of its sub commands when they are used.
+
+    Args:
+        lazy_subcommands (dict): the modules that define the sub commands, keyed by
+            the name of the sub command. The module registers the sub command with the
+            group when it is imported.
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            importlib.import_module(self.lazy_subcommands[cmd_name])
+        return super().get_command(ctx, cmd_name)
+
+
 # Pass the version explicitly to ``version_option`` otherwise editable installs can show the wrong version number
 @click.group(
-    cls=VerdiCommandGroup, context_settings={"help_option_names": ["--help", "-h"]}
+    cls=LazyVerdiCommandGroup,
+    context_settings={"help_option_names": ["--help", "-h"]},
+    lazy_subcommands={
+        "graph": "aiida_workgraph.cli.cmd_graph",
+        "task": "aiida_workgraph.cli.cmd_task",
+        "web": "aiida_workgraph.cli.cmd_web",
+    },
 )
 @options.PROFILE(type=types.ProfileParamType(load_profile=True), expose_value=False)
 @options.VERBOSITY()
@@ -1,20 +1,63 @@
 from node_graph.collection import (
     NodeCollection,
+    LinkCollection,
     PropertyCollection,
     InputSocketCollection,
     OutputSocketCollection,
 )
-from typing import Any, Callable, Optional, Union
+from node_graph.link import NodeLink
+from typing import Any, Callable, Dict, List, Optional, Union
 
 
-class TaskCollection(NodeCollection):
+class _ItemMap:
+    """Keep the items of a collection in a dict keyed by their id, in the order they
+    were added, so an item is removed without a pass over the other items.
+
+    The `_items` list used by the methods of node_graph is built from the dict, so the
+    items must be added and removed through the dict.
+    """
+
+    @property
+    def _items(self) -> List[Any]:
+        return list(self._item_map.values())
+
+    @_items.setter
+    def _items(self, items: List[Any]) -> None:
+        self._item_map = {id(item): item for item in items}
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._item_map)
+
+
+class TaskCollection(_ItemMap, NodeCollection):
+    """Collection of the tasks of a workgraph, indexed by name."""
+
+    def __init__(
+        self,
+        parent: Any = None,
+        pool: Any = None,
+        entry_point: str = "node_graph.node",
+        post_creation_hooks: Optional[List[Callable]] = None,
+    ) -> None:
+        super().__init__(
+            parent,
+            pool=pool,
+            entry_point=entry_point,
+            post_creation_hooks=post_creation_hooks,
+        )
+        self._index = {}
+        self._max_inner_id = 0
+
     def new(
         self,
         identifier: Union[Callable, str],
         name: Optional[str] = None,
         uuid: Optional[str] = None,
         run_remotely: Optional[bool] = False,
-        **kwargs: Any
+        **kwargs: Any,
     ) -> Any:
         from aiida_workgraph.decorator import (
             build_task_from_callable,
@@ -32,21 +75,340 @@ class TaskCollection(NodeCollection):
                     )
                 # this is a PythonJob
                 identifier, _ = build_pythonjob_task(identifier)
-            return super().new(identifier, name, uuid, **kwargs)
+            return self._new(identifier, name, uuid, **kwargs)
         if isinstance(identifier, str) and identifier.upper() == "PythonJob":
             identifier, _ = build_pythonjob_task(kwargs.pop("function"))
-            return super().new(identifier, name, uuid, **kwargs)
+            return self._new(identifier, name, uuid, **kwargs)
         if isinstance(identifier, str) and identifier.upper() == "SHELLJOB":
             identifier, _, links = build_shelljob_task(
                 nodes=kwargs.get("nodes", {}),
                 outputs=kwargs.get("outputs", None),
                 parser_outputs=kwargs.pop("parser_outputs", None),
             )
-            task = super().new(identifier, name, uuid, **kwargs)
+            task = self._new(identifier, name, uuid, **kwargs)
             # make links between the tasks
             task.set(links)
             return task
-        return super().new(identifier, name, uuid, **kwargs)
+        return self._new(identifier, name, uuid, **kwargs)
+
+    def _new(
+        self,
+        identifier: Any,
+        name: Optional[str] = None,
+        uuid: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Create a task, like `NodeCollection.new`, but check the name with the index."""
+        from node_graph.node import Node
+
+        if isinstance(identifier, str):
+            if identifier not in self.pool:
+                # raise the error with the suggestions of node_graph
+                return super().new(identifier, name, uuid, **kwargs)
+            ItemClass = self.pool[identifier]
+        elif isinstance(identifier, type) and issubclass(identifier, Node):
+            ItemClass = identifier
+        elif isinstance(getattr(identifier, "node", None), type) and issubclass(
+            identifier.node, Node
+        ):
+            ItemClass = identifier.node
+        else:
+            raise Exception(f"Identifier {identifier} is not a node or node name.")
+        if name is not None and name in self._index:
+            raise Exception(f"{name} already exist, please choose another name.")
+        item = ItemClass(
+            inner_id=self.get_inner_id(), name=name, uuid=uuid, parent=self.parent
+        )
+        self.append(item)
+        item.set(kwargs)
+        # Execute post creation hooks
+        self.execute_post_creation_hooks(item)
+        return item
+
+    def _reindex(self) -> None:
+        self._index = {item.name: item for item in self._items}
+        self._max_inner_id = max([0] + [item.inner_id for item in self._items])
+
+    def get_inner_id(self) -> int:
+        return self._max_inner_id + 1
+
+    def append(self, item: Any) -> None:
+        if item.name in self._index:
+            self._reindex()
+            if item.name in self._index:
+                raise Exception(
+                    f"{item.name} already exist, please choose another name."
+                )
+        item.inner_id = self.get_inner_id()
+        setattr(item, "parent", self.parent)
+        self._item_map[id(item)] = item
+        self._index[item.name] = item
+        self._max_inner_id = item.inner_id
+
+    def get(self, name: str) -> Any:
+        item = self._index.get(name)
+        if item is None or item.name != name:
+            # e.g. a task was renamed
+            self._reindex()
+            item = self._index.get(name)
+            if item is None:
+                return super().get(name)
+        return item
+
+    def delete(self, name: str) -> None:
+        item = self._index.get(name)
+        if item is None or item.name != name:
+            self._reindex()
+            item = self._index.get(name)
+            if item is None:
+                return
+        self._remove(item)
+        self.execute_post_deletion_hooks(item)
+
+    def __delitem__(self, index: int) -> None:
+        self._remove(self._items[index])
+
+    def _remove(self, item: Any) -> None:
+        del self._item_map[id(item)]
+        # the index of a renamed task is rebuilt on first use
+        if self._index.get(item.name) is item:
+            del self._index[item.name]
+
+    def clear(self) -> None:
+        super().clear()
+        self._reindex()
+
+    def copy(self, parent: Any = None) -> "TaskCollection":
+        coll = super().copy(parent=parent)
+        coll._reindex()
+        return coll
+
+    def apply(
+        self,
+        name: str,
+        func: Callable[[Any], None],
+        key: Optional[str] = None,
+        **summary: Any,
+    ) -> None:
+        """Apply a function to a task.
+
+        Args:
+            name (str): the name of the task.
+            func (callable): the function, called with the task.
+            key (str, optional): the kind of the change, used by `LazyTaskCollection`.
+            summary: the state and pk of the task after the change, used by `LazyTaskCollection`.
+        """
+        func(self[name])
+
+    def summary(self, name: str) -> Dict[str, Any]:
+        """The name, pk and state of a task."""
+        task = self[name]
+        return {"name": name, "pk": task.pk, "state": task.state}
+
+
+class LazyTaskCollection(TaskCollection):
+    """A collection of tasks which are built from their stored data on first access.
+
+    The names of the tasks are known from the start, and a task is built by the `loader`
+    when it is accessed by name, by index or by iteration. The changes applied to a task
+    which is not built yet are kept, and applied when it is built.
+    """
+
+    def __init__(
+        self,
+        parent: Any = None,
+        pool: Any = None,
+        names: Optional[List[str]] = None,
+        loader: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        """
+        Args:
+            names (list): the names of the tasks which are not built yet.
+            loader (callable): a function which builds a task of this collection from its name.
+        """
+        super().__init__(parent, pool=pool)
+        self._names = list(names or [])
+        self._lazy = set(self._names)
+        self._loader = loader
+        self._pending = {}
+        self._summaries = {}
+
+    def is_loaded(self, name: str) -> bool:
+        """Check if a task is built."""
+        return name not in self._lazy
+
+    def get(self, name: str) -> Any:
+        if name in self._lazy:
+            self._lazy.discard(name)
+            self._loader(name)
+            task = super().get(name)
+            for func in self._pending.pop(name, {}).values():
+                func(task)
+            self._summaries.pop(name, None)
+            return task
+        return super().get(name)
+
+    def keys(self) -> List[str]:
+        loaded = super().keys()
+        names = set(self._names)
+        return [
+            name for name in self._names if name in self._lazy or name in loaded
+        ] + [name for name in loaded if name not in names]
+
+    def __getitem__(self, index: Union[int, str]) -> Any:
+        if isinstance(index, int):
+            return self.get(self.keys()[index])
+        return self.get(index)
+
+    def __iter__(self):
+        for name in self.keys():
+            yield self.get(name)
+
+    def __len__(self) -> int:
+        return len(self._lazy) + super().__len__()
+
+    def delete(self, name: str) -> None:
+        if name in self._lazy:
+            self._lazy.discard(name)
+            self._pending.pop(name, None)
+            self._summaries.pop(name, None)
+            return
+        super().delete(name)
+
+    def apply(
+        self,
+        name: str,
+        func: Callable[[Any], None],
+        key: Optional[str] = None,
+        **summary: Any,
+    ) -> None:
+        if name in self._lazy:
+            # only the last change of each kind is kept
+            self._pending.setdefault(name, {})[key or id(func)] = func
+            self._summaries.setdefault(name, {}).update(summary)
+        else:
+            func(self.get(name))
+
+    def summary(self, name: str) -> Dict[str, Any]:
+        if name in self._lazy:
+            return {
+                "name": name,
+                "pk": None,
+                "state": "PLANNED",
+                **self._summaries.get(name, {}),
+            }
+        return super().summary(name)
+
+    def copy(self, parent: Any = None) -> TaskCollection:
+        # build all the tasks
+        list(self)
+        coll = TaskCollection(parent=parent, pool=self.pool)
+        coll._items = [item.copy(parent=parent) for item in self._items]
+        coll._reindex()
+        return coll
+
+
+class WorkGraphLink(NodeLink):
+    """Link between two sockets of the tasks of a workgraph.
+
+    The items of a `Stream` socket can have any type, so a stream can link to a socket
+    of any type.
+    """
+
+    def check_socket_match(self) -> None:
+        if self.from_socket.identifier.upper() == "STREAM":
+            return
+        super().check_socket_match()
+
+
+class WorkGraphLinkCollection(_ItemMap, LinkCollection):
+    """Collection of the links of a workgraph, indexed by the uuids of their tasks.
+
+    The tasks are indexed by uuid, so the index stays valid when a task is renamed.
+    While the workgraph is built in a batch, the index is rebuilt on first use.
+    """
+
+    def __init__(self, parent: Any) -> None:
+        super().__init__(parent)
+        self._names = set()
+        self._task_links = {}
+        self._max_inner_id = 0
+
+    def _reindex(self) -> None:
+        self._names = {item.name for item in self._items}
+        self._task_links = {}
+        for item in self._items:
+            for uuid in {item.from_node.uuid, item.to_node.uuid}:
+                self._task_links.setdefault(uuid, []).append(item)
+        self._max_inner_id = max([0] + [item.inner_id for item in self._items])
+
+    def get_inner_id(self) -> int:
+        return self._max_inner_id + 1
+
+    def new(self, input: Any, output: Any, type: int = 1) -> WorkGraphLink:
+        # only a normal task runs in the engine, where its generator is consumed
+        if (
+            input.identifier.upper() == "STREAM"
+            and input.node.node_type.upper() != "NORMAL"
+        ):
+            raise ValueError(
+                f"Task {input.node.name} can not stream its output {input.name}: "
+                f"only a normal task can produce a stream, not a "
+                f"{input.node.node_type} task."
+            )
+        item = WorkGraphLink(input, output)
+        self.append(item)
+        self.execute_post_creation_hooks(item)
+        return item
+
+    def append(self, item: Any) -> None:
+        if item.name in self._names:
+            raise Exception(f"{item.name} already exist, please choose another name.")
+        item.inner_id = self.get_inner_id()
+        setattr(item, "parent", self.parent)
+        self._item_map[id(item)] = item
+        self._names.add(item.name)
+        if getattr(self.parent, "_batch_depth", 0):
+            self._task_links = None
+        elif self._task_links is not None:
+            for uuid in {item.from_node.uuid, item.to_node.uuid}:
+                self._task_links.setdefault(uuid, []).append(item)
+        self._max_inner_id = item.inner_id
+
+    def get_task_links(self, task: Any) -> List[Any]:
+        """Get the links from and to a task."""
+        if self._task_links is None:
+            self._reindex()
+        return list(self._task_links.get(task.uuid, []))
+
+    def remove(self, links: List[Any]) -> None:
+        """Remove links from this collection, without a pass over the other links."""
+        for link in links:
+            if self._item_map.pop(id(link), None) is None:
+                continue
+            link.unmount()
+            self._names.discard(link.name)
+            if self._task_links is not None:
+                for uuid in {link.from_node.uuid, link.to_node.uuid}:
+                    task_links = self._task_links.get(uuid, [])
+                    if link in task_links:
+                        task_links.remove(link)
+            self.execute_post_deletion_hooks(link)
+
+    def __delitem__(self, index: Union[int, List[int]]) -> None:
+        if isinstance(index, (list, tuple)):
+            self.remove([self._items[i] for i in index])
+        else:
+            self.remove([self._items[index]])
+
+    def clear(self) -> None:
+        super().clear()
+        self._reindex()
+
+    def copy(self, parent: Any = None) -> "WorkGraphLinkCollection":
+        coll = super().copy(parent=parent)
+        coll._reindex()
+        return coll
 
 
 class WorkGraphPropertyCollection(PropertyCollection):
@@ -54,7 +416,7 @@ class WorkGraphPropertyCollection(PropertyCollection):
         self,
         identifier: Union[Callable, str],
         name: Optional[str] = None,
-        **kwargs: Any
+        **kwargs: Any,
     ) -> Any:
         from aiida_workgraph.property import build_property_from_AiiDA
 
@@ -70,7 +432,7 @@ class WorkGraphInputSocketCollection(InputSocketCollection):
         self,
         identifier: Union[Callable, str],
         name: Optional[str] = None,
-        **kwargs: Any
+        **kwargs: Any,
     ) -> Any:
         from aiida_workgraph.socket import build_socket_from_AiiDA
 
@@ -86,7 +448,7 @@ class WorkGraphOutputSocketCollection(OutputSocketCollection):
         self,
         identifier: Union[Callable, str],
         name: Optional[str] = None,
-        **kwargs: Any
+        **kwargs: Any,
     ) -> Any:
         from aiida_workgraph.socket import build_socket_from_AiiDA
 
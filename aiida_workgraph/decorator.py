@@ -1,20 +1,28 @@
-from typing import Any, Callable, Dict, List, Optional, Union, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Union, Tuple, TYPE_CHECKING
+import sys
 from aiida_workgraph.utils import get_executor, serialize_function
-from aiida.engine import calcfunction, workfunction, CalcJob, WorkChain
 from aiida import orm
 from aiida.orm.nodes.process.calculation.calcfunction import CalcFunctionNode
 from aiida.orm.nodes.process.workflow.workfunction import WorkFunctionNode
-from aiida.engine.processes.ports import PortNamespace
 import cloudpickle as pickle
 from aiida_workgraph.task import Task
 
+if TYPE_CHECKING:
+    # `aiida.engine` is slow to import, it is only imported when it is used
+    from aiida.engine.processes.ports import PortNamespace
+
 task_types = {
     CalcFunctionNode: "CALCFUNCTION",
     WorkFunctionNode: "WORKFUNCTION",
-    CalcJob: "CALCJOB",
-    WorkChain: "WORKCHAIN",
+    orm.CalcJobNode: "CALCJOB",
+    orm.WorkChainNode: "WORKCHAIN",
 }
 
+# the tasks built from AiiDA components, see `build_task_from_AiiDA`
+_AIIDA_TASK_CACHE: "OrderedDict[tuple, Tuple[Task, Dict[str, Any]]]" = OrderedDict()
+_AIIDA_TASK_CACHE_SIZE = 128
+
 aiida_socket_maping = {
     orm.Int: "AiiDAInt",
     orm.Float: "AiiDAFloat",
@@ -24,28 +32,47 @@ aiida_socket_maping = {
 
 
 def create_task(tdata):
-    """Wrap create_node from node_graph to create a Task."""
+    """Wrap create_node from node_graph to create a Task.
+
+    If the tdata holds a `function` instead of an executor, the function is only
+    serialized when the executor is needed, e.g. when the task is saved."""
     from node_graph.decorator import create_node
 
     tdata["node_type"] = tdata.pop("task_type")
-    return create_node(tdata)
+    task = create_node(tdata)
+    if "function" in tdata:
+
+        def get_executor(self):
+            if "function" in tdata:
+                tdata["executor"] = serialize_function(tdata.pop("function"))
+            return tdata["executor"]
+
+        task.get_executor = get_executor
+    return task
 
 
 def add_input_recursive(
     inputs: List[List[Union[str, Dict[str, Any]]]],
-    port: PortNamespace,
+    port: "PortNamespace",
     args: List,
     kwargs: List,
     prefix: Optional[str] = None,
     required: bool = True,
+    input_names: Optional[set] = None,
 ) -> List[List[Union[str, Dict[str, Any]]]]:
-    """Add input recursively."""
+    """Add input recursively.
+
+    `input_names` is the set of the names in `inputs`, it is updated with the new inputs.
+    """
+    from aiida.engine.processes.ports import PortNamespace
+
     if prefix is None:
         port_name = port.name
     else:
         port_name = f"{prefix}.{port.name}"
     required = port.required and required
-    input_names = [input["name"] for input in inputs]
+    if input_names is None:
+        input_names = {input["name"] for input in inputs}
     if isinstance(port, PortNamespace):
         # TODO the default value is {} could cause problem, because the address of the dict is the same,
         # so if you change the value of one port, the value of all the ports of other tasks will be changed
@@ -58,13 +85,20 @@ def add_input_recursive(
                     "property": {"identifier": "General", "default": {}},
                 }
             )
+            input_names.add(port_name)
         if required:
             args.append(port_name)
         else:
             kwargs.append(port_name)
         for value in port.values():
             add_input_recursive(
-                inputs, value, args, kwargs, prefix=port_name, required=required
+                inputs,
+                value,
+                args,
+                kwargs,
+                prefix=port_name,
+                required=required,
+                input_names=input_names,
             )
     else:
         if port_name not in input_names:
@@ -77,6 +111,7 @@ def add_input_recursive(
             else:
                 socket_type = aiida_socket_maping.get(port.valid_type, "General")
             inputs.append({"identifier": socket_type, "name": port_name})
+            input_names.add(port_name)
         if required:
             args.append(port_name)
         else:
@@ -86,28 +121,39 @@ def add_input_recursive(
 
 def add_output_recursive(
     outputs: List[List[Union[str, Dict[str, Any]]]],
-    port: PortNamespace,
+    port: "PortNamespace",
     prefix: Optional[str] = None,
     required: bool = True,
+    output_names: Optional[set] = None,
 ) -> List[List[Union[str, Dict[str, Any]]]]:
-    """Add output recursively."""
+    """Add output recursively.
+
+    `output_names` is the set of the names in `outputs`, it is updated with the new outputs.
+    """
+    from aiida.engine.processes.ports import PortNamespace
+
     if prefix is None:
         port_name = port.name
     else:
         port_name = f"{prefix}.{port.name}"
     required = port.required and required
-    output_names = [output["name"] for output in outputs]
+    if output_names is None:
+        output_names = {output["name"] for output in outputs}
+    if port_name not in output_names:
+        outputs.append({"identifier": "General", "name": port_name})
+        output_names.add(port_name)
     if isinstance(port, PortNamespace):
         # TODO the default value is {} could cause problem, because the address of the dict is the same,
         # so if you change the value of one port, the value of all the ports of other tasks will be changed
         # consider to use None as default value
-        if port_name not in output_names:
-            outputs.append({"identifier": "General", "name": port_name})
         for value in port.values():
-            add_output_recursive(outputs, value, prefix=port_name, required=required)
-    else:
-        if port_name not in output_names:
-            outputs.append({"identifier": "General", "name": port_name})
+            add_output_recursive(
+                outputs,
+                value,
+                prefix=port_name,
+                required=required,
+                output_names=output_names,
+            )
     return outputs
 
 
@@ -143,6 +189,7 @@ def build_task_from_callable(
     If it is a class, it only supports CalcJob and WorkChain.
     """
     import inspect
+    from aiida.engine import CalcJob, WorkChain
     from aiida_workgraph.task import Task
 
     # if it is already a task, return it
@@ -160,7 +207,7 @@ def build_task_from_callable(
         if getattr(executor, "node_class", False):
             tdata["task_type"] = task_types.get(executor.node_class, "NORMAL")
             tdata["executor"] = executor
-            return build_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
+            return _get_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
         else:
             tdata["task_type"] = "NORMAL"
             tdata["executor"] = executor
@@ -169,11 +216,11 @@ def build_task_from_callable(
         if issubclass(executor, CalcJob):
             tdata["task_type"] = "CALCJOB"
             tdata["executor"] = executor
-            return build_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
+            return _get_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
         elif issubclass(executor, WorkChain):
             tdata["task_type"] = "WORKCHAIN"
             tdata["executor"] = executor
-            return build_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
+            return _get_task_from_AiiDA(tdata, inputs=inputs, outputs=outputs)[0]
     raise ValueError("The executor is not supported.")
 
 
@@ -188,13 +235,59 @@ def build_task_from_function(
     ).task
 
 
+def _get_plugin_version(executor: Any) -> Optional[str]:
+    """Get the version of the package which provides the executor."""
+    package = getattr(executor, "__module__", "").split(".")[0]
+    return getattr(sys.modules.get(package), "__version__", None)
+
+
 def build_task_from_AiiDA(
     tdata: Dict[str, Any],
     inputs: Optional[List[str]] = None,
     outputs: Optional[List[str]] = None,
 ) -> Task:
     """Register a task from a AiiDA component.
-    For example: CalcJob, WorkChain, CalcFunction, WorkFunction."""
+    For example: CalcJob, WorkChain, CalcFunction, WorkFunction.
+
+    The task is built once for each executor and plugin version, and taken from the
+    cache afterwards. The returned tdata is a copy, which can be modified."""
+    from aiida_workgraph.utils import copy_containers
+
+    task, tdata = _get_task_from_AiiDA(tdata, inputs, outputs)
+    return task, copy_containers(tdata)
+
+
+def _get_task_from_AiiDA(
+    tdata: Dict[str, Any],
+    inputs: Optional[List[str]] = None,
+    outputs: Optional[List[str]] = None,
+) -> Tuple[Task, Dict[str, Any]]:
+    """Get the task and the tdata of an AiiDA component from the cache, the tdata must not be modified."""
+    from aiida_workgraph.utils import copy_containers
+
+    key = (
+        tdata["executor"],
+        _get_plugin_version(tdata["executor"]),
+        repr({k: v for k, v in tdata.items() if k != "executor"}),
+        repr(inputs),
+        repr(outputs),
+    )
+    if key in _AIIDA_TASK_CACHE:
+        _AIIDA_TASK_CACHE.move_to_end(key)
+    else:
+        _AIIDA_TASK_CACHE[key] = _build_task_from_AiiDA(
+            dict(tdata), copy_containers(inputs), copy_containers(outputs)
+        )
+        if len(_AIIDA_TASK_CACHE) > _AIIDA_TASK_CACHE_SIZE:
+            _AIIDA_TASK_CACHE.popitem(last=False)
+    return _AIIDA_TASK_CACHE[key]
+
+
+def _build_task_from_AiiDA(
+    tdata: Dict[str, Any],
+    inputs: Optional[List[str]] = None,
+    outputs: Optional[List[str]] = None,
+) -> Task:
     from aiida_workgraph.task import Task
 
     # print(executor)
@@ -204,10 +297,21 @@ def build_task_from_AiiDA(
     spec = executor.spec()
     args = []
     kwargs = []
+    input_names = {input["name"] for input in inputs}
+    output_names = {output["name"] for output in outputs}
     for _key, port in spec.inputs.ports.items():
-        add_input_recursive(inputs, port, args, kwargs, required=port.required)
+        add_input_recursive(
+            inputs,
+            port,
+            args,
+            kwargs,
+            required=port.required,
+            input_names=input_names,
+        )
     for _key, port in spec.outputs.ports.items():
-        add_output_recursive(outputs, port, required=port.required)
+        add_output_recursive(
+            outputs, port, required=port.required, output_names=output_names
+        )
     if spec.inputs.dynamic:
         if hasattr(executor.process_class, "_varargs"):
             name = executor.process_class._varargs
@@ -359,10 +463,29 @@ def build_shelljob_task(
 
 def build_task_from_workgraph(wg: any) -> Task:
     """Build task from workgraph."""
+    return _build_task_from_workgraph(wg, "workgraph")
+
+
+def build_sweep_task(wg: any) -> Task:
+    """Build a task, which runs a template workgraph for each row of a parameter table.
+
+    The table is set to the `_parameters` input, and the other inputs are shared by
+    all the instances of the template.
+    """
+    return _build_task_from_workgraph(
+        wg,
+        "sweep",
+        [{"identifier": "General", "name": "_parameters"}],
+    )
+
+
+def _build_task_from_workgraph(
+    wg: any, task_type: str, extra_inputs: Optional[List[Dict[str, Any]]] = None
+) -> Task:
     from aiida_workgraph.task import Task
 
-    tdata = {"task_type": "workgraph"}
-    inputs = []
+    tdata = {"task_type": task_type}
+    inputs = list(extra_inputs or [])
     outputs = []
     group_outputs = []
     # add all the inputs/outputs from the tasks in the workgraph
@@ -444,7 +567,9 @@ def generate_tdata(
         "properties": properties,
         "inputs": _inputs,
         "outputs": task_outputs,
-        "executor": serialize_function(func),
+        # serialized on first use, see `create_task`
+        "executor": None,
+        "function": func,
         "catalog": catalog,
     }
     if additional_data:
@@ -557,6 +682,8 @@ class TaskDecoratorCollection:
 
     @staticmethod
     def calcfunction(**kwargs: Any) -> Callable:
+        from aiida.engine import calcfunction
+
         def decorator(func):
             # First, apply the calcfunction decorator
             func_decorated = calcfunction(func)
@@ -575,6 +702,8 @@ class TaskDecoratorCollection:
 
     @staticmethod
     def workfunction(**kwargs: Any) -> Callable:
+        from aiida.engine import workfunction
+
         def decorator(func):
             # First, apply the workfunction decorator
             func_decorated = workfunction(func)
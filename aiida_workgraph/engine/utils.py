@@ -1,6 +1,81 @@
 from aiida_workgraph.orm.serializer import serialize_to_aiida_nodes
 from aiida import orm
 from aiida.common.extendeddicts import AttributeDict
+from typing import Any, Callable, Optional
+import concurrent.futures
+import contextlib
+import ctypes
+import threading
+
+
+def interrupt_thread(thread_id: int) -> None:
+    """Raise a `concurrent.futures.TimeoutError` in a thread.
+
+    The exception is raised when the thread runs python code again, so a blocking
+    call, e.g. `time.sleep`, is only interrupted when it returns.
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(concurrent.futures.TimeoutError)
+    )
+
+
+@contextlib.contextmanager
+def interrupt_after(timeout: Optional[float]):
+    """Interrupt the current thread if the block does not finish in `timeout` seconds,
+    see `interrupt_thread`."""
+    if timeout is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    lock = threading.Lock()
+    state = {"finished": False}
+
+    def interrupt():
+        with lock:
+            if not state["finished"]:
+                interrupt_thread(thread_id)
+
+    timer = threading.Timer(timeout, interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        with lock:
+            state["finished"] = True
+            timer.cancel()
+            # clear the exception, if the block finished just after the timeout
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+
+def run_with_timeout(func: Callable, timeout: float, *args, **kwargs) -> Any:
+    """Run a function in a daemon thread, which is interrupted if it does not finish
+    in `timeout` seconds.
+
+    Raises:
+        concurrent.futures.TimeoutError: if the function does not finish in time.
+    """
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func(*args, **kwargs)
+        except concurrent.futures.TimeoutError:
+            # interrupted after the timeout
+            pass
+        except BaseException as e:
+            result["error"] = e
+
+    # a daemon thread does not keep the interpreter alive, unlike a thread pool
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        interrupt_thread(thread.ident)
+        raise concurrent.futures.TimeoutError()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
 
 
 def prepare_for_workgraph_task(task: dict, kwargs: dict) -> tuple:
@@ -24,6 +99,94 @@ def prepare_for_workgraph_task(task: dict, kwargs: dict) -> tuple:
     return inputs, wgdata
 
 
+def prepare_for_sweep_instance(
+    task: dict, kwargs: dict, table: dict, index: int
+) -> tuple:
+    """Prepare the inputs for an instance of a sweep task.
+
+    The instance is a copy of the template workgraph, with the shared inputs and the
+    row `index` of the parameter table. The instance is named `<task>__<index>`, like
+    the speculative duplicate of a task.
+    """
+    import numpy as np
+    from aiida_workgraph.utils import copy_containers, update_nested_dict
+
+    # the AiiDA nodes are shared by the instances, not copied
+    instance = {
+        **task,
+        "name": f"{task['name']}__{index}",
+        "executor": {
+            **task["executor"],
+            "wgdata": copy_containers(task["executor"]["wgdata"]),
+        },
+    }
+    kwargs = copy_containers(kwargs)
+    for name, values in table.items():
+        value = values[index]
+        # the numpy scalars are converted to python types
+        if isinstance(value, np.generic):
+            value = value.item()
+        update_nested_dict(kwargs, name, value)
+    return prepare_for_workgraph_task(instance, kwargs)
+
+
+def find_placement(kwargs: dict, computers: list = None) -> tuple:
+    """Find the computer to run a task on, based on the locality of its data.
+
+    The computer holding most of the `RemoteData` inputs of the task is chosen, so
+    that the remote data does not need to be copied between computers. If `computers`
+    is given, only these computers are used, and the first one is the fallback.
+
+    Returns:
+        tuple: the label of the computer (None if no placement is found) and the reason.
+    """
+    counts = {}
+
+    def count_remote_data(value):
+        if isinstance(value, orm.RemoteData):
+            label = value.computer.label
+            counts[label] = counts.get(label, 0) + 1
+        elif isinstance(value, dict):
+            for sub_value in value.values():
+                count_remote_data(sub_value)
+        elif isinstance(value, (list, tuple)):
+            for sub_value in value:
+                count_remote_data(sub_value)
+
+    count_remote_data(kwargs)
+    candidates = [label for label in counts if not computers or label in computers]
+    if candidates:
+        return max(candidates, key=lambda label: counts[label]), "remote_data"
+    if computers:
+        return computers[0], "computers"
+    return None, "default"
+
+
+def get_shell_job_computer(kwargs: dict) -> Optional[str]:
+    """Get the label of the computer of a ShellJob, from its code or its options."""
+    options = (kwargs.get("metadata") or {}).get("options", {})
+    if isinstance(kwargs.get("command"), orm.AbstractCode):
+        return kwargs["command"].computer.label
+    if isinstance(options.get("computer"), orm.Computer):
+        return options["computer"].label
+    return options.get("computer")
+
+
+def set_shell_job_computer(kwargs: dict, computer: Optional[str]) -> None:
+    """Set the computer chosen by the placement in the options of a ShellJob.
+
+    Only a command string is resolved to a code on the computer of the options, the
+    computer of a code is fixed, and the options of the ShellJob do not accept it.
+    """
+    if not computer or not isinstance(kwargs.get("command"), str):
+        return
+    metadata = kwargs.get("metadata") or {}
+    options = metadata.setdefault("options", {})
+    if computer != get_shell_job_computer(kwargs):
+        options["computer"] = orm.load_computer(computer)
+    kwargs["metadata"] = metadata
+
+
 def prepare_for_python_task(task: dict, kwargs: dict, var_kwargs: dict) -> dict:
     """Prepare the inputs for PythonJob"""
     from aiida_workgraph.utils import get_or_create_code
@@ -140,3 +303,100 @@ def prepare_for_shell_task(task: dict, kwargs: dict) -> dict:
         "metadata": metadata or {},
     }
     return inputs
+
+
+def prepare_for_partition(
+    wgdata: dict, key: str, names: list, max_number_jobs: Optional[int] = None
+) -> tuple:
+    """Prepare the inputs for a partition of the workgraph.
+
+    The partition is a standalone workgraph with a subset of the tasks. The links
+    from the tasks upstream of the partition are resolved at the boundary: the
+    results of these tasks, which are finished, are set as the values of the
+    inputs. The group outputs of the tasks are exposed as `task.socket`, with the
+    outputs of the plain python tasks used downstream of the partition, so that the
+    parent workgraph can read the results back.
+    """
+    import copy
+    import uuid
+    import cloudpickle as pickle
+    from aiida_workgraph.utils import get_nested_dict
+
+    names = set(names)
+    tasks = wgdata["tasks"]
+    subdata = {
+        k: copy.deepcopy(v)
+        for k, v in wgdata.items()
+        if k
+        not in [
+            "tasks",
+            "links",
+            "ctrl_links",
+            "connectivity",
+            "error_handlers",
+            "nodes",
+        ]
+    }
+    subdata["name"] = f"{wgdata['name']}_{key}"
+    subdata["uuid"] = str(uuid.uuid1())
+    subdata["partition_threshold"] = None
+    subdata["max_number_jobs"] = max_number_jobs
+    # the error handlers are run by the parent workgraph
+    subdata["error_handlers"] = pickle.dumps({})
+    subdata["tasks"] = {}
+    for name in names:
+        task = copy.deepcopy({k: v for k, v in tasks[name].items() if k != "results"})
+        task.update(
+            {"state": "PLANNED", "process": None, "action": "", "results": None}
+        )
+        task["wait"] = [wait for wait in task.get("wait", []) if wait in names]
+        subdata["tasks"][name] = task
+    # the `_wait` links are created again when the partition is saved
+    subdata["links"] = [
+        link
+        for link in wgdata["links"]
+        if link["from_node"] in names
+        and link["to_node"] in names
+        and not (
+            link["to_socket"] == "_wait"
+            and link["from_node"] in tasks[link["to_node"]]["wait"]
+        )
+    ]
+    subdata["ctrl_links"] = [
+        link
+        for link in wgdata.get("ctrl_links", [])
+        if link["from_node"] in names and link["to_node"] in names
+    ]
+    group_outputs = [
+        [output[0], output[0]]
+        for output in wgdata["metadata"]["group_outputs"]
+        if output[0].split(".")[0] in names
+    ]
+    for link in wgdata["links"]:
+        if "_wait" in [link["from_socket"], link["to_socket"]]:
+            continue
+        if link["to_node"] in names and link["from_node"] not in names:
+            # the same as `WorkGraphEngine.get_inputs`
+            results = tasks[link["from_node"]]["results"]
+            if results is None:
+                value = None
+            elif link["from_socket"] == "_outputs":
+                value = results
+            else:
+                value = get_nested_dict(results, link["from_socket"])
+            properties = subdata["tasks"][link["to_node"]]["properties"]
+            properties[link["to_socket"]]["value"] = value
+        elif (
+            link["from_node"] in names
+            and link["to_node"] not in names
+            and link["from_socket"] != "_outputs"
+            and tasks[link["from_node"]]["metadata"]["node_type"].upper() == "NORMAL"
+        ):
+            # the results of the other tasks are read from their nodes
+            output = f"{link['from_node']}.{link['from_socket']}"
+            if [output, output] not in group_outputs:
+                group_outputs.append([output, output])
+    subdata["metadata"]["group_outputs"] = group_outputs
+    metadata = {"call_link_label": key}
+    inputs = {"wg": subdata, "metadata": metadata}
+    return inputs, subdata
@@ -2,8 +2,12 @@
 from __future__ import annotations
 
 import collections.abc
+import concurrent.futures
+import copy
 import functools
+import inspect
 import logging
+import time
 import typing as t
 
 from plumpy import process_comms
@@ -31,6 +35,7 @@ from aiida.engine.processes.workchains.workchain import Protect, WorkChainSpec
 from aiida.engine import run_get_node
 from aiida_workgraph.utils import create_and_pause_process
 from aiida_workgraph.task import Task
+from .utils import interrupt_after, run_with_timeout
 
 if t.TYPE_CHECKING:
     from aiida.engine.runners import Runner  # pylint: disable=unused-import
@@ -39,6 +44,8 @@ __all__ = "WorkGraph"
 
 
 MAX_NUMBER_AWAITABLES_MSG = "The maximum number of subprocesses has been reached: {}. Cannot launch the job: {}."
+# interval in seconds between two checks for straggler tasks
+SPECULATIVE_CHECK_INTERVAL = 10
 
 
 @auto_persist("_awaitables")
@@ -110,6 +117,11 @@ class WorkGraphEngine(Process, metaclass=Protect):
             "TASK_NON_ZERO_EXIT_STATUS",
             message="Some of the tasks exited with non-zero status.",
         )
+        spec.exit_code(
+            304,
+            "TASK_TIMED_OUT",
+            message="The task exceeded its timeout.",
+        )
 
     @property
     def ctx(self) -> AttributeDict:
@@ -146,6 +158,13 @@ class WorkGraphEngine(Process, metaclass=Protect):
             # this is a new runner, so we need to re-register the callbacks
             self.ctx._awaitable_actions = []
             self._action_awaitables()
+        # the timers are not persisted, schedule them again
+        for name, deadline in self.ctx.get("_task_deadlines", {}).items():
+            self.loop.call_later(
+                max(0, deadline - time.time()),
+                functools.partial(self.call_soon, self.on_task_timeout, name, deadline),
+            )
+        self.schedule_speculation_check()
 
     def _resolve_nested_context(self, key: str) -> tuple[AttributeDict, str]:
         """
@@ -365,6 +384,9 @@ class WorkGraphEngine(Process, metaclass=Protect):
         :param awaitable: an Awaitable instance
         """
         print("on awaitable finished: ", awaitable.key)
+        if awaitable not in self._awaitables:
+            # the process is not awaited anymore, e.g. the process of a timed out task
+            return
         self.logger.info(
             "received callback that awaitable %d has terminated", awaitable.pk
         )
@@ -387,7 +409,17 @@ class WorkGraphEngine(Process, metaclass=Protect):
 
         # node finished, update the task state and result
         # udpate the task state
-        self.update_task_state(awaitable.key)
+        if awaitable.key in self.ctx.get("partitions", {}):
+            self.update_partition_state(awaitable.key)
+        elif awaitable.key in self.ctx.get("_sweep_instances", {}):
+            self.update_sweep_instance(awaitable.key)
+        else:
+            # the speculative duplicate of a task is awaited with its own key
+            name = self.ctx.get("_speculative_keys", {}).get(
+                awaitable.key, awaitable.key
+            )
+            if self.resolve_speculative(name, node):
+                self.update_task_state(name)
         # try to resume the workgraph, if the workgraph is already resumed
         # by other awaitable, this will not work
         try:
@@ -404,6 +436,14 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.ctx._awaitable_actions = []
         self.ctx.new_data = dict()
         self.ctx.input_tasks = dict()
+        self.ctx._task_deadlines = dict()
+        self.ctx._task_starts = dict()
+        self.ctx._durations = dict()
+        self.ctx._speculative = dict()
+        self.ctx._speculative_keys = dict()
+        self.ctx._streams = dict()
+        self.ctx._sweeps = dict()
+        self.ctx._sweep_instances = dict()
         # read the latest workgraph data
         wgdata = self.read_wgdata_from_base()
         self.init_ctx(wgdata)
@@ -423,6 +463,141 @@ class WorkGraphEngine(Process, metaclass=Protect):
             should_run = self.check_for_conditions()
             if not should_run:
                 self.set_tasks_state(self.ctx.tasks.keys(), "SKIPPED")
+        # split a large workgraph into partitions, which run as child processes
+        self.setup_partitions(wgdata)
+
+    def setup_partitions(self, wgdata: t.Dict[str, t.Any]) -> None:
+        """Partition the workgraph, the partitions are launched by `run_partitions`.
+
+        Only a workgraph whose tasks are all planned is partitioned, e.g. a
+        restarted workgraph is always run by a single process.
+        """
+        from aiida_workgraph.utils.analysis import (
+            partition_workgraph,
+            get_task_dependencies,
+        )
+
+        self.ctx.partitions = {}
+        if not wgdata.get("partition_threshold"):
+            return
+        for name in self.ctx.tasks:
+            if self.get_task_state_info(name, "state") != "PLANNED":
+                return
+        partitions = partition_workgraph(wgdata, wgdata.get("partition_threshold"))
+        if not partitions:
+            return
+        self.ctx.partitions = {
+            f"partition_{i}": names for i, names in enumerate(partitions)
+        }
+        # a partition is launched when the tasks upstream of it are done
+        dependencies = get_task_dependencies(wgdata)
+        self.ctx._partition_upstream = {}
+        for key, names in self.ctx.partitions.items():
+            names = set(names)
+            self.ctx._partition_upstream[key] = sorted(
+                {
+                    upstream
+                    for upstream, downstream in dependencies
+                    if downstream in names and upstream not in names
+                }
+            )
+        self.ctx._pending_partitions = list(self.ctx.partitions)
+        # the `max_number_jobs` of the workgraph is shared by the partitions, at most
+        # `max_number_jobs` partitions run at the same time
+        limit = wgdata.get("max_number_jobs")
+        self.ctx._partition_jobs = (
+            limit // min(limit, len(partitions)) if limit else None
+        )
+
+    def run_partitions(self) -> None:
+        """Launch the pending partitions whose upstream tasks are done."""
+        for key in list(self.ctx._pending_partitions):
+            if len(self._awaitables) >= self.ctx.max_number_awaitables:
+                print(
+                    MAX_NUMBER_AWAITABLES_MSG.format(
+                        self.ctx.max_number_awaitables, key
+                    )
+                )
+                return
+            if any(
+                self.get_task_state_info(name, "state")
+                in ["PLANNED", "READY", "CREATED", "RUNNING"]
+                for name in self.ctx._partition_upstream[key]
+            ):
+                continue
+            self.ctx._pending_partitions.remove(key)
+            self.run_partition(key)
+
+    def run_partition(self, key: str) -> None:
+        """Launch a partition of the workgraph as a child WorkGraph process."""
+        from .utils import prepare_for_partition
+        from aiida_workgraph.utils.analysis import WorkGraphSaver
+
+        # the tasks skipped because of a failed upstream task are not run
+        names = [
+            name
+            for name in self.ctx.partitions[key]
+            if self.get_task_state_info(name, "state") == "PLANNED"
+        ]
+        self.ctx.partitions[key] = names
+        if not names:
+            return
+        self.report(f"Run partition: {key}, tasks: {','.join(names)}")
+        inputs, wgdata = prepare_for_partition(
+            {**self.ctx.workgraph, "tasks": self.ctx.tasks},
+            key,
+            names,
+            max_number_jobs=self.ctx._partition_jobs,
+        )
+        process_inited = WorkGraphEngine(inputs=inputs)
+        process_inited.runner.persister.save_checkpoint(process_inited)
+        saver = WorkGraphSaver(process_inited.node, wgdata)
+        saver.save()
+        process = self.submit(process_inited)
+        self.set_tasks_state(names, "RUNNING")
+        self.to_context(**{key: process})
+
+    def update_partition_state(self, key: str) -> None:
+        """Copy the state and the results of the tasks in a finished partition.
+
+        The tasks downstream of a task which did not finish, in the partitions which
+        are not launched yet, are skipped.
+        """
+        from aiida.orm.utils.serialize import serialize
+
+        node = self.ctx[key]
+        group_outputs = getattr(node.outputs, "group_outputs", None)
+        for name in self.ctx.partitions[key]:
+            task = self.ctx.tasks[name]
+            for info in ["state", "process"]:
+                self.node.base.extras.set(
+                    f"_task_{info}_{name}",
+                    node.base.extras.get(f"_task_{info}_{name}", serialize(None)),
+                )
+            state = self.get_task_state_info(name, "state")
+            process = self.get_task_state_info(name, "process")
+            if isinstance(process, ProcessNode):
+                self.set_task_result(task)
+            elif state == "FINISHED":
+                if task["metadata"]["node_type"].upper() == "DATA":
+                    self.ctx.new_data[name] = process
+                if process is not None:
+                    task["results"] = {task["outputs"][0]["name"]: process}
+                else:
+                    task["results"] = getattr(group_outputs, name, None)
+            elif state not in ["FAILED", "SKIPPED"]:
+                # the partition was terminated before the task finished
+                self.set_task_state_info(name, "state", "FAILED")
+                self.report(f"Task: {name} failed, partition {key} terminated.")
+            if self.get_task_state_info(name, "state") != "FINISHED":
+                self.set_tasks_state(
+                    [
+                        child
+                        for child in self.ctx.connectivity["child_node"][name]
+                        if self.get_task_state_info(child, "state") == "PLANNED"
+                    ],
+                    "SKIPPED",
+                )
 
     def setup_ctx_workgraph(self, wgdata: t.Dict[str, t.Any]) -> None:
         """setup the workgraph in the context."""
@@ -434,12 +609,22 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.ctx.ctrl_links = wgdata["ctrl_links"]
         self.ctx.workgraph = wgdata
         self.ctx.error_handlers = pickle.loads(wgdata["error_handlers"])
+        self._ir = None
+
+    @property
+    def ir(self):
+        """The compiled graph of the workgraph, it is not saved in the checkpoint."""
+        from aiida_workgraph.utils.ir import get_ir
+
+        if getattr(self, "_ir", None) is None:
+            self._ir = get_ir(self.ctx.workgraph)
+        return self._ir
 
     def read_wgdata_from_base(self) -> t.Dict[str, t.Any]:
         """Read workgraph data from base.extras."""
-        from aiida.orm.utils.serialize import deserialize_unsafe
+        from aiida_workgraph.utils.storage import load_workgraph_data
 
-        wgdata = deserialize_unsafe(self.node.base.extras.get("_workgraph"))
+        wgdata = load_workgraph_data(self.node)
         return wgdata
 
     def update_workgraph_from_base(self) -> None:
@@ -605,6 +790,12 @@ class WorkGraphEngine(Process, metaclass=Protect):
         print("Continue workgraph.")
         exclude = exclude or []
         self.report("Continue workgraph.")
+        self.update_stream_states()
+        self.update_sweeps()
+        if self.ctx.get("partitions"):
+            # the tasks of a partitioned workgraph are only run by its partitions
+            self.run_partitions()
+            return
         # self.update_workgraph_from_base()
         task_to_run = []
         for name, task in self.ctx.tasks.items():
@@ -615,6 +806,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 "FINISHED",
                 "FAILED",
                 "SKIPPED",
+                "TIMED_OUT",
             ]:
                 continue
             ready, output = self.check_parent_state(name)
@@ -628,6 +820,8 @@ class WorkGraphEngine(Process, metaclass=Protect):
         """Update task state if task is a Awaitable."""
         print("update task state: ", name)
         task = self.ctx.tasks[name]
+        self.ctx.get("_task_deadlines", {}).pop(name, None)
+        start = self.ctx.get("_task_starts", {}).pop(name, None)
         if task["metadata"]["node_type"].upper() in [
             "CALCFUNCTION",
             "WORKFUNCTION",
@@ -639,17 +833,194 @@ class WorkGraphEngine(Process, metaclass=Protect):
             "SHELLJOB",
         ] and self.get_task_state_info(task["name"], "state") in ["CREATED", "RUNNING"]:
             self.set_task_result(task)
+            # duration statistics of the finished tasks, per identifier
+            if (
+                start is not None
+                and self.get_task_state_info(name, "state") == "FINISHED"
+            ):
+                self.ctx._durations.setdefault(
+                    task["metadata"]["identifier"], []
+                ).append(time.time() - start)
+
+    def schedule_speculation_check(self) -> None:
+        """Schedule a check for straggler tasks, if speculative execution is enabled."""
+        if not self.ctx.get("workgraph", {}).get("speculative_factor"):
+            return
+        if getattr(self, "_speculation_handle", None) is not None:
+            return
+        self._speculation_handle = self.loop.call_later(
+            SPECULATIVE_CHECK_INTERVAL,
+            functools.partial(self.call_soon, self.check_stragglers),
+        )
+
+    def check_stragglers(self) -> None:
+        """Launch a duplicate of the PythonJob tasks that run much longer than their siblings.
+
+        A task is a straggler if it has run longer than `speculative_factor` times the
+        median duration of the finished tasks with the same identifier. The duplicates
+        count against `max_number_jobs`, a straggler is checked again later if the limit
+        is reached.
+        """
+        import statistics
+
+        self._speculation_handle = None
+        if self.has_terminated():
+            return
+        factor = self.ctx.workgraph["speculative_factor"]
+        running = False
+        for name, start in list(self.ctx._task_starts.items()):
+            task = self.ctx.tasks[name]
+            if task["metadata"]["node_type"].upper() != "PYTHONJOB":
+                continue
+            if self.get_task_state_info(name, "state") != "RUNNING":
+                continue
+            running = True
+            if name in self.ctx._speculative:
+                continue
+            durations = self.ctx._durations.get(task["metadata"]["identifier"])
+            if durations and time.time() - start > factor * statistics.median(
+                durations
+            ):
+                if len(self._awaitables) >= self.ctx.max_number_awaitables:
+                    self.report(
+                        MAX_NUMBER_AWAITABLES_MSG.format(
+                            self.ctx.max_number_awaitables, f"{name}_speculative"
+                        )
+                    )
+                    continue
+                self.run_speculative(name)
+        if running:
+            self.schedule_speculation_check()
+
+    def run_speculative(self, name: str) -> None:
+        """Launch a duplicate of a running task, the first copy to finish wins."""
+        process = self.get_task_state_info(name, "process")
+        builder = process.get_builder_restart()
+        builder.metadata.call_link_label = f"{name}_speculative"
+        duplicate = self.submit(builder)
+        duplicate.label = f"{name}_speculative"
+        self.ctx._speculative[name] = {
+            "original": process.pk,
+            "duplicate": duplicate.pk,
+        }
+        key = f"{name}__speculative"
+        self.ctx._speculative_keys[key] = name
+        self.report(f"Task: {name} is a straggler, launch duplicate {duplicate.pk}.")
+        self.to_context(**{key: duplicate})
+        # the duplicate is launched from a timer, while the workgraph is waiting,
+        # so the callback for its termination is registered here
+        self._action_awaitables()
+
+    def resolve_speculative(self, name: str, node: ProcessNode) -> bool:
+        """Choose the winner between a task and its speculative duplicate.
+
+        The first copy that finishes successfully wins, and the other one is killed.
+        The winner and the loser are saved in the task state info.
+
+        Returns:
+            bool: whether the result of the task can be set from the finished process.
+        """
+        from aiida.engine.processes import control
+
+        copies = self.ctx.get("_speculative", {}).get(name)
+        if copies is None:
+            return True
+        if self.get_task_state_info(name, "state") not in ["CREATED", "RUNNING"]:
+            return False
+        other = load_node(
+            copies["duplicate"] if node.pk == copies["original"] else copies["original"]
+        )
+        # wait for the other copy, which may still succeed
+        if not node.is_finished_ok and not other.is_terminated:
+            return False
+        self.set_task_state_info(name, "process", node)
+        if not other.is_terminated:
+            try:
+                control.kill_processes(
+                    [other], message=f"Task {name} finished by {node.pk}.", wait=False
+                )
+            except Exception as e:
+                self.report(f"Failed to kill the process {other.pk}: {e}")
+        self.set_task_state_info(
+            name, "speculative", {"winner": node.pk, "loser": other.pk}
+        )
+        self.report(f"Task: {name}, process {node.pk} won, {other.pk} lost.")
+        return True
+
+    def schedule_timeout(self, name: str) -> None:
+        """Schedule a timed callback that kills the task if it runs too long."""
+        timeout = self.ctx.tasks[name].get("timeout")
+        if timeout is None:
+            return
+        deadline = time.time() + timeout
+        self.ctx._task_deadlines[name] = deadline
+        self.loop.call_later(
+            timeout,
+            functools.partial(self.call_soon, self.on_task_timeout, name, deadline),
+        )
+
+    def on_task_timeout(self, name: str, deadline: float) -> None:
+        """Callback function, for when the deadline of a task is reached."""
+        from aiida.engine.processes import control
+
+        if self.has_terminated() or self.ctx._task_deadlines.get(name) != deadline:
+            return
+        self.ctx._task_deadlines.pop(name)
+        if self.get_task_state_info(name, "state") not in ["CREATED", "RUNNING"]:
+            return
+        process = self.get_task_state_info(name, "process")
+        processes = [process] if isinstance(process, ProcessNode) else []
+        copies = self.ctx.get("_speculative", {}).pop(name, None)
+        if copies is not None:
+            processes = [load_node(copies["original"]), load_node(copies["duplicate"])]
+        for process in processes:
+            if not process.is_terminated:
+                try:
+                    control.kill_processes(
+                        [process], message=f"Task {name} timed out.", wait=False
+                    )
+                except Exception as e:
+                    self.report(f"Failed to kill the process of task {name}: {e}")
+            # the task may be run again by an error handler, with the same key, so the
+            # callback of the killed process is ignored
+            self.stop_awaiting(process.pk)
+        self.set_task_timed_out(name)
+        # the task is not awaited anymore, try to continue the workgraph
+        try:
+            self.resume()
+        except Exception as e:
+            print(e)
+
+    def stop_awaiting(self, pk: int) -> None:
+        """Stop waiting for a process, the callback is ignored when it terminates."""
+        for awaitable in list(self._awaitables):
+            if awaitable.pk == pk:
+                self._awaitables.remove(awaitable)
+        if pk in self.ctx._awaitable_actions:
+            self.ctx._awaitable_actions.remove(pk)
+        self._update_process_status()
+
+    def set_task_timed_out(self, name: str) -> None:
+        """Mark the task as timed out and skip its child tasks."""
+        self.set_task_state_info(name, "state", "TIMED_OUT")
+        self.set_tasks_state(self.ctx.connectivity["child_node"][name], "SKIPPED")
+        self.report(f"Task: {name} timed out.")
+        self.run_error_handlers(name)
 
     def run_error_handlers(self, task_name: str) -> None:
         """Run error handler."""
         node = self.get_task_state_info(task_name, "process")
-        if not node or not node.exit_status:
+        if self.get_task_state_info(task_name, "state") == "TIMED_OUT":
+            exit_status = self.exit_codes.TASK_TIMED_OUT.status
+        elif not node or not node.exit_status:
             return
+        else:
+            exit_status = node.exit_code.status
         for _, data in self.ctx.error_handlers.items():
             if task_name in data["tasks"]:
                 handler = data["handler"]
                 metadata = data["tasks"][task_name]
-                if node.exit_code.status in metadata.get("exit_codes", []):
+                if exit_status in metadata.get("exit_codes", []):
                     self.report(f"Run error handler: {metadata}")
                     metadata.setdefault("retry", 0)
                     if metadata["retry"] < metadata["max_retries"]:
@@ -661,6 +1032,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
         For `while` workgraph, we need check its conditions"""
         is_finished = True
         failed_tasks = []
+        timed_out_tasks = []
         for name, task in self.ctx.tasks.items():
             # self.update_task_state(name)
             print("task: ", name, self.get_task_state_info(task["name"], "state"))
@@ -673,6 +1045,8 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 is_finished = False
             elif self.get_task_state_info(task["name"], "state") == "FAILED":
                 failed_tasks.append(name)
+            elif self.get_task_state_info(task["name"], "state") == "TIMED_OUT":
+                timed_out_tasks.append(name)
         if is_finished:
             if self.ctx.workgraph["workgraph_type"].upper() == "WHILE":
                 should_run = self.check_while_conditions()
@@ -681,7 +1055,14 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 should_run = self.check_for_conditions()
                 is_finished = not should_run
         print("is workgraph finished: ", is_finished)
-        if is_finished and len(failed_tasks) > 0:
+        if is_finished and len(timed_out_tasks) > 0:
+            message = (
+                f"WorkGraph finished, but tasks: {timed_out_tasks} timed out. "
+                "Thus all their child tasks are skipped."
+            )
+            self.report(message)
+            result = ExitCode(304, message)
+        elif is_finished and len(failed_tasks) > 0:
             message = f"WorkGraph finished, but tasks: {failed_tasks} failed. Thus all their child tasks are skipped."
             self.report(message)
             result = ExitCode(302, message)
@@ -742,6 +1123,29 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.ctx._count += 1
         return should_run
 
+    def create_data_nodes(self, names: t.List[str]) -> t.Dict[str, orm.Node]:
+        """Create the nodes of the DATA tasks, which are stored in one transaction."""
+        from aiida_workgraph.orm.serializer import batch_store
+        from aiida_workgraph.utils import (
+            get_executor,
+            create_data_node,
+            update_nested_dict_with_special_keys,
+        )
+
+        nodes = {}
+        with batch_store():
+            for name in names:
+                task = self.ctx.tasks[name]
+                executor, _ = get_executor(task["executor"])
+                args, kwargs, _, _, _ = self.get_inputs(task)
+                for i, key in enumerate(task["metadata"]["args"]):
+                    kwargs[key] = args[i]
+                kwargs = update_nested_dict_with_special_keys(kwargs)
+                for key in task["metadata"]["args"]:
+                    kwargs.pop(key, None)
+                nodes[name] = create_data_node(executor, args, kwargs)
+        return nodes
+
     def run_tasks(self, names: t.List[str], continue_workgraph: bool = True) -> None:
         """Run task
         Here we use ToContext to pass the results of the run to the next step.
@@ -750,10 +1154,17 @@ class WorkGraphEngine(Process, metaclass=Protect):
         """
         from aiida_workgraph.utils import (
             get_executor,
-            create_data_node,
+            update_nested_dict,
             update_nested_dict_with_special_keys,
         )
 
+        data_nodes = self.create_data_nodes(
+            [
+                name
+                for name in names
+                if self.ctx.tasks[name]["metadata"]["node_type"].upper() == "DATA"
+            ]
+        )
         for name in names:
             print("-" * 60)
             task = self.ctx.tasks[name]
@@ -762,6 +1173,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 "WORKCHAIN",
                 "GRAPH_BUILDER",
                 "WORKGRAPH",
+                "SWEEP",
                 "PYTHONJOB",
                 "SHELLJOB",
             ]:
@@ -773,6 +1185,20 @@ class WorkGraphEngine(Process, metaclass=Protect):
                     )
                     continue
             self.report(f"Run task: {name}, type: {task['metadata']['node_type']}")
+            if name in data_nodes:
+                # the node is created with the nodes of the other DATA tasks, from
+                # the inputs of the task, see `create_data_nodes`
+                print("task  type: data.")
+                results = data_nodes[name]
+                task["results"] = {task["outputs"][0]["name"]: results}
+                self.set_task_state_info(task["name"], "process", results)
+                self.ctx.new_data[name] = results
+                self.set_task_state_info(name, "state", "FINISHED")
+                self.task_to_context(name)
+                self.report(f"Task: {name} finished.")
+                if continue_workgraph:
+                    self.continue_workgraph(names)
+                continue
             # print("Run task: ", name)
             # print("executor: ", task["executor"])
             executor, _ = get_executor(task["executor"])
@@ -801,19 +1227,6 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 self.report(f"Task: {name} finished.")
                 if continue_workgraph:
                     self.continue_workgraph(names)
-            elif task["metadata"]["node_type"].upper() == "DATA":
-                print("task  type: data.")
-                for key in self.ctx.tasks[name]["metadata"]["args"]:
-                    kwargs.pop(key, None)
-                results = create_data_node(executor, args, kwargs)
-                task["results"] = {task["outputs"][0]["name"]: results}
-                self.set_task_state_info(task["name"], "process", results)
-                self.ctx.new_data[name] = results
-                self.set_task_state_info(name, "state", "FINISHED")
-                self.task_to_context(name)
-                self.report(f"Task: {name} finished.")
-                if continue_workgraph:
-                    self.continue_workgraph(names)
             elif task["metadata"]["node_type"].upper() in [
                 "CALCFUNCTION",
                 "WORKFUNCTION",
@@ -822,13 +1235,15 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 kwargs.setdefault("metadata", {})
                 kwargs["metadata"].update({"call_link_label": name})
                 try:
-                    # since aiida 2.5.0, we need to use args_dict to pass the args to the run_get_node
-                    if var_kwargs is None:
-                        results, process = run_get_node(executor, **kwargs)
-                    else:
-                        results, process = run_get_node(
-                            executor, **kwargs, **var_kwargs
-                        )
+                    # the function runs in this thread, it is interrupted at the timeout
+                    with interrupt_after(task.get("timeout")):
+                        # since aiida 2.5.0, we need to use args_dict to pass the args to the run_get_node
+                        if var_kwargs is None:
+                            results, process = run_get_node(executor, **kwargs)
+                        else:
+                            results, process = run_get_node(
+                                executor, **kwargs, **var_kwargs
+                            )
                     process.label = name
                     # only one output
                     if isinstance(results, orm.Data):
@@ -839,6 +1254,13 @@ class WorkGraphEngine(Process, metaclass=Protect):
                     self.set_task_state_info(name, "state", "FINISHED")
                     self.task_to_context(name)
                     self.report(f"Task: {name} finished.")
+                except concurrent.futures.TimeoutError:
+                    calls = self.node.base.links.get_outgoing(
+                        link_label_filter=name
+                    ).all_nodes()
+                    if calls:
+                        self.set_task_state_info(name, "process", calls[-1])
+                    self.set_task_timed_out(name)
                 except Exception as e:
                     print(e)
                     self.report(e)
@@ -875,6 +1297,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 process.label = name
                 self.set_task_state_info(task["name"], "process", process)
                 self.to_context(**{name: process})
+                self.schedule_timeout(name)
             elif task["metadata"]["node_type"].upper() in ["GRAPH_BUILDER"]:
                 print("task type: graph_builder.")
                 wg = self.run_executor(executor, [], kwargs, var_args, var_kwargs)
@@ -887,6 +1310,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 self.set_task_state_info(task["name"], "process", process)
                 self.set_task_state_info(name, "state", "RUNNING")
                 self.to_context(**{name: process})
+                self.schedule_timeout(name)
             elif task["metadata"]["node_type"].upper() in ["WORKGRAPH"]:
                 from .utils import prepare_for_workgraph_task
                 from aiida_workgraph.utils.analysis import WorkGraphSaver
@@ -901,10 +1325,34 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 self.set_task_state_info(task["name"], "process", process)
                 self.set_task_state_info(name, "state", "RUNNING")
                 self.to_context(**{name: process})
+                self.schedule_timeout(name)
+            elif task["metadata"]["node_type"].upper() in ["SWEEP"]:
+                table = kwargs.pop("_parameters", {})
+                for output in task["metadata"]["group_outputs"]:
+                    update_nested_dict(task["results"], output[1], {})
+                self.ctx._sweeps[name] = {
+                    "kwargs": kwargs,
+                    "table": table,
+                    "size": len(next(iter(table.values()), [])),
+                    "next": 0,
+                    "running": 0,
+                    "failed": [],
+                }
+                self.set_task_state_info(name, "state", "RUNNING")
+                self.report(
+                    f"Task: {name}, sweep of {self.ctx._sweeps[name]['size']} instances."
+                )
+                self.run_sweep(name)
             elif task["metadata"]["node_type"].upper() in ["PYTHONJOB"]:
                 from aiida_workgraph.calculations.python import PythonJob
                 from .utils import prepare_for_python_task
 
+                code = kwargs.get("code")
+                kwargs["computer"] = self.place_task(
+                    name,
+                    kwargs,
+                    code.computer.label if code else kwargs.get("computer"),
+                )
                 inputs = prepare_for_python_task(task, kwargs, var_kwargs)
                 # since aiida 2.5.0, we can pass inputs directly to the submit, no need to use **inputs
                 if self.get_task_state_info(name, "action").upper() == "PAUSE":
@@ -923,13 +1371,22 @@ class WorkGraphEngine(Process, metaclass=Protect):
                     process = self.submit(PythonJob, **inputs)
                     print("process: ", process)
                     self.set_task_state_info(name, "state", "RUNNING")
+                    self.ctx._task_starts[name] = time.time()
+                    self.schedule_speculation_check()
                 process.label = name
                 self.set_task_state_info(task["name"], "process", process)
                 self.to_context(**{name: process})
+                self.schedule_timeout(name)
             elif task["metadata"]["node_type"].upper() in ["SHELLJOB"]:
                 from aiida_shell.calculations.shell import ShellJob
-                from .utils import prepare_for_shell_task
+                from .utils import (
+                    get_shell_job_computer,
+                    prepare_for_shell_task,
+                    set_shell_job_computer,
+                )
 
+                computer = self.place_task(name, kwargs, get_shell_job_computer(kwargs))
+                set_shell_job_computer(kwargs, computer)
                 inputs = prepare_for_shell_task(task, kwargs)
                 if self.get_task_state_info(name, "action").upper() == "PAUSE":
                     self.set_task_state_info(name, "action", "")
@@ -948,6 +1405,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 process.label = name
                 self.set_task_state_info(task["name"], "process", process)
                 self.to_context(**{name: process})
+                self.schedule_timeout(name)
             elif task["metadata"]["node_type"].upper() in ["NORMAL"]:
                 print("Task  type: Normal.")
                 # normal function does not have a process
@@ -956,9 +1414,22 @@ class WorkGraphEngine(Process, metaclass=Protect):
                     kwargs.update({"context": self.ctx})
                 for key in self.ctx.tasks[name]["metadata"]["args"]:
                     kwargs.pop(key, None)
-                results = self.run_executor(
-                    executor, args, kwargs, var_args, var_kwargs
-                )
+                try:
+                    results = self.run_executor(
+                        executor,
+                        args,
+                        kwargs,
+                        var_args,
+                        var_kwargs,
+                        timeout=task.get("timeout"),
+                    )
+                except concurrent.futures.TimeoutError:
+                    self.set_task_timed_out(name)
+                    if continue_workgraph:
+                        self.continue_workgraph(names)
+                    continue
+                if inspect.isgenerator(results):
+                    results = self.run_stream(name, results)
                 # self.set_task_state_info(task["name"], "process", results)
                 if isinstance(results, tuple):
                     if len(task["outputs"]) != len(results):
@@ -984,6 +1455,206 @@ class WorkGraphEngine(Process, metaclass=Protect):
                 # self.report("Unknow task type {}".format(task["metadata"]["node_type"]))
                 return self.exit_codes.UNKNOWN_TASK_TYPE
 
+    def place_task(
+        self, name: str, kwargs: t.Dict[str, t.Any], computer: t.Optional[str]
+    ) -> t.Optional[str]:
+        """Choose the computer of a task, close to its remote data.
+
+        The computer chosen by the user always takes precedence. The placement
+        is saved in the task state info.
+        """
+        from .utils import find_placement
+
+        if computer:
+            reason = "user"
+        else:
+            computer, reason = find_placement(
+                kwargs, self.ctx.workgraph.get("computers")
+            )
+        self.set_task_state_info(
+            name, "placement", {"computer": computer, "reason": reason}
+        )
+        if computer:
+            self.report(f"Task: {name} placed on computer {computer} ({reason}).")
+        return computer
+
+    def run_stream(self, name: str, generator: t.Generator) -> list:
+        """Launch a copy of the downstream tasks for each item of a stream.
+
+        The downstream task linked to the `Stream` output socket is a template, which
+        stays RUNNING until all its copies are finished. If the other inputs of the
+        downstream task are not ready, it receives the list of all items instead.
+
+        Returns:
+            list: all the items of the stream.
+        """
+        task = self.ctx.tasks[name]
+        sockets = [
+            output["name"]
+            for output in task["outputs"]
+            if output.get("identifier") == "Stream"
+        ]
+        consumers = []
+        for link in self.ctx.links:
+            if (
+                link["from_node"] == name
+                and link["from_socket"] in sockets
+                and self.is_stream_ready(link["to_node"], name)
+            ):
+                consumers.append((link["to_node"], link["to_socket"]))
+                self.set_task_state_info(link["to_node"], "state", "RUNNING")
+                self.ctx._streams[link["to_node"]] = []
+        items = []
+        for item in generator:
+            for consumer, to_socket in consumers:
+                clone = self.clone_stream_task(
+                    consumer, to_socket, name, len(items), item
+                )
+                self.ctx._streams[consumer].append(clone)
+                self.run_tasks([clone], continue_workgraph=False)
+            items.append(item)
+        return items
+
+    def is_stream_ready(self, name: str, producer: str) -> bool:
+        """Check if all inputs of a task, except the stream, are ready."""
+        task = self.ctx.tasks[name]
+        if self.get_task_state_info(name, "state") != "PLANNED":
+            return False
+        parents = set(task.get("wait", []))
+        for input in task["inputs"]:
+            for link in input["links"]:
+                parents.add(link["from_node"])
+        parents.discard(producer)
+        for parent in parents:
+            if self.get_task_state_info(parent, "state") != "FINISHED":
+                return False
+        return True
+
+    def clone_stream_task(
+        self, name: str, socket: str, producer: str, index: int, item: t.Any
+    ) -> str:
+        """Create a copy of a task, which takes an item of the stream as input."""
+        clone = copy.deepcopy(self.ctx.tasks[name])
+        clone["name"] = f"{name}_stream_{index}"
+        for input in clone["inputs"]:
+            if input["name"] == socket:
+                input["links"] = [
+                    link for link in input["links"] if link["from_node"] != producer
+                ]
+        clone["properties"][socket]["value"] = item
+        clone["results"] = None
+        self.ctx.tasks[clone["name"]] = clone
+        self.ctx.connectivity["child_node"][clone["name"]] = []
+        self.set_task_state_info(clone["name"], "state", "PLANNED")
+        self.set_task_state_info(clone["name"], "process", None)
+        self.set_task_state_info(clone["name"], "action", "")
+        return clone["name"]
+
+    def update_stream_states(self) -> None:
+        """Collect the results of the copies of a streamed task, once all are done."""
+        for name, clones in list(self.ctx.get("_streams", {}).items()):
+            states = [self.get_task_state_info(clone, "state") for clone in clones]
+            if any(
+                state not in ["FINISHED", "FAILED", "SKIPPED", "TIMED_OUT"]
+                for state in states
+            ):
+                continue
+            task = self.ctx.tasks[name]
+            task["results"] = {}
+            for output in task["outputs"]:
+                task["results"][output["name"]] = {}
+                for clone in clones:
+                    results = self.ctx.tasks[clone]["results"]
+                    if results is not None and output["name"] in results:
+                        task["results"][output["name"]][clone] = results[output["name"]]
+            del self.ctx._streams[name]
+            if all(state == "FINISHED" for state in states):
+                self.set_task_state_info(name, "state", "FINISHED")
+                self.task_to_context(name)
+                self.report(f"Task: {name} finished.")
+            else:
+                self.set_task_state_info(name, "state", "FAILED")
+                self.set_tasks_state(
+                    self.ctx.connectivity["child_node"][name], "SKIPPED"
+                )
+                self.report(f"Task: {name} failed.")
+
+    def run_sweep(self, name: str) -> None:
+        """Launch the next instances of a sweep task, as child WorkGraph processes.
+
+        An instance is only built from the template when it is launched, and the instances
+        are launched until the number of running processes reaches `max_number_jobs`.
+        """
+        from .utils import prepare_for_sweep_instance
+        from aiida_workgraph.utils.analysis import WorkGraphSaver
+
+        sweep = self.ctx._sweeps[name]
+        task = self.ctx.tasks[name]
+        while (
+            sweep["next"] < sweep["size"]
+            and len(self._awaitables) < self.ctx.max_number_awaitables
+        ):
+            inputs, wgdata = prepare_for_sweep_instance(
+                task, sweep["kwargs"], sweep["table"], sweep["next"]
+            )
+            sweep["next"] += 1
+            process_inited = WorkGraphEngine(inputs=inputs)
+            process_inited.runner.persister.save_checkpoint(process_inited)
+            saver = WorkGraphSaver(process_inited.node, wgdata)
+            saver.save()
+            process = self.submit(process_inited)
+            sweep["running"] += 1
+            # a task which launches a process can not start with an underscore, so the
+            # key of an instance in the context does not clash with the tasks
+            key = f"_{wgdata['name']}"
+            self.ctx._sweep_instances[key] = [name, wgdata["name"]]
+            self.to_context(**{key: process})
+
+    def update_sweep_instance(self, key: str) -> None:
+        """Collect the results of a finished instance of a sweep task.
+
+        The results are keyed by the name of the instance, e.g. the output `add1.sum`
+        of the sweep task is `{"sweep__0": ..., "sweep__1": ...}`.
+        """
+        from aiida_workgraph.utils import update_nested_dict
+
+        name, instance = self.ctx._sweep_instances.pop(key)
+        sweep = self.ctx._sweeps[name]
+        sweep["running"] -= 1
+        # the process of the instance is not kept in the context
+        node = self.ctx.pop(key)
+        if not node.is_finished_ok:
+            sweep["failed"].append(instance)
+            self.report(f"Task: {name}, instance {instance} failed.")
+            return
+        group_outputs = getattr(node.outputs, "group_outputs", None)
+        task = self.ctx.tasks[name]
+        for output in task["metadata"]["group_outputs"]:
+            value = group_outputs
+            for socket in output[1].split("."):
+                value = getattr(value, socket, None)
+            if value is not None:
+                update_nested_dict(task["results"], f"{output[1]}.{instance}", value)
+
+    def update_sweeps(self) -> None:
+        """Launch the pending instances of the sweep tasks, and finish the sweeps whose
+        instances are all done."""
+        for name, sweep in list(self.ctx.get("_sweeps", {}).items()):
+            self.run_sweep(name)
+            if sweep["next"] < sweep["size"] or sweep["running"] > 0:
+                continue
+            del self.ctx._sweeps[name]
+            if not sweep["failed"]:
+                self.set_task_state_info(name, "state", "FINISHED")
+                self.task_to_context(name)
+                self.report(f"Task: {name} finished.")
+            else:
+                self.set_task_state_info(name, "state", "FAILED")
+                self.set_tasks_state(
+                    self.ctx.connectivity["child_node"][name], "SKIPPED"
+                )
+                self.report(f"Task: {name} failed.")
+
     def get_inputs(
         self, task: t.Dict[str, t.Any]
     ) -> t.Tuple[
@@ -1139,22 +1810,27 @@ class WorkGraphEngine(Process, metaclass=Protect):
                     "FINISHED",
                     "SKIPPED",
                     "FAILED",
+                    "TIMED_OUT",
                 ]:
                     ready = False
                     return ready, f"Task {name} wait for {task_name}"
-            for input in inputs:
-                # print("    input, ", input["from_node"], self.ctx.tasks[input["from_node"]]["state"])
-                for link in input["links"]:
-                    if self.get_task_state_info(link["from_node"], "state") not in [
-                        "FINISHED",
-                        "SKIPPED",
-                        "FAILED",
-                    ]:
-                        ready = False
-                        return (
-                            ready,
-                            f"{name}, input: {link['from_node']} is {self.ctx.tasks[link['from_node']]['state']}",
-                        )
+            # the parents are precomputed in the compiled graph
+            if name in self.ir.index:
+                parents = self.ir.parent_names(name)
+            else:
+                parents = [
+                    link["from_node"] for input in inputs for link in input["links"]
+                ]
+            for parent in parents:
+                state = self.get_task_state_info(parent, "state")
+                if state not in [
+                    "FINISHED",
+                    "SKIPPED",
+                    "FAILED",
+                    "TIMED_OUT",
+                ]:
+                    ready = False
+                    return ready, f"{name}, input: {parent} is {state}"
         return ready, None
 
     # def expose_graph_build_outputs(self, name):
@@ -1185,12 +1861,20 @@ class WorkGraphEngine(Process, metaclass=Protect):
         kwargs: t.Dict[str, t.Any],
         var_args: t.Optional[t.List[t.Any]],
         var_kwargs: t.Optional[t.Dict[str, t.Any]],
+        timeout: t.Optional[float] = None,
     ) -> t.Any:
-        if var_kwargs is None:
-            return executor(*args, **kwargs)
-        else:
+        """Run the executor in the current process.
+
+        If a timeout is given, the executor runs in a separate thread, and a
+        `concurrent.futures.TimeoutError` is raised if it does not finish in time.
+        The thread is interrupted, see `run_with_timeout`.
+        """
+        if var_kwargs is not None:
             print("var_kwargs: ", var_kwargs)
-            return executor(*args, **kwargs, **var_kwargs)
+            kwargs = {**kwargs, **var_kwargs}
+        if timeout is None:
+            return executor(*args, **kwargs)
+        return run_with_timeout(executor, timeout, *args, **kwargs)
 
     def save_results_to_extras(self, name: str) -> None:
         """Save the results to the base.extras.
@@ -1282,6 +1966,9 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.out("execution_count", orm.Int(self.ctx._execution_count).store())
         self.report("Finalize")
         for name, task in self.ctx.tasks.items():
+            if self.get_task_state_info(task["name"], "state") == "TIMED_OUT":
+                print(f"    Task {name} timed out.")
+                return self.exit_codes.TASK_TIMED_OUT
             if self.get_task_state_info(task["name"], "state") == "FAILED":
                 print(f"    Task {name} failed.")
                 return self.exit_codes.TASK_FAILED
@@ -0,0 +1,184 @@
+"""`ArrayData` sub class to represent numpy arrays, or dicts or lists of them."""
+
+from typing import Any, BinaryIO, List, Optional, Tuple
+from aiida.orm import ArrayData
+
+__all__ = ("NumpyArrayData",)
+
+
+def get_array_layout(value: Any) -> Optional[Tuple[str, Optional[List[str]], List]]:
+    """Get the layout of an array, or a dict or list of arrays.
+
+    Returns:
+        tuple: the kind of the value, "array", "dict" or "list", the keys of a dict,
+            and the arrays. None if the value is not an array, or a dict or list of arrays.
+    """
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        return "array", None, [value]
+    if isinstance(value, list) and value:
+        if all(isinstance(item, np.ndarray) for item in value):
+            return "list", None, list(value)
+    elif isinstance(value, dict) and value:
+        if all(isinstance(item, np.ndarray) for item in value.values()):
+            return "dict", list(value.keys()), list(value.values())
+    return None
+
+
+def build_array_value(kind: str, keys: Optional[List[str]], arrays: List) -> Any:
+    """Build the value from the arrays, the inverse of `get_array_layout`."""
+    if kind == "array":
+        return arrays[0]
+    if kind == "dict":
+        return dict(zip(keys, arrays))
+    return list(arrays)
+
+
+def read_npy_header(handle: BinaryIO) -> Tuple[tuple, bool, Any]:
+    """Read the header of a `.npy` file, from the current position of the handle.
+
+    Returns:
+        tuple: the shape, the fortran order and the dtype of the array.
+    """
+    import numpy as np
+
+    version = np.lib.format.read_magic(handle)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(handle)
+    if version == (2, 0):
+        return np.lib.format.read_array_header_2_0(handle)
+    raise ValueError(f"Unsupported version of the .npy format: {version}")
+
+
+def load_npy(path: str, offset: int = 0) -> Optional[Any]:
+    """Memory-map a `.npy` file, which starts at `offset` in the file.
+
+    The array is mapped copy-on-write, so it can be changed in memory, without
+    changing the file.
+
+    Returns:
+        numpy.memmap: the array, None if the array can not be mapped.
+    """
+    import numpy as np
+
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        try:
+            shape, fortran_order, dtype = read_npy_header(handle)
+        except ValueError:
+            return None
+        data_offset = handle.tell()
+    # an empty file can not be mapped
+    if dtype.hasobject or np.prod(shape) == 0:
+        return None
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="c",
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=data_offset,
+    )
+
+
+class NumpyArrayData(ArrayData):
+    """`ArrayData` to represent a numpy array, or a dict or list of numpy arrays.
+
+    Each array is stored as a `.npy` file in the repository, without pickling. The
+    arrays of a stored node are memory-mapped from the disk object store when it
+    is possible, so reading them does not copy the data.
+    """
+
+    def __init__(self, value=None, **kwargs):
+        """Initialise a ``NumpyArrayData`` node instance.
+
+        :param value: a numpy array, or a dict or list of numpy arrays
+        """
+        super().__init__(**kwargs)
+        if value is not None:
+            self.set_value(value)
+
+    def __str__(self):
+        return f"{super().__str__()} : {self.base.attributes.get('kind', None)}"
+
+    @property
+    def value(self):
+        """Return the contents of this node.
+
+        :return: a numpy array, or a dict or list of numpy arrays
+        """
+        return self.get_value()
+
+    @value.setter
+    def value(self, value):
+        return self.set_value(value)
+
+    @staticmethod
+    def _get_array_name(index: int) -> str:
+        return f"array_{index}"
+
+    def set_value(self, value: Any) -> None:
+        """Set the contents of this node.
+
+        :param value: a numpy array, or a dict or list of numpy arrays
+        """
+        layout = get_array_layout(value)
+        if layout is None:
+            raise TypeError(
+                f"NumpyArrayData can only store a numpy array, or a dict or list of numpy arrays, got: {type(value)}"
+            )
+        kind, keys, arrays = layout
+        for name in self.get_arraynames():
+            self.delete_array(name)
+        for index, array in enumerate(arrays):
+            self.set_array(self._get_array_name(index), array)
+        self.base.attributes.set("kind", kind)
+        self.base.attributes.set("keys", keys)
+
+    def set_npy_files(
+        self, kind: str, keys: Optional[List[str]], handles: List[BinaryIO]
+    ) -> None:
+        """Set the contents of this node from `.npy` files, without loading the arrays.
+
+        :param kind: the kind of the value, "array", "dict" or "list"
+        :param keys: the keys of a dict
+        :param handles: the binary handles of the `.npy` files, in the order of the keys
+        """
+        for name in self.get_arraynames():
+            self.delete_array(name)
+        for index, handle in enumerate(handles):
+            shape = read_npy_header(handle)[0]
+            handle.seek(0)
+            name = self._get_array_name(index)
+            self.base.repository.put_object_from_filelike(handle, f"{name}.npy")
+            self.base.attributes.set(f"{self.array_prefix}{name}", list(shape))
+        self.base.attributes.set("kind", kind)
+        self.base.attributes.set("keys", keys)
+
+    def get_value(self) -> Any:
+        """Return the contents of this node.
+
+        :return: a numpy array, or a dict or list of numpy arrays
+        """
+        kind = self.base.attributes.get("kind")
+        keys = self.base.attributes.get("keys", None)
+        size = len(keys) if kind == "dict" else len(self.get_arraynames())
+        arrays = [self._load_array(self._get_array_name(i)) for i in range(size)]
+        return build_array_value(kind, keys, arrays)
+
+    def _load_array(self, name: str) -> Any:
+        """Memory-map an array of a stored node, or read it.
+
+        A new array is returned on each call, so changing it does not change the
+        arrays returned later.
+        """
+        from aiida_workgraph.orm.general_data import get_object_location
+
+        if self.is_stored:
+            location = get_object_location(self, f"{name}.npy")
+            if location is not None:
+                array = load_npy(location[0], location[1])
+                if array is not None:
+                    return array
+        return self.get_array(name)
@@ -7,10 +7,11 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
-"""`Data` sub class to represent a list."""
+"""`Data` sub class to represent an ASE Atoms."""
 
 from aiida.orm import Data
 from ase import Atoms
+from .compression import COMPRESSION_ATTRIBUTE, compress, decompress
 
 __all__ = ("AtomsData",)
 
@@ -86,7 +87,29 @@ class AtomsData(Data):
             filename = "atoms.pkl"
             # Open a handle in binary read mode as the arrays are written as binary files as well
             with self.base.repository.open(filename, mode="rb") as f:
-                return pickle.loads(f.read())  # pylint: disable=unexpected-keyword-arg
+                data = decompress(
+                    f.read(), self.base.attributes.get(COMPRESSION_ATTRIBUTE, None)
+                )
+                data = pickle.loads(data)  # pylint: disable=unexpected-keyword-arg
+            # the nodes stored before the columnar layout pickle the whole atoms
+            if isinstance(data, Atoms):
+                return data
+            atoms = Atoms(
+                numbers=self.get_array("numbers"),
+                positions=self.get_array("positions"),
+                cell=self.get_array("cell"),
+                pbc=self.get_array("pbc"),
+                celldisp=data["celldisp"],
+                constraint=data["constraints"],
+                info=data["info"],
+            )
+            for name in self.get_arraynames():
+                if name not in atoms.arrays and name not in ("cell", "pbc"):
+                    atoms.new_array(name, self.get_array(name))
+            for name, value in data["arrays"].items():
+                atoms.new_array(name, value)
+            atoms.calc = data["calc"]
+            return atoms
 
         # Return with proper caching if the node is stored, otherwise always re-read from disk
         if not self.is_stored:
@@ -100,16 +123,91 @@ class AtomsData(Data):
     def set_atoms(self, atoms):
         """Set the contents of this node.
 
+        The arrays of the atoms, the cell and the pbc are stored as `.npy` files,
+        so they can be read one by one, see `get_array`. The other contents are
+        pickled. The shape of the structure is stored in the attributes for
+        querying purposes.
+
         :param atoms: the atoms to set
         """
+        import io
         import pickle
+        import numpy as np
 
         if not isinstance(atoms, Atoms):
             raise TypeError("Must supply Atoms type")
-        self.base.repository.put_object_from_bytes(pickle.dumps(atoms), "atoms.pkl")
-        formula = atoms.get_chemical_formula()
-        # Store the array name and shape for querying purposes
-        self.base.attributes.set("formula", formula)
+        self.base.repository.erase()
+        arrays = {"cell": atoms.cell.array, "pbc": atoms.pbc}
+        pickled_arrays = {}
+        for name, array in atoms.arrays.items():
+            if array.dtype.hasobject:
+                pickled_arrays[name] = array
+            else:
+                arrays[name] = array
+        for name, array in arrays.items():
+            handle = io.BytesIO()
+            np.save(handle, array, allow_pickle=False)
+            self.base.repository.put_object_from_bytes(handle.getvalue(), f"{name}.npy")
+        data = {
+            "arrays": pickled_arrays,
+            "celldisp": atoms.get_celldisp(),
+            "constraints": atoms.constraints,
+            "info": atoms.info,
+            "calc": atoms.calc,
+        }
+        data, compression = compress(pickle.dumps(data))
+        self.base.repository.put_object_from_bytes(data, "atoms.pkl")
+        self.base.attributes.set(COMPRESSION_ATTRIBUTE, compression)
+        self.base.attributes.set(
+            "arrays", {name: list(array.shape) for name, array in arrays.items()}
+        )
+        # Store the shape of the structure for querying purposes
+        self.base.attributes.set("formula", atoms.get_chemical_formula())
+        self.base.attributes.set("natoms", len(atoms))
+        self.base.attributes.set("elements", sorted(set(atoms.get_chemical_symbols())))
+        self.base.attributes.set("cell", atoms.cell.array.tolist())
+        self.base.attributes.set("pbc", atoms.pbc.tolist())
+        self.base.attributes.set("volume", float(abs(np.linalg.det(atoms.cell.array))))
+
+    def get_arraynames(self):
+        """Return the names of the arrays stored as `.npy` files."""
+        return list(self.base.attributes.get("arrays", {}))
+
+    def get_array(self, name):
+        """Return an array of the atoms, without reading the other contents.
+
+        The arrays of a stored node are memory-mapped from the disk object store
+        when it is possible.
+
+        :param name: the name of the array, e.g. "numbers", "positions", "cell" or "pbc"
+        :return: a numpy array
+        """
+        import io
+        import numpy as np
+        from .array import load_npy
+        from .general_data import get_object_location
+
+        if name not in self.base.attributes.get("arrays", {}):
+            raise KeyError(f"Array {name} is not stored in this node.")
+        filename = f"{name}.npy"
+        if self.is_stored:
+            location = get_object_location(self, filename)
+            if location is not None:
+                array = load_npy(location[0], location[1])
+                if array is not None:
+                    return array
+        with self.base.repository.open(filename, mode="rb") as f:
+            return np.load(io.BytesIO(f.read()), allow_pickle=False)
+
+    @property
+    def numbers(self):
+        """Return the atomic numbers, without reading the other contents."""
+        return self.get_array("numbers")
+
+    @property
+    def positions(self):
+        """Return the positions, without reading the other contents."""
+        return self.get_array("positions")
 
     def _using_atoms_reference(self):
         """
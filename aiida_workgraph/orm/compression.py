@@ -0,0 +1,121 @@
+"""Transparent compression of the payloads of the data nodes.
+
+The payloads are compressed when they are stored, and the method is recorded in
+the ``compression`` attribute of the node, so they are decompressed when read.
+``zstandard`` and ``lz4`` are optional, installed with the ``compression`` extra,
+and the payloads are only compressed by default when one of them is installed.
+A payload which does not compress well is stored as it is.
+
+The compression is configured for the current python process, e.g. in the script
+which creates the nodes::
+
+    from aiida_workgraph.orm import compression
+
+    compression.COMPRESSION = "zlib"  # or "zstd", "lz4", None to disable it
+    compression.COMPRESSION_THRESHOLD = 1 << 16
+"""
+
+from typing import Optional, Tuple
+
+# the method of the compression, "auto" chooses zstd or lz4 by the size of the
+# payload, None stores the payloads as they are
+COMPRESSION: Optional[str] = "auto"
+# the payloads smaller than this are stored as they are
+COMPRESSION_THRESHOLD = 1 << 20
+# the payloads larger than this are compressed with the fastest method, lz4
+FAST_COMPRESSION_THRESHOLD = 1 << 28
+# the compressed payloads larger than this fraction of the payload are not kept
+MAX_COMPRESSION_RATIO = 0.9
+# the name of the attribute which records the method
+COMPRESSION_ATTRIBUTE = "compression"
+
+
+def _is_available(method: str) -> bool:
+    try:
+        if method == "zstd":
+            import zstandard  # noqa: F401
+        elif method == "lz4":
+            import lz4.frame  # noqa: F401
+        elif method != "zlib":
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def choose_method(size: int) -> Optional[str]:
+    """Choose the method of the compression of a payload of `size` bytes.
+
+    The "auto" method does not fall back to zlib, which is too slow for the large
+    payloads.
+
+    Returns:
+        str: the method, None if the payload is stored as it is.
+    """
+    if COMPRESSION is None or size < COMPRESSION_THRESHOLD:
+        return None
+    if COMPRESSION != "auto":
+        return COMPRESSION
+    methods = ["lz4", "zstd"] if size >= FAST_COMPRESSION_THRESHOLD else ["zstd", "lz4"]
+    for method in methods:
+        if _is_available(method):
+            return method
+    return None
+
+
+def compress(
+    data: bytes, method: Optional[str] = "auto"
+) -> Tuple[bytes, Optional[str]]:
+    """Compress the data.
+
+    Args:
+        data (bytes): the payload.
+        method (str): the method, "zstd", "lz4" or "zlib", "auto" chooses it by
+            the size of the payload, see `choose_method`.
+
+    Returns:
+        tuple: the compressed payload and the method, None if it is not compressed,
+            also when the payload does not compress well, see `MAX_COMPRESSION_RATIO`.
+    """
+    if method == "auto":
+        method = choose_method(len(data))
+    if method is None:
+        return data, None
+    if method == "zstd":
+        import zstandard
+
+        compressed = zstandard.ZstdCompressor(level=3).compress(data)
+    elif method == "lz4":
+        import lz4.frame
+
+        compressed = lz4.frame.compress(data)
+    elif method == "zlib":
+        import zlib
+
+        compressed = zlib.compress(data, 1)
+    else:
+        raise ValueError(f"Unknown compression method: {method}")
+    if len(compressed) > len(data) * MAX_COMPRESSION_RATIO:
+        return data, None
+    return compressed, method
+
+
+def decompress(data: bytes, method: Optional[str]) -> bytes:
+    """Decompress the data, which is compressed with `method`."""
+    if method is None:
+        return data
+    if not _is_available(method):
+        raise ValueError(
+            f"The data is compressed with {method}, which is not installed."
+        )
+    if method == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    if method == "lz4":
+        import lz4.frame
+
+        return lz4.frame.decompress(data)
+    import zlib
+
+    return zlib.decompress(data)
@@ -1,6 +1,26 @@
 """`Data` sub class to represent any data using pickle."""
 
+from collections import OrderedDict
+import functools
+import weakref
+from typing import Any, Optional, Tuple
 from aiida import orm
+from .compression import COMPRESSION_ATTRIBUTE, compress, decompress
+
+# the values of the stored nodes are cached on the node instances, like the atoms of
+# `AtomsData`; the cached values of all the instances are bounded by an LRU, keyed by
+# the id of the instance, with the weak reference of the instance and the size of
+# the pickled value
+_VALUE_CACHE: "OrderedDict[int, Tuple[weakref.ref, int]]" = OrderedDict()
+_VALUE_CACHE_SIZE = 128
+_VALUE_CACHE_MAX_BYTES = 1 << 30
+_value_cache_bytes = 0
+# the pickled data larger than this is memory-mapped from the object store
+MMAP_THRESHOLD = 1 << 24
+# the major versions of aiida-core and disk-objectstore whose private attributes
+# are used to locate the objects on the disk, see `get_object_location`
+MAPPED_AIIDA_VERSIONS = ("2",)
+MAPPED_DISK_OBJECTSTORE_VERSIONS = ("1",)
 
 
 class Dict(orm.Dict):
@@ -18,6 +38,8 @@ class List(orm.List):
 class GeneralData(orm.Data):
     """`Data to represent a pickled value."""
 
+    _cached_value = None
+
     def __init__(self, value=None, **kwargs):
         """Initialise a ``General`` node instance.
 
@@ -44,18 +66,35 @@ class GeneralData(orm.Data):
     def get_value(self):
         """Return the contents of this node.
 
+        The value of a stored node is read once and cached on the node, so changing
+        the value in place does not change the value of the nodes loaded again.
+
         :return: a value
         """
         import cloudpickle as pickle
 
-        def get_value_from_file(self):
-            filename = "value.pkl"
-            # Open a handle in binary read mode as the arrays are written as binary files as well
-            with self.base.repository.open(filename, mode="rb") as f:
-                return pickle.loads(f.read())  # pylint: disable=unexpected-keyword-arg
-
-        # Return with proper caching if the node is stored, otherwise always re-read from disk
-        return get_value_from_file(self)
+        if not self.is_stored:
+            return pickle.loads(self._read_data())
+        entry = _VALUE_CACHE.get(id(self))
+        if entry is not None and entry[0]() is self:
+            _VALUE_CACHE.move_to_end(id(self))
+            return self._cached_value
+        mapped = _load_mapped_object(self, "value.pkl")
+        if mapped is not None:
+            value, size = mapped
+        else:
+            data = self._read_data()
+            value, size = pickle.loads(data), len(data)
+        _cache_value(self, value, size)
+        return value
+
+    def _read_data(self) -> bytes:
+        """Read and decompress the pickled data of the value."""
+        # Open a handle in binary read mode as the arrays are written as binary files as well
+        with self.base.repository.open("value.pkl", mode="rb") as f:
+            return decompress(
+                f.read(), self.base.attributes.get(COMPRESSION_ATTRIBUTE, None)
+            )
 
     def set_value(self, value):
         """Set the contents of this node.
@@ -65,7 +104,9 @@ class GeneralData(orm.Data):
         import cloudpickle as pickle
         import sys
 
-        self.base.repository.put_object_from_bytes(pickle.dumps(value), "value.pkl")
+        data, compression = compress(pickle.dumps(value))
+        self.base.repository.put_object_from_bytes(data, "value.pkl")
+        self.base.attributes.set(COMPRESSION_ATTRIBUTE, compression)
         python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
         self.base.attributes.set("python_version", python_version)
 
@@ -83,3 +124,118 @@ class GeneralData(orm.Data):
         :rtype: bool
         """
         return self.is_stored
+
+
+def _cache_value(node: orm.Node, value: Any, size: int) -> None:
+    """Cache the value on the node, and evict the least recently used values."""
+    global _value_cache_bytes
+
+    if size > _VALUE_CACHE_MAX_BYTES:
+        return
+    key = id(node)
+    _uncache_value(key)
+    node._cached_value = value
+    _VALUE_CACHE[key] = (
+        weakref.ref(node, functools.partial(_uncache_value, key)),
+        size,
+    )
+    _value_cache_bytes += size
+    while (
+        len(_VALUE_CACHE) > _VALUE_CACHE_SIZE
+        or _value_cache_bytes > _VALUE_CACHE_MAX_BYTES
+    ):
+        _uncache_value(next(iter(_VALUE_CACHE)))
+
+
+def _uncache_value(key: int, ref: Optional[weakref.ref] = None) -> None:
+    """Remove a value from the cache, also called when its node is garbage collected."""
+    global _value_cache_bytes
+
+    entry = _VALUE_CACHE.get(key)
+    # the id of a collected node can be reused by a new node
+    if entry is None or (ref is not None and entry[0] is not ref):
+        return
+    del _VALUE_CACHE[key]
+    _value_cache_bytes -= entry[1]
+    node = entry[0]()
+    if node is not None:
+        node._cached_value = None
+
+
+def get_object_location(
+    node: orm.Node, filename: str
+) -> Optional[Tuple[str, int, int]]:
+    """Get the location of an object of the repository of a stored node on the disk.
+
+    This is only possible for the objects of the disk object store which are not
+    compressed, i.e. the loose objects and the uncompressed objects of the packs.
+    The object store has no public API for the paths of its files, so the objects
+    are only located with the versions of aiida-core and disk-objectstore listed in
+    `MAPPED_AIIDA_VERSIONS` and `MAPPED_DISK_OBJECTSTORE_VERSIONS`.
+
+    Returns:
+        tuple: the path of the file, the offset and the length of the object in the
+            file, None if the object can not be located.
+    """
+    if not _is_object_store_supported():
+        return None
+    try:
+        key = node.base.repository.get_object(filename).key
+        container = node.backend.get_repository()._container
+        meta = container.get_object_meta(key)
+        if meta["type"].value == "loose":
+            return str(container._get_loose_path_from_hashkey(key)), 0, meta["size"]
+        if not meta["pack_compressed"]:
+            path = container._get_pack_path_from_pack_id(meta["pack_id"])
+            return str(path), meta["pack_offset"], meta["pack_length"]
+    except Exception:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _is_object_store_supported() -> bool:
+    """Check if the private attributes of the object store are known for the installed versions."""
+    import aiida
+
+    try:
+        import disk_objectstore
+    except ImportError:
+        return False
+    return (
+        aiida.__version__.split(".")[0] in MAPPED_AIIDA_VERSIONS
+        and disk_objectstore.__version__.split(".")[0]
+        in MAPPED_DISK_OBJECTSTORE_VERSIONS
+    )
+
+
+def _load_mapped_object(node: orm.Node, filename: str) -> Optional[Tuple[Any, int]]:
+    """Unpickle a large object of the repository of a stored node from a memory map.
+
+    The object is mapped from the file of the disk object store, so it is not read
+    into memory before it is unpickled, see `get_object_location`. The compressed
+    objects are not mapped.
+
+    Returns:
+        tuple: the value and the size of the object, None if the object is small,
+            compressed, or can not be mapped.
+    """
+    import mmap
+    import cloudpickle as pickle
+
+    if node.base.attributes.get(COMPRESSION_ATTRIBUTE, None) is not None:
+        return None
+    location = get_object_location(node, filename)
+    if location is None or location[2] < MMAP_THRESHOLD:
+        return None
+    path, offset, length = location
+    # the offset of a memory map must be a multiple of the allocation granularity
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with open(path, "rb") as handle, mmap.mmap(
+        handle.fileno(),
+        offset + length - start,
+        offset=start,
+        access=mmap.ACCESS_READ,
+    ) as mapped:
+        with memoryview(mapped) as view, view[offset - start :] as data:
+            return pickle.loads(data), length
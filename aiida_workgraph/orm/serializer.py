@@ -1,29 +1,118 @@
 from .general_data import GeneralData
+from .array import NumpyArrayData, get_array_layout
 from aiida import orm, common
-from importlib.metadata import entry_points
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
 
+# the entry points of 'aiida.data', keyed by name, see `get_data_entry_points`
+_DATA_ENTRY_POINTS: Optional[Dict[str, Any]] = None
+# reuse the stored nodes with the same content, instead of storing new nodes, see `store_node`
+DEDUPLICATE = False
 
-# Retrieve the entry points for 'aiida.data' and store them in a dictionary
-eps = {ep.name: ep for ep in entry_points().get("aiida.data", [])}
 
+def get_data_entry_points() -> Dict[str, Any]:
+    """Get the entry points of 'aiida.data', keyed by name.
 
-def serialize_to_aiida_nodes(inputs: dict = None) -> dict:
+    The entry points are only scanned on first use, and cached afterwards."""
+    global _DATA_ENTRY_POINTS
+    from importlib.metadata import entry_points
+
+    if _DATA_ENTRY_POINTS is None:
+        eps = entry_points()
+        if hasattr(eps, "select"):
+            group = eps.select(group="aiida.data")
+        else:
+            group = eps.get("aiida.data", [])
+        _DATA_ENTRY_POINTS = {ep.name: ep for ep in group}
+    return _DATA_ENTRY_POINTS
+
+
+def serialize_to_aiida_nodes(
+    inputs: dict = None, deduplicate: Optional[bool] = None
+) -> dict:
     """Serialize the inputs to a dictionary of AiiDA data nodes.
 
     Args:
         inputs (dict): The inputs to be serialized.
+        deduplicate (bool): Reuse the stored nodes with the same content, defaults
+            to `DEDUPLICATE`.
 
     Returns:
         dict: The serialized inputs.
     """
     new_inputs = {}
     # save all kwargs to inputs port
-    for key, data in inputs.items():
-        new_inputs[key] = general_serializer(data)
+    with batch_store():
+        for key, data in inputs.items():
+            new_inputs[key] = general_serializer(data, deduplicate=deduplicate)
     return new_inputs
 
 
+@contextmanager
+def batch_store() -> Iterator[None]:
+    """Store the nodes which are stored in the context in one transaction.
+
+    The database commits once for all the nodes, instead of once per node. If an
+    exception is raised in the context, none of the nodes are stored.
+    """
+    from aiida.manage import get_manager
+
+    with get_manager().get_profile_storage().transaction():
+        yield
+
+
+def get_content_label(node: orm.Data) -> Optional[str]:
+    """The label of a node stored by `store_node`, from the hash of its type and content.
+
+    The label is an indexed column, unlike the extras, so the node is found by an
+    index lookup.
+    """
+    from aiida.common.hashing import make_hash
+
+    try:
+        return f"workgraph_content_{make_hash(node.base.caching.get_objects_to_hash())}"
+    except common.HashingError:
+        return None
+
+
+def find_same_node(node: orm.Data) -> Optional[orm.Data]:
+    """Find a stored node with the same type and content as an unstored node.
+
+    Only the nodes stored by `store_node` with `deduplicate` are found, by their
+    label, see `get_content_label`. The content of the stored nodes is not read.
+    """
+    from contextlib import nullcontext
+    from aiida.manage import get_manager
+
+    label = get_content_label(node)
+    if label is None:
+        return None
+    builder = orm.QueryBuilder()
+    builder.append(node.__class__, filters={"label": label}, subclassing=False)
+    # the unstored node is not flushed to the database by the query
+    storage = get_manager().get_profile_storage()
+    session = storage.get_session() if hasattr(storage, "get_session") else None
+    with session.no_autoflush if session is not None else nullcontext():
+        return builder.first(flat=True)
+
+
+def store_node(node: orm.Data, deduplicate: Optional[bool] = None) -> orm.Data:
+    """Store the node, or return a stored node with the same content.
+
+    Args:
+        node (orm.Data): The node to store.
+        deduplicate (bool): Reuse a stored node with the same content, defaults
+            to `DEDUPLICATE`. The node is stored with the label of its content.
+    """
+    if DEDUPLICATE if deduplicate is None else deduplicate:
+        same_node = find_same_node(node)
+        if same_node is not None:
+            return same_node
+        if not node.label:
+            node.label = get_content_label(node) or ""
+    return node.store()
+
+
 def clean_dict_key(data):
     """Replace "." with "__dot__" in the keys of a dictionary."""
     if isinstance(data, dict):
@@ -31,8 +120,13 @@ def clean_dict_key(data):
     return data
 
 
-def general_serializer(data: Any, check_value=True) -> orm.Node:
-    """Serialize the data to an AiiDA data node."""
+def general_serializer(
+    data: Any, check_value=True, deduplicate: Optional[bool] = None
+) -> orm.Node:
+    """Serialize the data to an AiiDA data node.
+
+    The new nodes are stored, see `store_node` for `deduplicate`.
+    """
     if isinstance(data, orm.Data):
         if check_value and not hasattr(data, "value"):
             raise ValueError("Only AiiDA data Node with a value attribute is allowed.")
@@ -47,10 +141,17 @@ def general_serializer(data: Any, check_value=True) -> orm.Node:
     # for example, an Atoms will have ase.atoms.Atoms
     else:
         data = clean_dict_key(data)
+        # numpy arrays are stored as .npy files, which are read without unpickling
+        if get_array_layout(data) is not None:
+            try:
+                return store_node(NumpyArrayData(data), deduplicate)
+            except Exception:
+                pass
         # try to get the serializer from the entry points
         data_type = type(data)
         ep_key = f"{data_type.__module__}.{data_type.__name__}"
         # search for the key in the entry points
+        eps = get_data_entry_points()
         if ep_key in eps:
             try:
                 new_node = eps[ep_key].load()(data)
@@ -59,21 +160,16 @@ def general_serializer(data: Any, check_value=True) -> orm.Node:
             finally:
                 # try to save the node to da
                 try:
-                    new_node.store()
-                    return new_node
+                    return store_node(new_node, deduplicate)
                 except Exception:
                     # try to serialize the value as a GeneralData
                     try:
-                        new_node = GeneralData(data)
-                        new_node.store()
-                        return new_node
+                        return store_node(GeneralData(data), deduplicate)
                     except Exception as e:
                         raise ValueError(f"Error in serializing {ep_key}: {e}")
         else:
             # try to serialize the data as a GeneralData
             try:
-                new_node = GeneralData(data)
-                new_node.store()
-                return new_node
+                return store_node(GeneralData(data), deduplicate)
             except Exception as e:
                 raise ValueError(f"Error in serializing {ep_key}: {e}")
@@ -1,3 +1,3 @@
-from node_graph.utils import get_entries
+from aiida_workgraph.utils import EntryPointPool
 
-property_pool = get_entries(entry_point_name="aiida_workgraph.property")
+property_pool = EntryPointPool(entry_point_name="aiida_workgraph.property")
@@ -1,4 +1,4 @@
-from typing import Any, Type
+from typing import Any, Callable, Optional, Type
 from node_graph.socket import NodeSocket
 from aiida_workgraph.property import TaskProperty
 
@@ -9,6 +9,20 @@ class TaskSocket(NodeSocket):
     # use TaskProperty from aiida_workgraph.property
     # to override the default NodeProperty from node_graph
     node_property = TaskProperty
+    # load the value on first access, e.g. the output of a finished task
+    _value_loader: Optional[Callable[[], Any]] = None
+
+    @property
+    def value(self) -> Any:
+        if self._value_loader is not None:
+            loader, self._value_loader = self._value_loader, None
+            self.property.value = loader()
+        return self.property.value
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        self._value_loader = None
+        self.property.value = value
 
 
 def build_socket_from_AiiDA(DataClass: Type[Any]) -> Type[TaskSocket]:
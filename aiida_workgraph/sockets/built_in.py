@@ -29,6 +29,16 @@ class SocketGeneral(TaskSocket, SerializePickle):
         self.add_property("General", name, **kwargs)
 
 
+class SocketStream(SocketGeneral):
+    """Stream socket.
+
+    The task yields the items of the stream one by one, and a copy of each
+    downstream task is launched as soon as an item is available.
+    """
+
+    identifier: str = "Stream"
+
+
 class SocketAiiDAFloat(TaskSocket, SerializeJson):
     """AiiDAFloat socket."""
 
@@ -139,6 +149,7 @@ class SocketAiiDAFloatVector(TaskSocket, SerializeJson):
 
 socket_list = [
     SocketGeneral,
+    SocketStream,
     SocketInt,
     SocketFloat,
     SocketString,
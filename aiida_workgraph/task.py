@@ -1,14 +1,16 @@
 from node_graph.node import Node as GraphNode
 from aiida_workgraph.properties import property_pool
 from aiida_workgraph.sockets import socket_pool
-from aiida_workgraph.widget import NodeGraphWidget
 from aiida_workgraph.collection import (
     WorkGraphPropertyCollection,
     WorkGraphInputSocketCollection,
     WorkGraphOutputSocketCollection,
 )
 import aiida
-from typing import Any, Dict, Optional, Union, Callable, List
+from typing import Any, Dict, Optional, Union, Callable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiida_workgraph.widget import NodeGraphWidget
 
 
 class Task(GraphNode):
@@ -21,17 +23,38 @@ class Task(GraphNode):
     property_pool = property_pool
     socket_pool = socket_pool
     is_aiida_component = False
+    # the data prepared for the process, with a snapshot of the values it was built from
+    _prepared = None
+    # the attributes updated from the process, which are set on the prepared data
+    # without building it again
+    _runtime_attributes = {
+        "state",
+        "action",
+        "process",
+        "pk",
+        "ctime",
+        "mtime",
+        "_process",
+        "_node",
+        "_lazy_node",
+        "_task_widget",
+    }
 
     def __init__(
         self,
         to_context: Optional[List[Any]] = None,
-        wait: List[Union[str, GraphNode]] = [],
+        wait: Optional[List[Union[str, GraphNode]]] = None,
         process: Optional[aiida.orm.ProcessNode] = None,
         pk: Optional[int] = None,
+        timeout: Optional[float] = None,
         **kwargs: Any
     ) -> None:
         """
         Initialize a Task instance.
+
+        Args:
+            timeout (float, optional): The maximum wall-clock time in seconds the task may run,
+                before it is killed and marked as TIMED_OUT.
         """
         super().__init__(
             property_collection_class=WorkGraphPropertyCollection,
@@ -41,27 +64,144 @@ class Task(GraphNode):
         )
         self.to_context = [] if to_context is None else to_context
         self.wait = [] if wait is None else wait
+        self._lazy_node = None
+        self._node = None
         self.process = process
         self.pk = pk
-        self._widget = NodeGraphWidget(
-            settings={"minmap": False},
-            style={"width": "80%", "height": "600px"},
-        )
+        self.timeout = timeout
+        # the widget is created when the task is displayed
+        self._task_widget = None
         self.state = "PLANNED"
         self.action = ""
 
-    def to_dict(self) -> Dict[str, Any]:
-        tdata = super().to_dict()
+    def __setattr__(self, name: str, value: Any) -> None:
+        # a new attribute value invalidates the prepared data
+        if name not in self._runtime_attributes:
+            object.__setattr__(self, "_prepared", None)
+        super().__setattr__(name, value)
+
+    @property
+    def _widget(self) -> "NodeGraphWidget":
+        if self._task_widget is None:
+            from aiida_workgraph.widget import NodeGraphWidget
+
+            self._task_widget = NodeGraphWidget(
+                settings={"minmap": False},
+                style={"width": "80%", "height": "600px"},
+            )
+        return self._task_widget
+
+    @property
+    def process(self) -> Optional[aiida.orm.ProcessNode]:
+        """The process node of the task."""
+        self._load_lazy_node()
+        return self._process
+
+    @process.setter
+    def process(self, value: Optional[aiida.orm.ProcessNode]) -> None:
+        self._lazy_node = None
+        self._process = value
+
+    @property
+    def node(self) -> Optional[aiida.orm.Node]:
+        """The process or data node created by the task."""
+        self._load_lazy_node()
+        return self._node
+
+    @node.setter
+    def node(self, value: Optional[aiida.orm.Node]) -> None:
+        self._lazy_node = None
+        self._node = value
+
+    def set_node_pk(self, pk: int, is_process: bool = True) -> None:
+        """Set the node of the task by its pk, it is loaded on first access."""
+        self.pk = pk
+        self._lazy_node = (pk, is_process)
+
+    def _load_lazy_node(self) -> None:
+        if self._lazy_node is None:
+            return
+        pk, is_process = self._lazy_node
+        self._lazy_node = None
+        self._node = aiida.orm.load_node(pk)
+        if is_process:
+            self._process = self._node
+
+    def to_dict(self, short: bool = False) -> Dict[str, Any]:
+        tdata = super().to_dict(short=short)
+        if short:
+            return tdata
         tdata["to_context"] = [] if self.to_context is None else self.to_context
         tdata["wait"] = [
             task if isinstance(task, str) else task.name for task in self.wait
         ]
         tdata["process"] = self.process.uuid if self.process else None
+        tdata["timeout"] = self.timeout
         tdata["metadata"]["pk"] = self.process.pk if self.process else None
         tdata["metadata"]["is_aiida_component"] = self.is_aiida_component
 
         return tdata
 
+    def _get_mutable_state(self) -> List[Any]:
+        """The values used by `to_dict`, which can be changed in place."""
+        return [
+            [prop.value for prop in self.properties],
+            [
+                None if input.property is None else input.property.value
+                for input in self.inputs
+            ],
+            [
+                [
+                    (
+                        link.from_node.name,
+                        link.from_socket.name,
+                        link.to_node.name,
+                        link.to_socket.name,
+                    )
+                    for link in socket.links
+                ]
+                for sockets in [
+                    self.inputs,
+                    self.outputs,
+                    self.ctrl_inputs,
+                    self.ctrl_outputs,
+                ]
+                for socket in sockets
+            ],
+            [task if isinstance(task, str) else task.name for task in self.wait],
+            self.to_context,
+            self.position,
+        ]
+
+    def to_prepared_dict(self) -> Dict[str, Any]:
+        """Export the task like `to_dict`, with the properties merged and serialized for the process.
+
+        The result is cached, and only built again when an attribute of the task is set, or a
+        property value, including an object changed in place, or a link changed, so the
+        unchanged tasks are not serialized again when the workgraph is saved. The state and
+        the process of the task are set on the cached data.
+        """
+        from aiida_workgraph.utils import (
+            copy_containers,
+            is_unchanged,
+            merge_task_properties,
+            serialize_pythonjob_task_properties,
+            take_snapshot,
+        )
+
+        state = self._get_mutable_state()
+        if self._prepared is None or not is_unchanged(self._prepared[0], state):
+            tdata = self.to_dict()
+            merge_task_properties(tdata)
+            serialize_pythonjob_task_properties(tdata)
+            object.__setattr__(self, "_prepared", (take_snapshot(state), tdata))
+        tdata = copy_containers(self._prepared[1])
+        tdata["state"] = self.state
+        tdata["action"] = self.action
+        tdata["process"] = self.process.uuid if self.process else None
+        tdata["metadata"]["pk"] = self.process.pk if self.process else None
+        return tdata
+
     def set_from_protocol(self, *args: Any, **kwargs: Any) -> None:
         """Set the task inputs from protocol data."""
         from aiida_workgraph.utils import get_executor, get_dict_from_builder
@@ -99,6 +239,7 @@ class Task(GraphNode):
         task.to_context = data.get("to_context", [])
         task.wait = data.get("wait", [])
         task.process = data.get("process", None)
+        task.timeout = data.get("timeout", None)
 
         return task
 
@@ -1,4 +1,4 @@
-from node_graph.utils import get_entries
+from aiida_workgraph.utils import EntryPointPool
 from .builtin import AiiDAGather, AiiDAToCtx, AiiDAFromCtx
 from .test import (
     AiiDAInt,
@@ -40,5 +40,5 @@ task_list = [
 ]
 
 
-# should after task_list, otherwise circular import
-task_pool = get_entries(entry_point_name="aiida_workgraph.task")
+# loaded on first use, the entry point of the built-in tasks is this module
+task_pool = EntryPointPool(entry_point_name="aiida_workgraph.task")
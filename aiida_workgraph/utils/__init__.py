@@ -1,12 +1,77 @@
-from typing import Any, Dict, Optional, Union, Callable
-from aiida.engine.processes import Process
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Union, Callable, TYPE_CHECKING
 from aiida import orm
 from aiida.common.exceptions import NotExistent
-from aiida.engine.runners import Runner
 
+if TYPE_CHECKING:
+    # `aiida.engine` is slow to import, it is only imported when it is used
+    from aiida.engine.processes import Process
+    from aiida.engine.runners import Runner
 
-def get_executor(data: Dict[str, Any]) -> Union[Process, Any]:
-    """Import executor from path and return the executor and type."""
+
+# the pickled executors loaded last, keyed by their hash
+_EXECUTOR_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_EXECUTOR_CACHE_SIZE = 128
+# name of the attribute of a function with its serialized data
+_SERIALIZED_FUNCTION_KEY = "_workgraph_executor"
+# the attributes set on a function by the task decorators
+_DECORATOR_ATTRIBUTES = (
+    "identifier",
+    "task",
+    "node",
+    "tdata",
+    _SERIALIZED_FUNCTION_KEY,
+)
+
+
+class EntryPointPool(Mapping):
+    """The items registered under an entry point group, e.g. the task classes.
+
+    The entry points are only scanned and loaded when the pool is first used, and
+    the result is cached, so importing the modules that define a pool stays fast.
+    """
+
+    def __init__(self, entry_point_name: str) -> None:
+        self.entry_point_name = entry_point_name
+        self._pool = None
+
+    @property
+    def pool(self) -> Dict[str, Any]:
+        if self._pool is None:
+            from node_graph.utils import get_entries
+
+            self._pool = get_entries(entry_point_name=self.entry_point_name)
+        return self._pool
+
+    def __getitem__(self, key: str) -> Any:
+        return self.pool[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.pool)
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.entry_point_name!r})"
+
+
+def get_executor_hash(data: Dict[str, Any]) -> Optional[str]:
+    """Get the content hash of a pickled executor, None if it is not pickled."""
+    import hashlib
+
+    if "hash" not in data:
+        if not isinstance(data.get("executor"), bytes):
+            return None
+        data["hash"] = hashlib.sha256(data["executor"]).hexdigest()
+    return data["hash"]
+
+
+def get_executor(data: Dict[str, Any]) -> Union["Process", Any]:
+    """Import executor from path and return the executor and type.
+
+    Pickled executors are unpickled once and cached by their content hash."""
     import importlib
     from aiida.plugins import CalculationFactory, WorkflowFactory, DataFactory
 
@@ -15,11 +80,19 @@ def get_executor(data: Dict[str, Any]) -> Union[Process, Any]:
     if is_pickle:
         import cloudpickle as pickle
 
+        executor_hash = get_executor_hash(data)
+        if executor_hash is not None and executor_hash in _EXECUTOR_CACHE:
+            _EXECUTOR_CACHE.move_to_end(executor_hash)
+            return _EXECUTOR_CACHE[executor_hash], type
         try:
             executor = pickle.loads(data["executor"])
         except Exception as e:
             print("Error in loading executor: ", e)
-            executor = None
+            return None, type
+        if executor_hash is not None:
+            _EXECUTOR_CACHE[executor_hash] = executor
+            if len(_EXECUTOR_CACHE) > _EXECUTOR_CACHE_SIZE:
+                _EXECUTOR_CACHE.popitem(last=False)
     else:
         if type == "WorkflowFactory":
             executor = WorkflowFactory(data["name"])
@@ -114,14 +187,116 @@ def merge_properties(wgdata: Dict[str, Any]) -> None:
                     "code": 1}}
     So that no "." in the key name.
     """
-    for name, task in wgdata["tasks"].items():
-        for key, prop in task["properties"].items():
-            if "." in key and prop["value"] not in [None, {}]:
-                root, key = key.split(".", 1)
-                update_nested_dict(
-                    task["properties"][root]["value"], key, prop["value"]
+    for task in wgdata["tasks"].values():
+        merge_task_properties(task)
+
+
+def merge_task_properties(task: Dict[str, Any]) -> None:
+    """Merge sub properties to the root properties of a task."""
+    for key, prop in task["properties"].items():
+        if "." in key and prop["value"] not in [None, {}]:
+            root, key = key.split(".", 1)
+            if task["properties"][root]["value"] is None:
+                task["properties"][root]["value"] = {}
+            update_nested_dict(task["properties"][root]["value"], key, prop["value"])
+            prop["value"] = None
+
+
+def copy_containers(value: Any) -> Any:
+    """Copy the nested dicts and lists of a value, but keep the other objects."""
+    if isinstance(value, dict):
+        return {key: copy_containers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_containers(item) for item in value]
+    return value
+
+
+class ValueSnapshot:
+    """The snapshot of an object which can be changed in place, e.g. an array."""
+
+    def __init__(self, value: Any) -> None:
+        from aiida_workgraph.utils.storage import hash_value
+
+        self.value = value
+        self.digest = hash_value(value)
+
+    def matches(self, value: Any) -> bool:
+        from aiida_workgraph.utils.storage import hash_value
+
+        return value is self.value and hash_value(value) == self.digest
+
+
+def take_snapshot(value: Any) -> Any:
+    """Take a snapshot of a value, to be compared with `is_unchanged`.
+
+    The dicts, lists and tuples are copied, the immutable scalars and the stored nodes are
+    kept, and the other objects are kept with the hash of their content.
+    """
+    from aiida.orm import Node
+
+    if isinstance(value, dict):
+        return {key: take_snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(take_snapshot(item) for item in value)
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return value
+    if isinstance(value, Node) and value.is_stored:
+        return value
+    return ValueSnapshot(value)
+
+
+def is_unchanged(snapshot: Any, value: Any) -> bool:
+    """Check if a value is the same as its snapshot taken with `copy_containers` or `take_snapshot`.
+
+    The dicts, lists and tuples are compared item by item, the immutable scalars by value, the
+    objects snapshotted with their content hash by identity and content, and the other
+    objects by identity.
+    """
+    if isinstance(snapshot, dict):
+        return (
+            isinstance(value, dict)
+            and snapshot.keys() == value.keys()
+            and all(is_unchanged(snapshot[key], value[key]) for key in snapshot)
+        )
+    if isinstance(snapshot, (list, tuple)):
+        return (
+            type(value) is type(snapshot)
+            and len(snapshot) == len(value)
+            and all(map(is_unchanged, snapshot, value))
+        )
+    if isinstance(snapshot, ValueSnapshot):
+        return snapshot.matches(value)
+    if isinstance(snapshot, (bool, int, float, complex, str, bytes)):
+        return type(snapshot) is type(value) and snapshot == value
+    return snapshot is value
+
+
+def get_parameter_table(
+    parameters: Union[Dict[str, Any], List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Get the columns of a parameter table.
+
+    Args:
+        parameters: the columns of the table, keyed by name, e.g. `{"add1.x": [1, 2]}`,
+            or a list of rows, e.g. `[{"add1.x": 1}, {"add1.x": 2}]`.
+
+    Returns:
+        dict: the columns of the table. The arrays, e.g. numpy arrays, are kept as they are.
+    """
+    if isinstance(parameters, (list, tuple)):
+        names = list(parameters[0].keys()) if parameters else []
+        for row in parameters:
+            if list(row.keys()) != names:
+                raise ValueError(
+                    f"All the rows must have the same parameters {names}, got {list(row.keys())}."
                 )
-                prop["value"] = None
+        parameters = {name: [row[name] for row in parameters] for name in names}
+    lengths = {len(values) for values in parameters.values()}
+    if len(lengths) > 1:
+        raise ValueError(
+            f"All the columns of the parameters must have the same length, got {sorted(lengths)}."
+        )
+    return dict(parameters)
 
 
 def generate_node_graph(pk: int) -> Any:
@@ -142,25 +317,9 @@ def build_task_link(wgdata: Dict[str, Any]) -> None:
     2) if it is a graph builder graph, expose the group inputs and outputs
     sockets.
     """
-    # reset task input links
-    for name, task in wgdata["tasks"].items():
-        for input in task["inputs"]:
-            input["links"] = []
-        for output in task["outputs"]:
-            output["links"] = []
-    for link in wgdata["links"]:
-        to_socket = [
-            socket
-            for socket in wgdata["tasks"][link["to_node"]]["inputs"]
-            if socket["name"] == link["to_socket"]
-        ][0]
-        from_socket = [
-            socket
-            for socket in wgdata["tasks"][link["from_node"]]["outputs"]
-            if socket["name"] == link["from_socket"]
-        ][0]
-        to_socket["links"].append(link)
-        from_socket["links"].append(link)
+    from aiida_workgraph.utils.ir import get_ir
+
+    get_ir(wgdata).bind_links(wgdata)
 
 
 def get_dict_from_builder(builder: Any) -> Dict:
@@ -175,15 +334,12 @@ def get_dict_from_builder(builder: Any) -> Dict:
 
 def get_workgraph_data(process: Union[int, orm.Node]) -> Optional[Dict[str, Any]]:
     """Get the workgraph data from the process node."""
-    from aiida.orm.utils.serialize import deserialize_unsafe
+    from aiida_workgraph.utils.storage import load_workgraph_data
     from aiida.orm import load_node
 
     if isinstance(process, int):
         process = load_node(process)
-    wgdata = process.base.extras.get("_workgraph", None)
-    if wgdata is None:
-        return
-    wgdata = deserialize_unsafe(wgdata)
+    wgdata = load_workgraph_data(process)
     return wgdata
 
 
@@ -266,17 +422,23 @@ def get_or_create_code(
 
 def serialize_pythonjob_properties(wgdata):
     """Serialize the PythonJob properties."""
-    from aiida_workgraph.orm.serializer import general_serializer
-
-    for _, task in wgdata["tasks"].items():
-        if not task["metadata"]["node_type"].upper() == "PYTHONJOB":
-            continue
-        # get the names kwargs for the PythonJob, which are the inputs before _wait
-        input_kwargs = []
-        for input in task["inputs"]:
-            if input["name"] == "_wait":
-                break
-            input_kwargs.append(input["name"])
+    for task in wgdata["tasks"].values():
+        serialize_pythonjob_task_properties(task)
+
+
+def serialize_pythonjob_task_properties(task: Dict[str, Any]) -> None:
+    """Serialize the properties of a PythonJob task."""
+    from aiida_workgraph.orm.serializer import batch_store, general_serializer
+
+    if not task["metadata"]["node_type"].upper() == "PYTHONJOB":
+        return
+    # get the names kwargs for the PythonJob, which are the inputs before _wait
+    input_kwargs = []
+    for input in task["inputs"]:
+        if input["name"] == "_wait":
+            break
+        input_kwargs.append(input["name"])
+    with batch_store():
         for name in input_kwargs:
             prop = task["properties"][name]
             # if value is not None, not {}
@@ -428,11 +590,11 @@ Please check!
 
 
 def create_and_pause_process(
-    runner: Runner = None,
+    runner: "Runner" = None,
     process_class: Callable = None,
     inputs: dict = None,
     state_msg: str = "",
-) -> Process:
+) -> "Process":
     from aiida.engine.utils import instantiate_process
 
     process_inited = instantiate_process(runner, process_class, **inputs)
@@ -496,9 +658,25 @@ def get_required_imports(func):
 
 
 def serialize_function(func: Callable) -> Dict[str, Any]:
-    """Serialize a function for storage or transmission."""
+    """Serialize a function for storage or transmission.
+
+    The result is cached on the function object, so a function is only serialized
+    once, however many tasks use it."""
+    cached = getattr(func, "__dict__", {}).get(_SERIALIZED_FUNCTION_KEY)
+    if cached is not None:
+        return cached
+    data = _serialize_function(func)
+    try:
+        setattr(func, _SERIALIZED_FUNCTION_KEY, data)
+    except AttributeError:
+        pass
+    return data
+
+
+def _serialize_function(func: Callable) -> Dict[str, Any]:
     import inspect
     import textwrap
+    import hashlib
     import cloudpickle as pickle
 
     # we need save the source code explicitly, because in the case of jupyter notebook,
@@ -526,8 +704,19 @@ def serialize_function(func: Callable) -> Dict[str, Any]:
         f"from {module} import {', '.join(types)}"
         for module, types in required_imports.items()
     )
+    # the attributes added by the decorators are not part of the function, and
+    # cloudpickle would pickle them with the functions defined in `__main__`
+    attributes = getattr(func, "__dict__", {})
+    removed = {
+        key: attributes.pop(key) for key in _DECORATOR_ATTRIBUTES if key in attributes
+    }
+    try:
+        executor = pickle.dumps(func)
+    finally:
+        attributes.update(removed)
     return {
-        "executor": pickle.dumps(func),
+        "executor": executor,
+        "hash": hashlib.sha256(executor).hexdigest(),
         "type": "function",
         "is_pickle": True,
         "function_name": func.__name__,
@@ -20,6 +20,7 @@ class WorkGraphSaver:
         self.process = process
         self.restart_process = restart_process
         self.wgdata = wgdata
+        self.task_hashes = None
         self.uuid = wgdata["uuid"]
         self.name = wgdata["name"]
         self.wait_to_link()
@@ -72,25 +73,9 @@ class WorkGraphSaver:
         1) workgraph links
 
         """
-        # reset task input links
-        for name, task in self.wgdata["tasks"].items():
-            for input in task["inputs"]:
-                input["links"] = []
-            for output in task["outputs"]:
-                output["links"] = []
-        for link in self.wgdata["links"]:
-            to_socket = [
-                socket
-                for socket in self.wgdata["tasks"][link["to_node"]]["inputs"]
-                if socket["name"] == link["to_socket"]
-            ][0]
-            from_socket = [
-                socket
-                for socket in self.wgdata["tasks"][link["from_node"]]["outputs"]
-                if socket["name"] == link["from_socket"]
-            ][0]
-            to_socket["links"].append(link)
-            from_socket["links"].append(link)
+        from aiida_workgraph.utils.ir import get_ir
+
+        get_ir(self.wgdata).bind_links(self.wgdata)
 
     def insert_workgraph_to_db(self) -> None:
         """Save a new workgraph in the database.
@@ -98,12 +83,12 @@ class WorkGraphSaver:
         - workgraph
         - all tasks
         """
-        from aiida.orm.utils.serialize import serialize
+        from aiida_workgraph.utils.storage import save_workgraph_data
 
         # pprint(self.wgdata)
         self.wgdata["created"] = datetime.datetime.utcnow()
         self.wgdata["lastUpdate"] = datetime.datetime.utcnow()
-        self.process.base.extras.set("_workgraph", serialize(self.wgdata))
+        save_workgraph_data(self.process, self.wgdata, self.task_hashes)
         self.save_task_states()
 
     def save_task_states(self) -> Dict:
@@ -154,14 +139,13 @@ class WorkGraphSaver:
     def get_wgdata_from_db(
         self, process: Optional[ProcessNode] = None
     ) -> Optional[Dict]:
-        from aiida.orm.utils.serialize import deserialize_unsafe
+        from aiida_workgraph.utils.storage import load_workgraph_data
 
         process = self.process if process is None else process
-        wgdata = process.base.extras.get("_workgraph", None)
+        wgdata = load_workgraph_data(process)
         if wgdata is None:
             print("No workgraph data found in the process node.")
             return
-        wgdata = deserialize_unsafe(wgdata)
         return wgdata
 
     def check_diff(
@@ -169,12 +153,43 @@ class WorkGraphSaver:
     ) -> Tuple[List[str], List[str], Dict]:
         """Find difference between workgraph and its database.
 
+        The content hashes of the tasks are compared with the ones stored in the
+        header, so an unchanged workgraph is detected from the Merkle root, and
+        the stored workgraph is not loaded. For the legacy storage, the stored
+        workgraph is compared using the `DifferenceAnalysis`.
+
         Returns:
             new_tasks: new tasks
             modified_tasks: modified tasks
         """
         from node_graph.analysis import DifferenceAnalysis
+        from aiida_workgraph.utils.storage import (
+            load_workgraph_header,
+            get_task_hashes,
+            get_merkle_root,
+        )
 
+        process = self.process if restart_process is None else restart_process
+        header = load_workgraph_header(process)
+        self.task_hashes = get_task_hashes(self.wgdata)
+        if header is not None and "merkle_root" in header:
+            hashes, metadata_hashes = self.task_hashes
+            new_tasks = set(hashes) - set(header["hashes"])
+            if get_merkle_root(hashes) == header["merkle_root"]:
+                modified_tasks = set()
+            else:
+                modified_tasks = {
+                    name
+                    for name, task_hash in hashes.items()
+                    if name in header["hashes"] and header["hashes"][name] != task_hash
+                }
+            update_metadata = {
+                name
+                for name, task_hash in metadata_hashes.items()
+                if name in header["metadata_hashes"]
+                and header["metadata_hashes"][name] != task_hash
+            }
+            return new_tasks, modified_tasks, update_metadata
         wg1 = self.get_wgdata_from_db(restart_process)
         dc = DifferenceAnalysis(nt1=wg1, nt2=self.wgdata)
         (
@@ -190,14 +205,224 @@ class WorkGraphSaver:
         Returns:
             bool: _description_
         """
-        if self.process.base.extras.get("_workgraph", None) is not None:
-            return True
-        return False
+        from aiida_workgraph.utils.storage import has_workgraph_data
+
+        return has_workgraph_data(self.process)
 
     def build_connectivity(self) -> None:
         """Analyze the connectivity of workgraph and save it into dict."""
         from node_graph.analysis import ConnectivityAnalysis
+        from aiida_workgraph.utils.ir import get_ir
 
         self.wgdata["nodes"] = self.wgdata["tasks"]
-        nc = ConnectivityAnalysis(self.wgdata)
-        self.wgdata["connectivity"] = nc.build_connectivity()
+        if self.wgdata.get("ctrl_links"):
+            nc = ConnectivityAnalysis(self.wgdata)
+            self.wgdata["connectivity"] = nc.build_connectivity()
+        else:
+            self.wgdata["connectivity"] = get_ir(self.wgdata).build_connectivity()
+
+
+def _uses_context(value) -> bool:
+    """Check if a property value refers to a context variable."""
+    if isinstance(value, dict):
+        return any(_uses_context(sub_value) for sub_value in value.values())
+    return (
+        isinstance(value, str)
+        and value.strip().startswith("{{")
+        and value.strip().endswith("}}")
+    )
+
+
+def get_task_dependencies(wgdata: Dict) -> List[Tuple[str, str]]:
+    """The dependencies between the tasks of a workgraph, from the links, the control
+    links and the `wait` lists, as `(upstream, downstream)` pairs."""
+    tasks = wgdata["tasks"]
+    dependencies = [
+        (link["from_node"], link["to_node"])
+        for link in wgdata["links"] + wgdata.get("ctrl_links", [])
+        if link["from_node"] in tasks and link["to_node"] in tasks
+    ]
+    for name, task in tasks.items():
+        for wait_task in task.get("wait", []):
+            if wait_task in tasks:
+                dependencies.append((wait_task, name))
+    return dependencies
+
+
+def partition_workgraph(wgdata: Dict, threshold: Optional[int]) -> List[List[str]]:
+    """Split the tasks of a workgraph into independently schedulable partitions.
+
+    Tasks are grouped into weakly connected components using the links and the
+    `wait` dependencies. A component larger than `threshold` is split into the
+    subtrees below a fan-out task and the tasks above them, see `split_below_fan_out`,
+    so that the links between its partitions only go downstream. Small components,
+    and the small subtrees below the same fan-out task, are packed together until
+    `threshold` tasks are reached.
+
+    A workgraph is not partitioned if it is smaller than the threshold, if it is
+    a `while` or `for` workgraph, or if its tasks share data through the context.
+
+    Args:
+        wgdata (dict): data of the workgraph.
+        threshold (int): the maximum number of tasks in a packed partition.
+
+    Returns:
+        list: a list of task names for each partition, empty if the workgraph
+        is not partitioned. A partition only depends on the partitions before it.
+    """
+    tasks = wgdata["tasks"]
+    if not threshold or len(tasks) <= threshold:
+        return []
+    if wgdata.get("workgraph_type", "NORMAL").upper() != "NORMAL":
+        return []
+    for task in tasks.values():
+        if task.get("to_context"):
+            return []
+        for prop in task.get("properties", {}).values():
+            if _uses_context(prop.get("value")):
+                return []
+    dependencies = get_task_dependencies(wgdata)
+    # union-find over the tasks
+    parent = {name: name for name in tasks}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    def union(name1: str, name2: str) -> None:
+        root1, root2 = find(name1), find(name2)
+        if root1 != root2:
+            parent[root2] = root1
+
+    for upstream, downstream in dependencies:
+        union(upstream, downstream)
+    components = {}
+    for name in tasks:
+        components.setdefault(find(name), []).append(name)
+    # pack the small components, largest first
+    partitions = []
+    small = []
+    for names in sorted(components.values(), key=len, reverse=True):
+        if len(names) > threshold:
+            partitions.extend(
+                split_below_fan_out(wgdata, names, threshold, dependencies)
+            )
+        else:
+            small.append(names)
+    partitions.extend(_pack(small, threshold))
+    if len(partitions) < 2:
+        return []
+    return partitions
+
+
+def split_below_fan_out(
+    wgdata: Dict,
+    names: List[str],
+    threshold: int,
+    dependencies: Optional[List[Tuple[str, str]]] = None,
+) -> List[List[str]]:
+    """Split a connected group of tasks into the subtrees below a fan-out task.
+
+    The first task, in topological order, with several downstream tasks is the
+    fan-out task. The tasks downstream of each of its children form a subtree, and
+    the overlapping subtrees are merged. The tasks which are not in a subtree are
+    upstream of all of them, and the subtrees do not depend on each other. The
+    groups which are still larger than `threshold` are split again.
+
+    A split is not used if the links to an input with several links would cross
+    the boundary of a subtree.
+
+    Returns:
+        list: the task names of each part, the parts upstream first.
+    """
+    if dependencies is None:
+        dependencies = get_task_dependencies(wgdata)
+    order = {name: i for i, name in enumerate(wgdata["tasks"])}
+    group = set(names)
+    if len(group) <= threshold:
+        return [sorted(group, key=order.get)]
+    successors = {name: [] for name in group}
+    in_degree = {name: 0 for name in group}
+    for upstream, downstream in dependencies:
+        if upstream in group and downstream in group:
+            successors[upstream].append(downstream)
+            in_degree[downstream] += 1
+    # the sources of the inputs with several links
+    sources = {}
+    for link in wgdata["links"]:
+        if link["to_node"] in group and link["to_socket"] != "_wait":
+            sources.setdefault((link["to_node"], link["to_socket"]), set()).add(
+                link["from_node"]
+            )
+    sources = [(key[0], value) for key, value in sources.items() if len(value) > 1]
+
+    def descendants(name: str) -> set:
+        result = {name}
+        stack = [name]
+        while stack:
+            for child in successors[stack.pop()]:
+                if child not in result:
+                    result.add(child)
+                    stack.append(child)
+        return result
+
+    # topological order
+    queue = sorted(
+        [name for name in group if in_degree[name] == 0], key=order.get, reverse=True
+    )
+    while queue:
+        name = queue.pop()
+        for child in successors[name]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+        if len(set(successors[name])) < 2:
+            continue
+        subtrees = []
+        for child in sorted(set(successors[name]), key=order.get):
+            subtree = descendants(child)
+            for other in [other for other in subtrees if other & subtree]:
+                subtrees.remove(other)
+                subtree |= other
+            subtrees.append(subtree)
+        if len(subtrees) < 2:
+            continue
+        if any(
+            target in subtree and not links <= subtree
+            for target, links in sources
+            for subtree in subtrees
+        ):
+            continue
+        head = group.difference(*subtrees)
+        parts = split_below_fan_out(wgdata, head, threshold, dependencies)
+        small = []
+        for subtree in subtrees:
+            if len(subtree) > threshold:
+                parts.extend(
+                    split_below_fan_out(wgdata, subtree, threshold, dependencies)
+                )
+            else:
+                small.append(sorted(subtree, key=order.get))
+        parts.extend(_pack(small, threshold))
+        return parts
+    return [sorted(group, key=order.get)]
+
+
+def _pack(groups: List[List[str]], threshold: int) -> List[List[str]]:
+    """Pack independent groups of tasks into partitions of at most `threshold` tasks,
+    the largest groups first."""
+    partitions = []
+    current = []
+    for names in sorted(groups, key=len, reverse=True):
+        if len(names) >= threshold:
+            partitions.append(list(names))
+        elif len(current) + len(names) > threshold:
+            partitions.append(current)
+            current = list(names)
+        else:
+            current.extend(names)
+    if current:
+        partitions.append(current)
+    return partitions
@@ -1,6 +1,20 @@
 from typing import Any
 
 
+def send_to_widget(workgraph: Any, message: dict) -> None:
+    """Send a message to the widget of the workgraph.
+
+    The messages are not sent while the workgraph is built in a batch, or before
+    the widget is created, the widget is rebuilt from the workgraph when it is
+    displayed.
+    """
+    if getattr(workgraph, "_batch_depth", 0):
+        return
+    if getattr(workgraph, "_workgraph_widget", True) is None:
+        return
+    workgraph._widget.send(message)
+
+
 def task_creation_hook(self, task: Any) -> None:
     """Hook for task creation.
 
@@ -8,8 +22,9 @@ def task_creation_hook(self, task: Any) -> None:
         task (Task): a task to be created.
     """
     # send message to the widget
-    self.parent._widget.send(
-        {"type": "add_task", "data": {"label": task.name, "inputs": [], "outputs": []}}
+    send_to_widget(
+        self.parent,
+        {"type": "add_task", "data": {"label": task.name, "inputs": [], "outputs": []}},
     )
 
 
@@ -20,12 +35,9 @@ def task_deletion_hook(self, task: Any) -> None:
         task (Task): a task to be deleted.
     """
     # remove all links to the task
-    link_index = []
-    for index, link in enumerate(self.parent.links):
-        if link.from_node.name == task.name or link.to_node.name == task.name:
-            link_index.append(index)
-    del self.parent.links[link_index]
-    self.parent._widget.send({"type": "delete_node", "data": {"name": task.name}})
+    links = self.parent.links
+    links.remove(links.get_task_links(task))
+    send_to_widget(self.parent, {"type": "delete_node", "data": {"name": task.name}})
 
 
 def link_creation_hook(self, link: Any) -> None:
@@ -34,7 +46,8 @@ def link_creation_hook(self, link: Any) -> None:
     Args:
         link (Link): a link to be created.
     """
-    self.parent._widget.send(
+    send_to_widget(
+        self.parent,
         {
             "type": "add_link",
             "data": {
@@ -43,7 +56,7 @@ def link_creation_hook(self, link: Any) -> None:
                 "to_node": link.to_node.name,
                 "to_socket": link.to_socket.name,
             },
-        }
+        },
     )
 
 
@@ -53,7 +66,8 @@ def link_deletion_hook(self, link: Any) -> None:
     Args:
         link (Link): a link to be deleted.
     """
-    self.parent._widget.send(
+    send_to_widget(
+        self.parent,
         {
             "type": "delete_link",
             "data": {
@@ -62,5 +76,5 @@ def link_deletion_hook(self, link: Any) -> None:
                 "to_node": link.to_node.name,
                 "to_socket": link.to_socket.name,
             },
-        }
+        },
     )
@@ -0,0 +1,198 @@
+"""Compiled, index-based representation of the graph structure of a workgraph."""
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+# the last compiled graphs, keyed by the signature of their structure
+_IR_CACHE: "OrderedDict[Tuple, WorkGraphIR]" = OrderedDict()
+_IR_CACHE_SIZE = 8
+
+
+class WorkGraphIR:
+    """Index-based representation of the tasks and links of a workgraph.
+
+    Tasks and sockets are numbered once. The links are stored as an integer array
+    of (from_task, from_socket, to_task, to_socket), and the adjacency of the tasks
+    in CSR format (`indptr`, `indices`). The descendants of each task and the
+    binding of the links to the sockets are computed from these arrays.
+    """
+
+    def __init__(self, wgdata: Dict[str, Any]) -> None:
+        tasks = wgdata["tasks"]
+        self.names = list(tasks.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.input_index = [
+            {socket["name"]: j for j, socket in enumerate(task["inputs"])}
+            for task in tasks.values()
+        ]
+        self.output_index = [
+            {socket["name"]: j for j, socket in enumerate(task["outputs"])}
+            for task in tasks.values()
+        ]
+        self.links = wgdata["links"]
+        self.ctrl_links = wgdata.get("ctrl_links", [])
+        link_array = np.empty((len(self.links), 4), dtype=np.int64)
+        for k, link in enumerate(self.links):
+            i = self.index[link["from_node"]]
+            j = self.index[link["to_node"]]
+            link_array[k] = (
+                i,
+                self.output_index[i][link["from_socket"]],
+                j,
+                self.input_index[j][link["to_socket"]],
+            )
+        self.link_array = link_array
+        self.children_indptr, self.children_indices = self._build_csr(
+            link_array[:, 0], link_array[:, 2]
+        )
+        self.parents_indptr, self.parents_indices = self._build_csr(
+            link_array[:, 2], link_array[:, 0]
+        )
+        self._descendants = None
+
+    def _build_csr(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[List, List]:
+        """Build the CSR arrays of the adjacency, without duplicated entries."""
+        n = len(self.names)
+        if len(rows) == 0:
+            return [0] * (n + 1), []
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+        unique = np.ones(len(rows), dtype=bool)
+        unique[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols = rows[unique], cols[unique]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr.tolist(), cols.tolist()
+
+    def children(self, i: int) -> List[int]:
+        """Indices of the direct child tasks of task `i`."""
+        return self.children_indices[
+            self.children_indptr[i] : self.children_indptr[i + 1]
+        ]
+
+    def parents(self, i: int) -> List[int]:
+        """Indices of the direct parent tasks of task `i`."""
+        return self.parents_indices[self.parents_indptr[i] : self.parents_indptr[i + 1]]
+
+    def parent_names(self, name: str) -> List[str]:
+        """Names of the direct parent tasks of a task."""
+        return [self.names[i] for i in self.parents(self.index[name])]
+
+    @property
+    def descendants(self) -> List[set]:
+        """Indices of all the tasks downstream of each task."""
+        if self._descendants is None:
+            self._descendants = self._build_descendants()
+        return self._descendants
+
+    def _build_descendants(self) -> List[set]:
+        n = len(self.names)
+        # topological order, using Kahn's algorithm
+        indegree = [
+            self.parents_indptr[i + 1] - self.parents_indptr[i] for i in range(n)
+        ]
+        order = [i for i in range(n) if indegree[i] == 0]
+        for i in order:
+            for j in self.children(i):
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    order.append(j)
+        descendants = [set() for _ in range(n)]
+        if len(order) == n:
+            for i in reversed(order):
+                for j in self.children(i):
+                    descendants[i].add(j)
+                    descendants[i] |= descendants[j]
+            return descendants
+        # the graph has cycles, search from every task
+        for i in range(n):
+            stack = list(self.children(i))
+            while stack:
+                j = stack.pop()
+                if j not in descendants[i]:
+                    descendants[i].add(j)
+                    stack.extend(self.children(j))
+            descendants[i].discard(i)
+        return descendants
+
+    def bind_links(self, wgdata: Dict[str, Any]) -> None:
+        """Attach the links to the input and output sockets of the tasks."""
+        tasks = list(wgdata["tasks"].values())
+        for task in tasks:
+            for input in task["inputs"]:
+                input["links"] = []
+            for output in task["outputs"]:
+                output["links"] = []
+        for link, (i, i_socket, j, j_socket) in zip(
+            self.links, self.link_array.tolist()
+        ):
+            tasks[j]["inputs"][j_socket]["links"].append(link)
+            tasks[i]["outputs"][i_socket]["links"].append(link)
+
+    def build_connectivity(self) -> Dict[str, Any]:
+        """Build the connectivity of the workgraph.
+
+        The result has the same format as `node_graph.analysis.ConnectivityAnalysis`.
+        """
+        child_node = {
+            name: [self.names[j] for j in sorted(self.descendants[i])]
+            for i, name in enumerate(self.names)
+        }
+        input_node = {name: {} for name in self.names}
+        output_node = {name: {} for name in self.names}
+        for link in self.links:
+            input_node[link["to_node"]].setdefault(link["to_socket"], []).append(
+                link["from_node"]
+            )
+            output_node[link["from_node"]].setdefault(link["from_socket"], []).append(
+                link["to_node"]
+            )
+        empty = {name: {} for name in self.names}
+        return {
+            "child_node": child_node,
+            "control_node": empty,
+            "input_node": input_node,
+            "output_node": output_node,
+            "ctrl_input_node": empty,
+            "ctrl_input_link": empty,
+            "ctrl_output_node": empty,
+            "ctrl_output_link": empty,
+        }
+
+
+def get_ir(wgdata: Dict[str, Any]) -> WorkGraphIR:
+    """Get the compiled representation of a workgraph.
+
+    The representation is compiled once for each graph structure, i.e. the tasks,
+    their sockets and the links, and reused as long as the structure is unchanged.
+    """
+    signature = (
+        tuple(
+            (
+                name,
+                tuple(socket["name"] for socket in task["inputs"]),
+                tuple(socket["name"] for socket in task["outputs"]),
+            )
+            for name, task in wgdata["tasks"].items()
+        ),
+        tuple(
+            (
+                link["from_node"],
+                link["from_socket"],
+                link["to_node"],
+                link["to_socket"],
+            )
+            for link in wgdata["links"]
+        ),
+    )
+    ir = _IR_CACHE.get(signature)
+    if ir is None:
+        ir = WorkGraphIR(wgdata)
+        _IR_CACHE[signature] = ir
+        if len(_IR_CACHE) > _IR_CACHE_SIZE:
+            _IR_CACHE.popitem(last=False)
+    else:
+        _IR_CACHE.move_to_end(signature)
+        # the same structure, but possibly new link dicts
+        ir.links = wgdata["links"]
+    return ir
@@ -0,0 +1,453 @@
+"""Chunked, compressed storage of the workgraph data.
+
+The workgraph data is split into one chunk for the graph, i.e. everything except
+the tasks, and one chunk per task. Each chunk is pickled, compressed with zlib and
+written to the repository of a `FolderData` node under its content hash. The
+process node only keeps a small header in its extras, which maps the graph and the
+tasks to their chunks, so readers can load the header, or only a few tasks,
+without reading the whole workgraph.
+
+Pickled executors are stored once per content hash in a registry, and the tasks
+only hold the hash, so the size of the stored workgraph scales with the number of
+distinct functions. Identical chunks of different workgraphs are stored once by
+the repository.
+
+The header also holds a content hash of the definition of each task and their
+Merkle root, so a re-saved workgraph is compared with the stored one without
+loading it.
+
+The fields which change on every export, i.e. the save times and the random
+`metadata.hash` of the tasks with a pickled executor, are kept in the header, so an
+unchanged workgraph is saved to the same chunks and its folder is reused. A new
+folder is linked to the process, so it is exported with it, and the folders of the
+previous saves are kept for the engine, which may still read them.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import datetime
+import hashlib
+import io
+import pickle
+import zlib
+import cloudpickle
+from aiida import orm
+from aiida.common.links import LinkType
+from aiida.orm.entities import EntityTypes
+
+STORAGE_VERSION = 1
+# name of the extra with the header of the stored workgraph
+HEADER_KEY = "_workgraph_storage"
+# name of the extra of the workgraph stored with `serialize`, before the chunked storage
+LEGACY_KEY = "_workgraph"
+COMPRESSION_LEVEL = 6
+# the save times of the workgraph, which are kept in the header
+VOLATILE_KEYS = ["created", "lastUpdate"]
+
+# the chunks are addressed by their content, so they can be cached safely
+_CHUNK_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_CHUNK_CACHE_SIZE = 256
+# the encoded executors, keyed by the hash of the executor, so the workgraphs
+# saved together, e.g. by `WorkGraph.submit_many`, only encode them once
+_EXECUTOR_CHUNKS: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+_EXECUTOR_CHUNKS_SIZE = 128
+
+
+def _persistent_id(obj: Any) -> Optional[tuple]:
+    """Reference AiiDA entities by uuid, like `aiida.orm.utils.serialize`."""
+    if isinstance(obj, orm.Node):
+        if not obj.is_stored:
+            raise ValueError(
+                f"node {type(obj)}<{obj.uuid}> cannot be represented because it is not stored"
+            )
+        return ("node", obj.uuid)
+    if isinstance(obj, orm.Group):
+        return ("group", obj.uuid)
+    if isinstance(obj, orm.Computer):
+        return ("computer", obj.uuid)
+    return None
+
+
+class _Pickler(cloudpickle.Pickler):
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        return _persistent_id(obj)
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid: tuple) -> Any:
+        entity_type, uuid = pid
+        if entity_type == "node":
+            return orm.load_node(uuid=uuid)
+        if entity_type == "group":
+            return orm.load_group(uuid=uuid)
+        if entity_type == "computer":
+            return orm.load_computer(uuid=uuid)
+        raise pickle.UnpicklingError(f"Unknown entity type: {entity_type}")
+
+
+def encode_chunk(data: Any) -> bytes:
+    """Pickle and compress a chunk."""
+    buffer = io.BytesIO()
+    _Pickler(buffer).dump(data)
+    return zlib.compress(buffer.getvalue(), COMPRESSION_LEVEL)
+
+
+def decode_chunk(data: bytes) -> Any:
+    """Decompress and unpickle a chunk."""
+    return _Unpickler(io.BytesIO(zlib.decompress(data))).load()
+
+
+def _canonical(value: Any) -> Any:
+    """A cheap canonical form of a property value, which can be hashed with `repr`.
+
+    The stored nodes are immutable and are represented by their uuid, the arrays
+    by the digest of their buffer. Other objects are pickled without compression.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, dict):
+        return (
+            "dict",
+            sorted((repr(key), _canonical(item)) for key, item in value.items()),
+        )
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, [_canonical(item) for item in value])
+    if isinstance(value, orm.Node):
+        if value.is_stored:
+            return ("node", value.uuid)
+        return ("node", value.uuid, _canonical(value.base.attributes.all))
+    if isinstance(value, (orm.Group, orm.Computer)):
+        return (type(value).__name__, value.uuid)
+    try:
+        import numpy as np
+
+        if isinstance(value, np.ndarray):
+            data = np.ascontiguousarray(value)
+            return (
+                "ndarray",
+                str(data.dtype),
+                data.shape,
+                hashlib.sha256(data.data.cast("B")).hexdigest(),
+            )
+    except ImportError:
+        pass
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = _persistent_id
+    try:
+        pickler.dump(value)
+    except Exception:
+        return repr(value)
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def hash_value(value: Any) -> str:
+    """Hash the canonical form of a value, see `_canonical`."""
+    return hashlib.sha256(repr(_canonical(value)).encode()).hexdigest()
+
+
+def _hash_executor(executor: Any) -> Optional[str]:
+    """Hash an executor, the pickled executors by the hash of the pickle."""
+    from aiida_workgraph.utils import get_executor_hash
+
+    if isinstance(executor, dict):
+        executor_hash = get_executor_hash(executor)
+        if executor_hash is not None:
+            return executor_hash
+    return hash_value(executor)
+
+
+def get_task_hashes(wgdata: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Compute the content hashes of the tasks of a workgraph.
+
+    The definition hash covers what changes the result of a task: its uuid, its
+    executor, the values of its properties, its input links and control links,
+    `wait`, `to_context` and `timeout`. The metadata hash covers the position and
+    the description.
+
+    Returns:
+        tuple: the definition hashes and the metadata hashes, keyed by task name.
+    """
+    input_links = {name: [] for name in wgdata["tasks"]}
+    for link in wgdata["links"] + wgdata.get("ctrl_links", []):
+        if link["to_node"] in input_links:
+            input_links[link["to_node"]].append(
+                (link["to_socket"], link["from_node"], link["from_socket"])
+            )
+    hashes = {}
+    metadata_hashes = {}
+    for name, task in wgdata["tasks"].items():
+        properties = sorted(
+            (key, hash_value(prop.get("value")))
+            for key, prop in task["properties"].items()
+        )
+        definition = repr(
+            (
+                task["uuid"],
+                _hash_executor(task.get("executor")),
+                properties,
+                sorted(input_links[name]),
+                sorted(task.get("wait", [])),
+                _canonical(task.get("to_context")),
+                task.get("timeout"),
+            )
+        )
+        hashes[name] = hashlib.sha256(definition.encode()).hexdigest()
+        metadata = repr((task.get("position"), task.get("description")))
+        metadata_hashes[name] = hashlib.sha256(metadata.encode()).hexdigest()
+    return hashes, metadata_hashes
+
+
+def get_merkle_root(hashes: Dict[str, str]) -> str:
+    """Compute the root hash of the task hashes."""
+    root = hashlib.sha256()
+    for name in sorted(hashes):
+        root.update(f"{name}:{hashes[name]};".encode())
+    return root.hexdigest()
+
+
+def save_workgraph_data(
+    process: orm.ProcessNode,
+    wgdata: Dict[str, Any],
+    task_hashes: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None,
+) -> Dict:
+    """Save the workgraph data of a process in chunks.
+
+    Args:
+        process (ProcessNode): the process node of the workgraph.
+        wgdata (dict): data of the workgraph.
+        task_hashes (tuple, optional): the result of `get_task_hashes`, if it was
+            computed already.
+
+    Returns:
+        dict: the header of the stored workgraph.
+    """
+    chunks = {}
+    volatile = {
+        "graph": {
+            key: wgdata[key].isoformat()
+            for key in VOLATILE_KEYS
+            if isinstance(wgdata.get(key), datetime.datetime)
+        },
+        "tasks": {},
+    }
+    # the alias of the tasks used by node_graph is rebuilt when loading
+    graph = {
+        key: value
+        for key, value in wgdata.items()
+        if key not in ["tasks", "nodes"] and key not in volatile["graph"]
+    }
+    graph_data = encode_chunk(graph)
+    graph_hash = hashlib.sha256(graph_data).hexdigest()
+    chunks[graph_hash] = graph_data
+    chunk_hashes = {}
+    executor_hashes = {}
+    for name, task in wgdata["tasks"].items():
+        task = register_executor(task, chunks, executor_hashes)
+        if "hash" in task.get("metadata", {}):
+            metadata = dict(task["metadata"])
+            volatile["tasks"][name] = metadata.pop("hash")
+            task = {**task, "metadata": metadata}
+        task_data = encode_chunk(task)
+        chunk_hash = hashlib.sha256(task_data).hexdigest()
+        chunks[chunk_hash] = task_data
+        chunk_hashes[name] = chunk_hash
+    hashes, metadata_hashes = task_hashes or get_task_hashes(wgdata)
+    old_folder = _load_folder(load_workgraph_header(process))
+    # the repository of a stored node is immutable, so the folder of the previous
+    # save is reused only if it has all the chunks
+    if old_folder is not None and set(chunks).issubset(
+        old_folder.base.repository.list_object_names()
+    ):
+        folder = old_folder
+    else:
+        folder = orm.FolderData()
+        for chunk_hash, data in chunks.items():
+            folder.base.repository.put_object_from_bytes(data, chunk_hash)
+        folder.label = f"{wgdata['name']}_storage"
+        folder.store()
+        # the folder is exported with the process, a finished process can not be linked.
+        # `add_incoming` commits the session, which would close the transaction of
+        # `WorkGraph.save_many`, the bulk insert joins the open transaction instead
+        if not process.is_sealed:
+            process.backend.bulk_insert(
+                EntityTypes.LINK,
+                [
+                    {
+                        "input_id": process.pk,
+                        "output_id": folder.pk,
+                        "label": f"workgraph_storage_{folder.pk}",
+                        "type": LinkType.RETURN.value,
+                    }
+                ],
+            )
+    header = {
+        "version": STORAGE_VERSION,
+        "folder": folder.uuid,
+        "graph": graph_hash,
+        "tasks": chunk_hashes,
+        "executors": executor_hashes,
+        "volatile": volatile,
+        "hashes": hashes,
+        "metadata_hashes": metadata_hashes,
+        "merkle_root": get_merkle_root(hashes),
+    }
+    process.base.extras.set(HEADER_KEY, header)
+    # the chunked storage replaces the workgraph stored before
+    if LEGACY_KEY in process.base.extras.keys():
+        process.base.extras.delete(LEGACY_KEY)
+    return header
+
+
+def _load_folder(header: Optional[Dict[str, Any]]) -> Optional[orm.FolderData]:
+    """Load the folder with the chunks of a header, None if it does not exist."""
+    from aiida.common.exceptions import NotExistent
+
+    if header is None or "folder" not in header:
+        return None
+    try:
+        return orm.load_node(uuid=header["folder"])
+    except NotExistent:
+        return None
+
+
+def register_executor(
+    task: Dict[str, Any], chunks: Dict[str, bytes], executor_hashes: Dict[str, str]
+) -> Dict[str, Any]:
+    """Add the pickled executor of a task to the registry.
+
+    Returns:
+        dict: a copy of the task data, which only holds the hash of the executor.
+    """
+    from aiida_workgraph.utils import get_executor_hash
+
+    executor = task.get("executor")
+    if not isinstance(executor, dict) or not executor.get("is_pickle"):
+        return task
+    executor_hash = get_executor_hash(executor)
+    if executor_hash is None:
+        return task
+    if executor_hash not in executor_hashes:
+        if executor_hash in _EXECUTOR_CHUNKS:
+            _EXECUTOR_CHUNKS.move_to_end(executor_hash)
+        else:
+            executor_data = encode_chunk(executor)
+            chunk_hash = hashlib.sha256(executor_data).hexdigest()
+            _EXECUTOR_CHUNKS[executor_hash] = (chunk_hash, executor_data)
+            if len(_EXECUTOR_CHUNKS) > _EXECUTOR_CHUNKS_SIZE:
+                _EXECUTOR_CHUNKS.popitem(last=False)
+        chunk_hash, executor_data = _EXECUTOR_CHUNKS[executor_hash]
+        chunks[chunk_hash] = executor_data
+        executor_hashes[executor_hash] = chunk_hash
+    return {**task, "executor": {"registry": executor_hash}}
+
+
+def load_workgraph_header(process: orm.ProcessNode) -> Optional[Dict[str, Any]]:
+    """Load the header of the stored workgraph, None for the legacy storage."""
+    return process.base.extras.get(HEADER_KEY, None)
+
+
+def has_workgraph_data(process: orm.ProcessNode) -> bool:
+    """Check if the workgraph data of a process is stored."""
+    keys = process.base.extras.keys()
+    return HEADER_KEY in keys or LEGACY_KEY in keys
+
+
+def _read_chunk(folder: orm.FolderData, chunk_hash: str) -> Any:
+    data = _CHUNK_CACHE.get(chunk_hash)
+    if data is None:
+        data = folder.base.repository.get_object_content(chunk_hash, mode="rb")
+        _CHUNK_CACHE[chunk_hash] = data
+        if len(_CHUNK_CACHE) > _CHUNK_CACHE_SIZE:
+            _CHUNK_CACHE.popitem(last=False)
+    else:
+        _CHUNK_CACHE.move_to_end(chunk_hash)
+    return decode_chunk(data)
+
+
+def load_workgraph_data(
+    process: orm.ProcessNode,
+    tasks: Optional[List[str]] = None,
+    header_only: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Load the workgraph data of a process.
+
+    Args:
+        process (ProcessNode): the process node of the workgraph.
+        tasks (list, optional): the names of the tasks to load, all tasks by default.
+        header_only (bool): only load the graph, without the tasks.
+
+    Returns:
+        dict: data of the workgraph, None if the process has no workgraph data.
+    """
+    header = process.base.extras.get(HEADER_KEY, None)
+    if header is None:
+        return _load_legacy_workgraph_data(process, tasks, header_only)
+    folder = orm.load_node(uuid=header["folder"])
+    wgdata = _read_chunk(folder, header["graph"])
+    for key, value in header.get("volatile", {}).get("graph", {}).items():
+        wgdata[key] = datetime.datetime.fromisoformat(value)
+    wgdata["tasks"] = {}
+    wgdata["nodes"] = wgdata["tasks"]
+    if not header_only:
+        wgdata["tasks"].update(load_task_data(process, tasks, header, folder))
+    return wgdata
+
+
+def load_task_data(
+    process: orm.ProcessNode,
+    tasks: Optional[List[str]] = None,
+    header: Optional[Dict[str, Any]] = None,
+    folder: Optional[orm.FolderData] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Load the data of some tasks of a workgraph stored in chunks.
+
+    Args:
+        process (ProcessNode): the process node of the workgraph.
+        tasks (list, optional): the names of the tasks to load, all tasks by default.
+        header (dict, optional): the header of the stored workgraph, if it was loaded already.
+        folder (FolderData, optional): the node with the chunks, if it was loaded already.
+
+    Returns:
+        dict: the data of the tasks, keyed by name.
+    """
+    header = load_workgraph_header(process) if header is None else header
+    folder = orm.load_node(uuid=header["folder"]) if folder is None else folder
+    names = header["tasks"].keys() if tasks is None else tasks
+    volatile = header.get("volatile", {}).get("tasks", {})
+    # the tasks with the same executor share the same data
+    executors = {}
+    data = {}
+    for name in names:
+        task = _read_chunk(folder, header["tasks"][name])
+        if name in volatile:
+            task["metadata"]["hash"] = volatile[name]
+        executor = task.get("executor")
+        if isinstance(executor, dict) and "registry" in executor:
+            executor_hash = executor["registry"]
+            if executor_hash not in executors:
+                executors[executor_hash] = _read_chunk(
+                    folder, header["executors"][executor_hash]
+                )
+            task["executor"] = executors[executor_hash]
+        data[name] = task
+    return data
+
+
+def _load_legacy_workgraph_data(
+    process: orm.ProcessNode,
+    tasks: Optional[List[str]] = None,
+    header_only: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Load the workgraph data stored with `serialize` in a single extra."""
+    from aiida.orm.utils.serialize import deserialize_unsafe
+
+    wgdata = process.base.extras.get(LEGACY_KEY, None)
+    if wgdata is None:
+        return None
+    wgdata = deserialize_unsafe(wgdata)
+    if header_only:
+        wgdata["tasks"] = {}
+    elif tasks is not None:
+        wgdata["tasks"] = {name: wgdata["tasks"][name] for name in tasks}
+    wgdata["nodes"] = wgdata["tasks"]
+    return wgdata
@@ -36,16 +36,15 @@ async def read_workgraph_data(search: str = Query(None)):
 @router.get("/api/workgraph/{id}/{node_name}")
 async def read_workgraph_task(id: int, node_name: str):
     from .utils import node_to_short_json
-    from aiida.orm.utils.serialize import deserialize_unsafe
+    from aiida_workgraph.utils.storage import load_workgraph_data
 
     try:
         node = orm.load_node(id)
-        wgdata = node.base.extras.get("_workgraph", None)
+        wgdata = load_workgraph_data(node, tasks=[node_name])
         if wgdata is None:
             print("No workgraph data found in the node.")
             return
 
-        wgdata = deserialize_unsafe(wgdata)
         content = node_to_short_json(id, wgdata["tasks"][node_name])
         return content
     except KeyError:
@@ -62,17 +61,16 @@ async def read_workgraph(id: int):
         get_node_inputs,
         get_node_outputs,
     )
-    from aiida.orm.utils.serialize import deserialize_unsafe
+    from aiida_workgraph.utils.storage import load_workgraph_data
     from aiida_workgraph.utils import get_parent_workgraphs, get_processes_latest
 
     try:
         node = orm.load_node(id)
 
-        wgdata = node.base.extras.get("_workgraph", None)
+        wgdata = load_workgraph_data(node)
         if wgdata is None:
             print("No workgraph data found in the node.")
             return
-        wgdata = deserialize_unsafe(wgdata)
         content = workgraph_to_short_json(wgdata)
         summary = {
             "table": get_node_summary(node),
@@ -3,16 +3,21 @@ import node_graph
 import aiida
 from aiida.manage import get_manager
 from aiida_workgraph.tasks import task_pool
+from aiida_workgraph.task import Task
 import time
-from aiida_workgraph.collection import TaskCollection
+import functools
+import contextlib
+from aiida_workgraph.collection import TaskCollection, WorkGraphLinkCollection
 from aiida_workgraph.utils.graph import (
     task_deletion_hook,
     task_creation_hook,
     link_creation_hook,
     link_deletion_hook,
 )
-from aiida_workgraph.widget import NodeGraphWidget
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiida_workgraph.widget import NodeGraphWidget
 
 
 class WorkGraph(node_graph.NodeGraph):
@@ -27,6 +32,15 @@ class WorkGraph(node_graph.NodeGraph):
         process (aiida.orm.ProcessNode): The process node that represents the process status and other details.
         state (str): The current state of the workgraph process.
         pk (int): The primary key of the process node.
+        partition_threshold (int): If set, a workgraph with more tasks is split into
+            partitions, the independent branches and the subtrees below a fan-out task,
+            which run as child processes and share the `max_number_jobs`.
+        computers (list): Labels of the computers that PythonJob and ShellJob tasks without
+            a code or computer can be placed on. By default, a task is placed on the computer
+            of its remote input data.
+        speculative_factor (float): If set, a duplicate of a PythonJob task is launched when it
+            runs longer than this factor times the median duration of the finished tasks with the
+            same identifier. The first copy to finish wins.
     """
 
     node_pool = task_pool
@@ -49,28 +63,67 @@ class WorkGraph(node_graph.NodeGraph):
         self.max_number_jobs = 1000000
         self.execution_count = 0
         self.max_iteration = 1000000
+        self.partition_threshold = None
+        self.computers = []
+        self.speculative_factor = None
         self.nodes = TaskCollection(self, pool=self.node_pool)
+        self.links = WorkGraphLinkCollection(self)
         self.nodes.post_deletion_hooks = [task_deletion_hook]
         self.nodes.post_creation_hooks = [task_creation_hook]
         self.links.post_creation_hooks = [link_creation_hook]
         self.links.post_deletion_hooks = [link_deletion_hook]
         self.error_handlers = {}
-        self._widget = NodeGraphWidget(parent=self)
+        self._error_handlers_dump = None
+        self._task_mtimes = {}
+        self._batch_depth = 0
+        # the widget is created when the workgraph is displayed
+        self._workgraph_widget = None
+
+    @property
+    def _widget(self) -> "NodeGraphWidget":
+        if self._workgraph_widget is None:
+            from aiida_workgraph.widget import NodeGraphWidget
+
+            self._workgraph_widget = NodeGraphWidget(parent=self)
+            if self.process is not None:
+                self._update_widget_states()
+        return self._workgraph_widget
+
+    def _update_widget_states(self) -> None:
+        self._widget.states = {
+            name: self.tasks.summary(name)["state"] for name in self.tasks.keys()
+        }
 
     @property
     def tasks(self) -> TaskCollection:
         """Add alias to `nodes` for WorkGraph"""
         return self.nodes
 
-    def prepare_inputs(self, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        from aiida_workgraph.utils import (
-            merge_properties,
-            serialize_pythonjob_properties,
-        )
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["WorkGraph"]:
+        """Build the workgraph in a batch.
+
+        The changes of the tasks and links are not sent to the widget one by one, which
+        dominates the time to build large workgraphs, and the index of the links by task
+        is not updated. Both are rebuilt once, after the batch.
 
-        wgdata = self.to_dict()
-        merge_properties(wgdata)
-        serialize_pythonjob_properties(wgdata)
+        Example:
+            with wg.batch():
+                for i in range(10000):
+                    wg.tasks.new(add, x=i, y=1)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._workgraph_widget is not None:
+                self._workgraph_widget.from_workgraph(self)
+
+    def prepare_inputs(self, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # only the tasks changed since the last call are serialized again
+        wgdata = self.to_dict(short=True)
+        wgdata["tasks"] = {task.name: task.to_prepared_dict() for task in self.tasks}
         metadata = metadata or {}
         inputs = {"wg": wgdata, "metadata": metadata}
         return inputs
@@ -145,23 +198,83 @@ class WorkGraph(node_graph.NodeGraph):
         This is only used for a running workgraph.
         Save the AiiDA workgraph process and update the process status.
         """
-        from aiida.manage import manager
-        from aiida.engine.utils import instantiate_process
-        from aiida_workgraph.engine.workgraph import WorkGraphEngine
-
         inputs = self.prepare_inputs(metadata)
         if self.process is None:
-            runner = manager.get_manager().get_runner()
-            # init a process node
-            process_inited = instantiate_process(runner, WorkGraphEngine, **inputs)
-            process_inited.runner.persister.save_checkpoint(process_inited)
-            self.process = process_inited.node
-            self.process_inited = process_inited
-            process_inited.close()
+            self._create_process(inputs)
             print(f"WorkGraph process created, PK: {self.process.pk}")
         self.save_to_base(inputs["wg"])
         self.update()
 
+    def _create_process(self, inputs: Dict[str, Any]) -> None:
+        """Create the process node and its checkpoint."""
+        from aiida.manage import manager
+        from aiida.engine.utils import instantiate_process
+        from aiida_workgraph.engine.workgraph import WorkGraphEngine
+
+        runner = manager.get_manager().get_runner()
+        # init a process node
+        process_inited = instantiate_process(runner, WorkGraphEngine, **inputs)
+        process_inited.runner.persister.save_checkpoint(process_inited)
+        self.process = process_inited.node
+        self.process_inited = process_inited
+        process_inited.close()
+
+    @classmethod
+    def save_many(
+        cls,
+        graphs: List["WorkGraph"],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[aiida.orm.ProcessNode]:
+        """Create the processes of many new workgraphs in a single transaction.
+
+        Args:
+            graphs (list): The workgraphs, which have no process yet.
+            metadata (dict, optional): The metadata of the processes.
+        """
+        if any(wg.process is not None for wg in graphs):
+            raise ValueError(
+                "The workgraphs already have a process. Please use the submit() method."
+            )
+        storage = get_manager().get_profile_storage()
+        with storage.transaction():
+            for wg in graphs:
+                inputs = wg.prepare_inputs(metadata)
+                wg._create_process(inputs)
+                wg.save_to_base(inputs["wg"])
+                wg.state = "CREATED"
+        print(f"{len(graphs)} WorkGraph processes created.")
+        return [wg.process for wg in graphs]
+
+    @classmethod
+    def submit_many(
+        cls,
+        graphs: List["WorkGraph"],
+        wait: bool = False,
+        timeout: int = 60,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[aiida.orm.ProcessNode]:
+        """Submit many new workgraphs at once.
+
+        The processes are created in a single transaction, the executors shared by the workgraphs are
+        stored once, and the continue messages are sent without waiting for a reply.
+
+        Args:
+            graphs (list): The workgraphs, which have no process yet.
+            wait (bool): Wait for the processes to finish.
+            timeout (int): The maximum time in seconds to wait for all the processes to finish. Defaults to 60.
+            metadata (dict, optional): The metadata of the processes.
+        """
+        processes = cls.save_many(graphs, metadata=metadata)
+        controller = get_manager().get_process_controller()
+        for wg in graphs:
+            controller.continue_process(wg.pk, nowait=False, no_reply=True)
+            wg.restart_process = None
+        if wait:
+            start = time.time()
+            for wg in graphs:
+                wg.wait(timeout=max(timeout - (time.time() - start), 0))
+        return processes
+
     def save_to_base(self, wgdata: Dict[str, Any]) -> None:
         """Save new wgdata to base.extras.
         It will first check the difference, and reset tasks if needed.
@@ -173,10 +286,8 @@ class WorkGraph(node_graph.NodeGraph):
         )
         saver.save()
 
-    def to_dict(self) -> Dict[str, Any]:
-        import cloudpickle as pickle
-
-        wgdata = super().to_dict()
+    def to_dict(self, short: bool = False) -> Dict[str, Any]:
+        wgdata = super().to_dict(short=short)
         self.context["sequence"] = self.sequence
         # only alphanumeric and underscores are allowed
         wgdata["context"] = {
@@ -189,92 +300,252 @@ class WorkGraph(node_graph.NodeGraph):
                 "workgraph_type": self.workgraph_type,
                 "conditions": self.conditions,
                 "max_number_jobs": self.max_number_jobs,
+                "partition_threshold": self.partition_threshold,
+                "computers": self.computers,
+                "speculative_factor": self.speculative_factor,
             }
         )
-        wgdata["error_handlers"] = pickle.dumps(self.error_handlers)
+        wgdata["error_handlers"] = self._dump_error_handlers()
         wgdata["tasks"] = wgdata.pop("nodes")
 
         return wgdata
 
-    def wait(self, timeout: int = 50) -> None:
+    def _dump_error_handlers(self) -> bytes:
+        """Pickle the error handlers, the result is reused until they change."""
+        import cloudpickle as pickle
+        from aiida_workgraph.utils import copy_containers, is_unchanged
+
+        if self._error_handlers_dump is None or not is_unchanged(
+            self._error_handlers_dump[0], self.error_handlers
+        ):
+            self._error_handlers_dump = (
+                copy_containers(self.error_handlers),
+                pickle.dumps(self.error_handlers),
+            )
+        return self._error_handlers_dump[1]
+
+    def wait(self, timeout: int = 50, interval: float = 5) -> None:
         """
-        Periodically checks and waits for the AiiDA workgraph process to finish until a given timeout.
+        Wait for the AiiDA workgraph process to finish until a given timeout.
+
+        If a broker is available, the waiting ends as soon as the state change of the process
+        is broadcast. Meanwhile, and without a broker, the tasks whose process changed are
+        refreshed, with a delay that grows until `interval` seconds.
 
         Args:
             timeout (int): The maximum time in seconds to wait for the process to finish. Defaults to 50.
+            interval (float): The maximum time in seconds between two checks. Defaults to 5.
         """
+        import threading
+        from kiwipy import BroadcastFilter
 
         start = time.time()
+        event = threading.Event()
+        communicator = None
+        identifier = None
+        try:
+            communicator = get_manager().get_communicator()
+            identifier = communicator.add_broadcast_subscriber(
+                BroadcastFilter(lambda *args, **kwargs: event.set(), sender=self.pk)
+            )
+        except Exception:
+            # e.g. the profile has no broker
+            communicator = None
+        delay = 0.1
+        try:
+            self._refresh_changed_tasks()
+            while self.state not in (
+                "KILLED",
+                "PAUSED",
+                "FINISHED",
+                "FAILED",
+                "CANCELLED",
+                "EXCEPTED",
+            ):
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    return
+                if event.wait(min(delay, remaining)):
+                    event.clear()
+                else:
+                    delay = min(delay * 2, interval)
+                self._refresh_changed_tasks()
+        finally:
+            if communicator is not None:
+                communicator.remove_broadcast_subscriber(identifier)
         self.update()
-        while self.state not in (
-            "KILLED",
-            "PAUSED",
-            "FINISHED",
-            "FAILED",
-            "CANCELLED",
-            "EXCEPTED",
-        ):
-            time.sleep(0.5)
-            self.update()
-            if time.time() - start > timeout:
-                return
+
+    def _query_outgoing(self, pk: int) -> List[List[Any]]:
+        """Query the state of a process and its outgoing nodes in one query.
+
+        Returns:
+            list: rows of (process_state, pk, node_type, process_state, ctime, mtime, link_label),
+            the outgoing nodes are ordered by pk.
+        """
+        from aiida.orm import QueryBuilder, ProcessNode, Node
+
+        qb = QueryBuilder()
+        qb.append(
+            ProcessNode,
+            filters={"id": pk},
+            project=["attributes.process_state"],
+            tag="workgraph",
+        )
+        qb.append(
+            Node,
+            with_incoming="workgraph",
+            edge_project=["label"],
+            project=["id", "node_type", "attributes.process_state", "ctime", "mtime"],
+            outerjoin=True,
+            tag="node",
+        )
+        # a restarted task is linked again, the latest process wins
+        qb.order_by({"node": "id"})
+        return qb.all()
+
+    def _refresh_changed_tasks(self) -> List[str]:
+        """Refresh the tasks whose process or data node changed since the last check.
+
+        The state of the workgraph and the outgoing nodes are fetched in one query. The nodes
+        and the output values of the tasks are only loaded when they are accessed.
+
+        Returns:
+            list: the names of the refreshed tasks.
+        """
+        from aiida.orm.utils.serialize import deserialize_unsafe
+
+        rows = self._query_outgoing(self.pk)
+        self.state = (rows[0][0] or "created").upper() if rows else "CREATED"
+        extras = self.process.base.extras.all
+        speculative = None
+        latest = {}
+        sweeps = set()
+        names = set(self.tasks.keys())
+        # the rows of the partitions are appended to the list while iterating
+        for row in rows:
+            _, pk, node_type, task_state, ctime, mtime, label = row
+            if pk is None:
+                continue
+            if node_type.startswith("process.") and task_state is not None:
+                name = label
+                # the speculative duplicate of a task has its own link label
+                if name.endswith("_speculative") and name[:-12] in names:
+                    name = name[:-12]
+                if name not in names:
+                    # a partition runs a subset of the tasks in a child process
+                    if name.startswith("partition_"):
+                        rows.extend(self._query_outgoing(pk))
+                    # the instances of a sweep task are named `<task>__<index>`
+                    elif name.rsplit("__", 1)[0] in names:
+                        sweeps.add(name.rsplit("__", 1)[0])
+                    continue
+                if speculative is None:
+                    speculative = {
+                        key: value
+                        for key, value in extras.items()
+                        if key.startswith("_task_speculative_")
+                    }
+                if f"_task_speculative_{name}" in speculative and not (
+                    self._is_speculative_winner(name, pk, speculative)
+                ):
+                    continue
+                latest[name] = (pk, True, task_state.upper(), ctime, mtime)
+            elif node_type.startswith("data."):
+                if label.startswith("group_outputs__") or label.startswith(
+                    "new_data__"
+                ):
+                    name = label.split("__", 1)[1]
+                    if name in names:
+                        latest[name] = (pk, False, "FINISHED", ctime, mtime)
+                elif label == "execution_count":
+                    if self._task_mtimes.get(label) != (pk, mtime):
+                        self._task_mtimes[label] = (pk, mtime)
+                        self.execution_count = aiida.orm.load_node(pk).value
+        changed = []
+        # a sweep task has no node, its state is only in the extras
+        for name in sweeps - latest.keys():
+            state = extras.get(f"_task_state_{name}")
+            if state is None or self._task_mtimes.get(name) == (None, state):
+                continue
+            self._task_mtimes[name] = (None, state)
+            state = deserialize_unsafe(state)
+            self.tasks.apply(
+                name,
+                functools.partial(self._set_task_state, state=state),
+                key="state",
+                state=state,
+            )
+            changed.append(name)
+        for name, (pk, is_process, state, ctime, mtime) in latest.items():
+            if self._task_mtimes.get(name) == (pk, mtime):
+                continue
+            self._task_mtimes[name] = (pk, mtime)
+            self.tasks.apply(
+                name,
+                functools.partial(
+                    self._set_task_node,
+                    pk=pk,
+                    is_process=is_process,
+                    state=state,
+                    ctime=ctime,
+                    mtime=mtime,
+                ),
+                key="node",
+                pk=pk,
+                state=state,
+            )
+            changed.append(name)
+        return changed
+
+    @staticmethod
+    def _set_task_state(task: Any, state: str) -> None:
+        """Set the state of a task, which has no node."""
+        task.state = state
+
+    def _set_task_node(
+        self,
+        task: Any,
+        pk: int,
+        is_process: bool,
+        state: str,
+        ctime: Any,
+        mtime: Any,
+    ) -> None:
+        """Set the node and the state of a task."""
+        task.set_node_pk(pk, is_process=is_process)
+        task.state = state
+        task.ctime = ctime
+        task.mtime = mtime
+        if is_process and state == "FINISHED":
+            # the output sockets are read from the process on first access
+            for socket in task.outputs:
+                socket._value_loader = functools.partial(
+                    self._read_task_output, task, socket
+                )
+
+    @staticmethod
+    def _read_task_output(task: Any, socket: Any) -> Any:
+        """Read the value of an output socket from the process of a finished task."""
+        outputs = task.node.outputs
+        if task.node_type == "graph_builder":
+            if not getattr(outputs, "group_outputs", False):
+                return socket.property.value
+            outputs = outputs.group_outputs
+        return getattr(outputs, socket.name, None)
 
     def update(self) -> None:
         """
         Update the current state and primary key of the process node as well as the state, node and primary key
         of the tasks that are outgoing from the process node. This includes updating the state of process nodes
         linked to the current process, and data nodes linked to the current process.
+
+        Only the tasks which changed since the last update are refreshed, and the nodes and the output values
+        of the tasks are loaded from the database when they are accessed.
         """
-        # from aiida_workgraph.utils import get_executor
-
-        self.state = self.process.process_state.value.upper()
-        outgoing = self.process.base.links.get_outgoing()
-        for link in outgoing.all():
-            node = link.node
-            # the link is added in order
-            # so the restarted node will be the last one
-            # thus the task is correct
-            if isinstance(node, aiida.orm.ProcessNode) and getattr(
-                node, "process_state", False
-            ):
-                self.tasks[link.link_label].process = node
-                self.tasks[link.link_label].state = node.process_state.value.upper()
-                self.tasks[link.link_label].node = node
-                self.tasks[link.link_label].pk = node.pk
-                self.tasks[link.link_label].ctime = node.ctime
-                self.tasks[link.link_label].mtime = node.mtime
-                if self.tasks[link.link_label].state == "FINISHED":
-                    # update the output sockets
-                    i = 0
-                    for socket in self.tasks[link.link_label].outputs:
-                        if self.tasks[link.link_label].node_type == "graph_builder":
-                            if not getattr(node.outputs, "group_outputs", False):
-                                continue
-                            socket.value = getattr(
-                                node.outputs.group_outputs, socket.name, None
-                            )
-                        else:
-                            socket.value = getattr(node.outputs, socket.name, None)
-                        i += 1
-            elif isinstance(node, aiida.orm.Data):
-                if link.link_label.startswith(
-                    "group_outputs__"
-                ) or link.link_label.startswith("new_data__"):
-                    label = link.link_label.split("__", 1)[1]
-                    if label in self.tasks.keys():
-                        self.tasks[label].state = "FINISHED"
-                        self.tasks[label].node = node
-                        self.tasks[label].pk = node.pk
-                elif link.link_label == "execution_count":
-                    self.execution_count = node.value
+        self._refresh_changed_tasks()
         # read results from the process outputs
-        for task in self.tasks:
-            if task.node_type.upper() == "DATA":
-                if not getattr(self.process.outputs, "new_data", False):
-                    continue
-                task.outputs[0].value = getattr(
-                    self.process.outputs.new_data, task.name, None
-                )
+        for name in self.tasks.keys():
+            self.tasks.apply(name, self._set_new_data_loader, key="new_data")
             # for normal tasks, we try to read the results from the extras of the task
             # this is disabled for now
             # if task.node_type.upper() == "NORMAL":
@@ -290,7 +561,27 @@ class WorkGraph(node_graph.NodeGraph):
             #         except Exception:
             #             pass
             #         node.outputs[key].value = value
-        self._widget.states = {task.name: node.state for node in self.tasks}
+        if self._workgraph_widget is not None:
+            self._update_widget_states()
+
+    def _set_new_data_loader(self, task: Any) -> None:
+        if task.node_type.upper() == "DATA":
+            task.outputs[0]._value_loader = functools.partial(
+                self._read_new_data, task.name
+            )
+
+    def _read_new_data(self, name: str) -> Any:
+        """Read the value of a data task from the process outputs."""
+        if not getattr(self.process.outputs, "new_data", False):
+            return self.tasks[name].outputs[0].property.value
+        return getattr(self.process.outputs.new_data, name, None)
+
+    def _is_speculative_winner(self, name: str, pk: int, extras: Dict) -> bool:
+        """Check if the process won the speculative execution of the task."""
+        from aiida.orm.utils.serialize import deserialize_unsafe
+
+        speculative = deserialize_unsafe(extras[f"_task_speculative_{name}"])
+        return speculative["winner"] == pk
 
     @property
     def pk(self) -> Optional[int]:
@@ -309,6 +600,9 @@ class WorkGraph(node_graph.NodeGraph):
             "workgraph_type",
             "conditions",
             "max_number_jobs",
+            "partition_threshold",
+            "computers",
+            "speculative_factor",
         ]:
             if key in wgdata:
                 setattr(wg, key, wgdata[key])
@@ -336,25 +630,91 @@ class WorkGraph(node_graph.NodeGraph):
         return nt
 
     @classmethod
-    def load(cls, pk: int) -> Optional["WorkGraph"]:
+    def load(cls, pk: int, lazy: bool = False) -> Optional["WorkGraph"]:
         """
         Load WorkGraph from the process node with the given primary key.
 
         Args:
             pk (int): The primary key of the process node.
+            lazy (bool): Only load the header of the workgraph, and build each task from its stored
+                data on first access. The names and the states of the tasks are served from the header,
+                and the links from `lazy_links`. `links` only holds the links between the built tasks.
+                Defaults to False.
         """
         from aiida_workgraph.utils import get_workgraph_data
+        from aiida_workgraph.utils.storage import (
+            load_workgraph_header,
+            load_workgraph_data,
+        )
 
         process = aiida.orm.load_node(pk)
-        wgdata = get_workgraph_data(process)
-        if wgdata is None:
-            print("No workgraph data found in the process node.")
-            return
-        wg = cls.from_dict(wgdata)
-        wg.process = process
+        header = load_workgraph_header(process) if lazy else None
+        if header is not None:
+            wgdata = load_workgraph_data(process, header_only=True)
+            links = wgdata.pop("links", [])
+            ctrl_links = wgdata.pop("ctrl_links", [])
+            wg = cls.from_dict(wgdata)
+            wg.process = process
+            wg._set_lazy_tasks(header, links, ctrl_links)
+        else:
+            wgdata = get_workgraph_data(process)
+            if wgdata is None:
+                print("No workgraph data found in the process node.")
+                return
+            wg = cls.from_dict(wgdata)
+            wg.process = process
         wg.update()
         return wg
 
+    def _set_lazy_tasks(
+        self, header: Dict[str, Any], links: List[Dict], ctrl_links: List[Dict]
+    ) -> None:
+        """Replace the tasks by a collection of tasks built from the stored data on first access."""
+        from aiida_workgraph.collection import LazyTaskCollection
+
+        self.lazy_links = links
+        self.lazy_ctrl_links = ctrl_links
+        self._lazy_header = header
+        self.nodes = LazyTaskCollection(
+            self,
+            pool=self.node_pool,
+            names=list(header["tasks"].keys()),
+            loader=self._load_task,
+        )
+        self.nodes.post_deletion_hooks = [task_deletion_hook]
+        self.nodes.post_creation_hooks = [task_creation_hook]
+
+    def _load_task(self, name: str) -> None:
+        """Build a task from its stored data, with its links to the tasks built already."""
+        import cloudpickle as pickle
+        from aiida_workgraph.utils.storage import load_task_data
+
+        tdata = load_task_data(self.process, [name], self._lazy_header)[name]
+        if tdata.get("executor", {}).get("is_pickle", False):
+            task_class = pickle.loads(tdata["node_class"])
+        else:
+            task_class = self.node_pool[tdata["metadata"]["identifier"]]
+        task = self.tasks.new(task_class, name=name, uuid=tdata.pop("uuid", None))
+        task.update_from_dict(tdata)
+        for link_list, collection, outputs, inputs in [
+            (self.lazy_links, self.links, "outputs", "inputs"),
+            (self.lazy_ctrl_links, self.ctrl_links, "ctrl_outputs", "ctrl_inputs"),
+        ]:
+            for link in link_list:
+                if name not in (link["from_node"], link["to_node"]):
+                    continue
+                if not (
+                    self.tasks.is_loaded(link["from_node"])
+                    and self.tasks.is_loaded(link["to_node"])
+                ):
+                    continue
+                collection.new(
+                    getattr(self.tasks[link["from_node"]], outputs)[
+                        link["from_socket"]
+                    ],
+                    getattr(self.tasks[link["to_node"]], inputs)[link["to_socket"]],
+                )
+
     def show(self) -> None:
         """
         Print the current state of the workgraph process.
@@ -363,8 +723,9 @@ class WorkGraph(node_graph.NodeGraph):
 
         table = []
         self.update()
-        for task in self.tasks:
-            table.append([task.name, task.pk, task.state])
+        for name in self.tasks.keys():
+            summary = self.tasks.summary(name)
+            table.append([name, summary["pk"], summary["state"]])
         print("-" * 80)
         print("WorkGraph: {}, PK: {}, State: {}".format(self.name, self.pk, self.state))
         print("-" * 80)
@@ -456,6 +817,46 @@ class WorkGraph(node_graph.NodeGraph):
         for link in wg.links:
             self.links.append(link)
 
+    def add_sweep(
+        self,
+        template: "WorkGraph",
+        parameters: Union[Dict[str, Any], List[Dict[str, Any]]],
+        name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Task:
+        """Add a task, which runs the template workgraph once for each row of the parameters.
+
+        Only the template and the parameter table are stored. Each instance of the
+        template runs as a child WorkGraph process, which the engine builds only when
+        it is launched, with at most `max_number_jobs` instances running at a time.
+
+        Args:
+            template (WorkGraph): the workgraph to run for each row of the parameters.
+            parameters: the columns of the parameter table keyed by `task.input`,
+                e.g. `{"add1.x": [1, 2, 3]}`, or a list of rows, e.g. `[{"add1.x": 1}, ...]`.
+                The columns can be numpy arrays.
+            name (str, optional): the name of the task.
+            kwargs: the inputs shared by all the instances, e.g. `{"add1.y": 2}`.
+
+        Returns:
+            Task: the sweep task. Its outputs hold the results of all the instances,
+            keyed by the name of the instance, e.g. `sweep__0`.
+        """
+        from aiida_workgraph.decorator import build_sweep_task
+        from aiida_workgraph.utils import get_parameter_table
+
+        table = get_parameter_table(parameters)
+        for column in table:
+            task_name, _, socket_name = column.partition(".")
+            if task_name not in template.tasks.keys() or (
+                socket_name not in template.tasks[task_name].inputs.keys()
+            ):
+                raise ValueError(
+                    f"Parameter {column} is not an input of the template {template.name}."
+                )
+        identifier = build_sweep_task(template)
+        return self.tasks.new(identifier, name, _parameters=table, **kwargs)
+
     def attach_error_handler(self, handler, name, tasks: dict = None) -> None:
         """Attach an error handler to the workgraph."""
         self.error_handlers[name] = {"handler": handler, "tasks": tasks}
@@ -0,0 +1,45 @@
+"""Benchmark the construction of a large workgraph.
+
+Build a chain of `AiiDAAdd` tasks, linked one to the next, and delete a task in
+the middle of the chain.
+
+Usage:
+    python benchmarks/build_workgraph.py --tasks 50000
+"""
+import argparse
+import time
+from aiida import load_profile
+from aiida_workgraph import WorkGraph
+
+
+def build(wg: WorkGraph, number_of_tasks: int) -> None:
+    previous = None
+    for i in range(number_of_tasks):
+        task = wg.tasks.new("AiiDAAdd", f"add{i}")
+        if previous is not None:
+            wg.links.new(previous.outputs["sum"], task.inputs["x"])
+        previous = task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--no-batch", action="store_true", help="Do not use wg.batch()")
+    args = parser.parse_args()
+    load_profile()
+
+    wg = WorkGraph("benchmark")
+    start = time.time()
+    if args.no_batch:
+        build(wg, args.tasks)
+    else:
+        with wg.batch():
+            build(wg, args.tasks)
+    print(f"Build {args.tasks} tasks: {time.time() - start:.2f} s")
+    start = time.time()
+    wg.tasks.delete(f"add{args.tasks // 2}")
+    print(f"Delete one task: {(time.time() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark the compression of the payloads of `GeneralData` nodes.
+
+Store a trajectory-like list of arrays and a dict-heavy result with each of the
+installed compression methods, and read them back, reporting the size of the
+payload in the repository and the time to store and to read the node.
+
+Usage:
+    python benchmarks/compression.py --frames 2000
+"""
+import argparse
+import time
+import numpy as np
+from aiida import load_profile, orm
+from aiida_workgraph.orm import compression, general_data
+from aiida_workgraph.orm.general_data import GeneralData
+
+
+def build_payloads(frames: int) -> dict:
+    rng = np.random.default_rng(0)
+    positions = rng.random((64, 3))
+    trajectory = [
+        {"positions": np.round(positions + 0.01 * i, 3), "step": i}
+        for i in range(frames)
+    ]
+    results = {
+        f"task{i}": {"energy": -1.0 * i, "converged": True, "unit": "eV"}
+        for i in range(frames * 10)
+    }
+    return {"trajectory": trajectory, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+    load_profile()
+
+    methods = [None] + [
+        method
+        for method in ("zlib", "lz4", "zstd")
+        if compression._is_available(method)
+    ]
+    compression.COMPRESSION_THRESHOLD = 0
+    for name, value in build_payloads(args.frames).items():
+        for method in methods:
+            compression.COMPRESSION = method
+            start = time.time()
+            node = GeneralData(value).store()
+            store_time = time.time() - start
+            size = len(node.base.repository.get_object_content("value.pkl", mode="rb"))
+            general_data._VALUE_CACHE.clear()
+            start = time.time()
+            orm.load_node(node.pk).value
+            read_time = time.time() - start
+            print(
+                f"{name:>10} {str(method):>5}: {size / 1e6:8.2f} MB, "
+                f"store {store_time:.3f} s, read {read_time:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,20 @@ def test_calcjob():
     assert add1.name == "add1"
 
 
+def test_build_task_cache():
+    """The task of an AiiDA component is built once."""
+    from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+    from aiida_workgraph.decorator import build_task_from_AiiDA
+
+    assert build_task(ArithmeticAddCalculation) is build_task(ArithmeticAddCalculation)
+    tdata = {"executor": ArithmeticAddCalculation, "task_type": "CALCJOB"}
+    _, tdata1 = build_task_from_AiiDA(dict(tdata))
+    # the returned tdata is a copy, which can be modified
+    tdata1["inputs"].append({"identifier": "Any", "name": "extra"})
+    _, tdata2 = build_task_from_AiiDA(dict(tdata))
+    assert "extra" not in [input["name"] for input in tdata2["inputs"]]
+
+
 def test_workchain():
     from aiida.workflows.arithmetic.multiply_add import MultiplyAddWorkChain
 
@@ -28,6 +28,26 @@ def test_args() -> None:
     assert n.outputs.keys() == ["result", "_outputs", "_wait"]
 
 
+def test_lazy_executor() -> None:
+    """The function of a task is serialized when the task is saved, only once."""
+    import cloudpickle
+    from aiida_workgraph import task
+
+    @task()
+    def add(x, y):
+        return x + y
+
+    assert "_workgraph_executor" not in add.__dict__
+    wg = WorkGraph()
+    add1 = wg.tasks.new(add, x=1, y=2)
+    add2 = wg.tasks.new(add, x=1, y=3)
+    executor = add1.to_dict()["executor"]
+    assert executor["function_name"] == "add"
+    assert add2.get_executor() is add.__dict__["_workgraph_executor"]
+    # the attributes added by the decorator are not pickled
+    assert "task" not in cloudpickle.loads(executor["executor"]).__dict__
+
+
 def test_inputs_outputs_workchain() -> None:
     from aiida_quantumespresso.workflows.pdos import PdosWorkChain
 
@@ -52,3 +52,147 @@ def test_max_number_jobs() -> None:
     wg.max_number_jobs = 3
     wg.submit(wait=True, timeout=100)
     wg.tasks["add1"].ctime < wg.tasks["add8"].ctime
+
+
+def test_speculative_execution(monkeypatch, tmp_path) -> None:
+    """A duplicate of a straggler is launched, and the first copy to finish wins."""
+    import asyncio
+    from aiida.manage import get_manager
+    from aiida.orm.utils.serialize import deserialize_unsafe
+    from aiida_workgraph import task
+    from aiida_workgraph.engine import workgraph as engine
+
+    monkeypatch.setattr(engine, "SPECULATIVE_CHECK_INTERVAL", 1)
+
+    @task()
+    def add(x, y, started, done):
+        import os
+        import time
+
+        # the first run of a task only finishes after the second one
+        if not os.path.exists(started):
+            open(started, "w").close()
+            while not os.path.exists(done):
+                time.sleep(0.5)
+            time.sleep(10)
+        else:
+            open(done, "w").close()
+        return x + y
+
+    (tmp_path / "fast").touch()
+    wg = WorkGraph("test_speculative_execution")
+    wg.speculative_factor = 1.5
+    for name, x in [("fast", 1), ("slow", 2)]:
+        wg.tasks.new(
+            add,
+            name=name,
+            x=x,
+            y=1,
+            started=str(tmp_path / name),
+            done=str(tmp_path / f"{name}_done"),
+            run_remotely=True,
+            computer="localhost",
+        )
+    wg.run()
+    assert wg.tasks["slow"].outputs["result"].value.value == 3
+    duplicate = wg.process.base.links.get_outgoing(
+        link_label_filter="slow_speculative"
+    ).one()
+    info = deserialize_unsafe(wg.process.base.extras.get("_task_speculative_slow"))
+    assert info["winner"] == duplicate.node.pk
+    assert wg.tasks["slow"].node.pk == duplicate.node.pk
+    # without a broker the loser is not killed, let it finish
+    loser = aiida.orm.load_node(info["loser"])
+    runner = get_manager().get_runner()
+    while not loser.is_terminated:
+        runner.loop.run_until_complete(asyncio.sleep(0.5))
+
+
+def test_data_task_inputs(monkeypatch) -> None:
+    """The inputs of a DATA task are only read when its node is created."""
+    from aiida_workgraph.engine.workgraph import WorkGraphEngine
+
+    calls = []
+    get_inputs = WorkGraphEngine.get_inputs
+
+    def spy(self, task):
+        calls.append(task["name"])
+        return get_inputs(self, task)
+
+    monkeypatch.setattr(WorkGraphEngine, "get_inputs", spy)
+    wg = WorkGraph("test_data_task_inputs")
+    float1 = wg.tasks.new("AiiDAFloat", "float1", value=3.0)
+    add1 = wg.tasks.new("AiiDAAdd", "add1", y=2)
+    wg.links.new(float1.outputs[0], add1.inputs["x"])
+    wg.run()
+    assert wg.tasks["add1"].outputs["sum"].value == 5.0
+    assert calls == ["float1", "add1"]
+
+
+def test_data_tasks() -> None:
+    """The nodes of the ready DATA tasks are created together, and passed on."""
+    wg = WorkGraph("test_data_tasks")
+    float1 = wg.tasks.new("AiiDAFloat", "float1", value=3.0)
+    float2 = wg.tasks.new("AiiDAFloat", "float2", value=4.0)
+    add1 = wg.tasks.new("AiiDAAdd", "add1")
+    wg.links.new(float1.outputs[0], add1.inputs["x"])
+    wg.links.new(float2.outputs[0], add1.inputs["y"])
+    wg.run()
+    assert wg.tasks["float1"].state == "FINISHED"
+    assert wg.tasks["float2"].node.value == 4.0
+    assert wg.tasks["add1"].outputs["sum"].value == 7.0
+
+
+def test_calcfunction_timeout() -> None:
+    """A calcfunction is interrupted when it runs longer than its timeout."""
+    from aiida_workgraph import task
+    from aiida_workgraph.utils import get_processes_latest
+
+    @task.calcfunction()
+    def count(n):
+        for _ in range(n.value):
+            time.sleep(0.1)
+        return n
+
+    wg = WorkGraph(name="test_calcfunction_timeout")
+    count1 = wg.tasks.new(count, name="count1", n=100)
+    count1.timeout = 0.5
+    start = time.time()
+    wg.run()
+    assert time.time() - start < 10
+    assert wg.process.exit_status == 304
+    assert get_processes_latest(wg.pk)["count1"]["state"] == "TIMED_OUT"
+    assert wg.tasks["count1"].node.is_excepted
+
+
+def test_timeout_retry() -> None:
+    """The callback of a timed out process does not change the task run again."""
+    from aiida_workgraph import task
+
+    @task()
+    def sleep(t):
+        import time
+
+        time.sleep(t)
+        return t
+
+    def handle_timeout(self, task_name: str, **kwargs):
+        # the timed out process finishes while the task runs again
+        task = self.get_task(task_name)
+        task.set({"t": 4})
+        self.update_task(task)
+        self.ctx.tasks[task_name]["timeout"] = None
+
+    wg = WorkGraph(name="test_timeout_retry")
+    sleep1 = wg.tasks.new(
+        sleep, name="sleep1", t=6, run_remotely=True, computer="localhost"
+    )
+    sleep1.timeout = 3
+    wg.attach_error_handler(
+        handle_timeout,
+        name="handle_timeout",
+        tasks={"sleep1": {"exit_codes": [304], "max_retries": 1, "kwargs": {}}},
+    )
+    wg.run()
+    assert wg.process.is_finished_ok
+    assert wg.tasks["sleep1"].outputs["result"].value.value == 4
@@ -0,0 +1,32 @@
+from aiida_workgraph.utils.ir import get_ir
+from aiida import load_profile
+
+load_profile()
+
+
+def test_ir_connectivity(wg_calcjob):
+    """The compiled graph gives the same connectivity as node_graph."""
+    from node_graph.analysis import ConnectivityAnalysis
+
+    wgdata = wg_calcjob.to_dict()
+    ir = get_ir(wgdata)
+    assert get_ir(wgdata) is ir
+    connectivity = ir.build_connectivity()
+    wgdata["nodes"] = wgdata["tasks"]
+    expected = ConnectivityAnalysis(wgdata).build_connectivity()
+    for name in wgdata["tasks"]:
+        assert set(connectivity["child_node"][name]) == set(
+            expected["child_node"][name]
+        )
+    assert connectivity["input_node"] == expected["input_node"]
+    assert set(ir.parent_names("add2")) == {"code1", "add1"}
+
+
+def test_ir_bind_links(wg_calcjob):
+    """Links are attached to the input and output sockets."""
+    wgdata = wg_calcjob.to_dict()
+    get_ir(wgdata).bind_links(wgdata)
+    inputs = {input["name"]: input for input in wgdata["tasks"]["add2"]["inputs"]}
+    assert [link["from_node"] for link in inputs["y"]["links"]] == ["add1"]
+    outputs = wgdata["tasks"]["code1"]["outputs"]
+    assert len(outputs[0]["links"]) == 3
@@ -27,3 +27,51 @@ def test_normal_function_submit(
     wg.links.new(add1.outputs["result"], add2.inputs["y"])
     wg.submit(wait=True)
     assert wg.tasks["add2"].node.outputs.result == 11
+
+
+def test_normal_function_timeout():
+    """The task is marked as TIMED_OUT if it runs too long."""
+    from aiida_workgraph import task
+    from aiida_workgraph.utils import get_processes_latest
+    import time
+
+    @task()
+    def sleep(t):
+        time.sleep(t)
+        return t
+
+    wg = WorkGraph(name="test_normal_function_timeout")
+    sleep1 = wg.tasks.new(sleep, name="sleep1", t=2)
+    sleep1.timeout = 0.5
+    sleep2 = wg.tasks.new(sleep, name="sleep2")
+    wg.links.new(sleep1.outputs["result"], sleep2.inputs["t"])
+    wg.run()
+    assert wg.process.exit_status == 304
+    states = get_processes_latest(wg.pk)
+    assert states["sleep1"]["state"] == "TIMED_OUT"
+    assert states["sleep2"]["state"] == "SKIPPED"
+
+
+def test_normal_function_timeout_interrupt():
+    """The thread of a timed out task is interrupted."""
+    from aiida_workgraph import task
+    import threading
+    import time
+
+    steps = []
+
+    @task()
+    def count(n):
+        for i in range(n):
+            steps.append(i)
+            time.sleep(0.1)
+        return n
+
+    wg = WorkGraph(name="test_normal_function_timeout_interrupt")
+    count1 = wg.tasks.new(count, name="count1", n=100)
+    count1.timeout = 0.5
+    threads = threading.active_count()
+    wg.run()
+    time.sleep(0.5)
+    assert threading.active_count() == threads
+    assert len(steps) < 20
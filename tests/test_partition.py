@@ -0,0 +1,69 @@
+from aiida_workgraph import WorkGraph
+from aiida_workgraph.utils.analysis import partition_workgraph
+from aiida import load_profile
+
+load_profile()
+
+
+def test_partition_workgraph(decorated_add):
+    """Independent branches are split into partitions."""
+    wg = WorkGraph(name="test_partition")
+    for i in range(3):
+        add1 = wg.tasks.new(decorated_add, f"add{i}_1", x=1, y=2)
+        add2 = wg.tasks.new(decorated_add, f"add{i}_2", y=3)
+        wg.links.new(add1.outputs["result"], add2.inputs["x"])
+    add3 = wg.tasks.new(decorated_add, "add3_1", x=1, y=2)
+    add3.wait = ["add0_2"]
+    wgdata = wg.to_dict()
+    assert partition_workgraph(wgdata, None) == []
+    assert partition_workgraph(wgdata, 10) == []
+    partitions = partition_workgraph(wgdata, 4)
+    assert len(partitions) == 2
+    assert sorted(partitions[0]) == ["add0_1", "add0_2", "add3_1"]
+    assert sorted(partitions[1]) == ["add1_1", "add1_2", "add2_1", "add2_2"]
+    # tasks that share the context are not partitioned
+    wg.tasks["add1_1"].set({"x": "{{x}}"})
+    assert partition_workgraph(wg.to_dict(), 4) == []
+
+
+def test_partition_below_fan_out(decorated_add):
+    """The subtrees below a fan-out task are split into partitions."""
+    wg = WorkGraph(name="test_partition_below_fan_out")
+    add0 = wg.tasks.new(decorated_add, "add0", x=1, y=2, t=0)
+    for i in range(3):
+        add1 = wg.tasks.new(decorated_add, f"add1_{i}", x=add0.outputs["result"], y=i)
+        add2 = wg.tasks.new(decorated_add, f"add2_{i}", y=1, t=0)
+        wg.links.new(add1.outputs["result"], add2.inputs["x"])
+    partitions = partition_workgraph(wg.to_dict(), 3)
+    assert partitions == [
+        ["add0"],
+        ["add1_0", "add2_0"],
+        ["add1_1", "add2_1"],
+        ["add1_2", "add2_2"],
+    ]
+
+
+def test_run_partitions(decorated_add):
+    """The partitions run as child processes, which share the job limit."""
+    wg = WorkGraph(name="test_run_partitions")
+    wg.partition_threshold = 3
+    wg.max_number_jobs = 2
+    add0 = wg.tasks.new(decorated_add, "add0", x=1, y=2, t=0)
+    for i in range(3):
+        add1 = wg.tasks.new(
+            decorated_add, f"add1_{i}", x=add0.outputs["result"], y=i, t=0
+        )
+        add2 = wg.tasks.new(decorated_add, f"add2_{i}", y=1, t=0)
+        wg.links.new(add1.outputs["result"], add2.inputs["x"])
+    wg.run()
+    assert wg.process.is_finished_ok
+    for i in range(3):
+        assert wg.tasks[f"add2_{i}"].outputs["result"].value == 4 + i
+    children = {
+        link.link_label: link.node
+        for link in wg.process.base.links.get_outgoing(link_label_filter="partition_%")
+    }
+    assert sorted(children) == [f"partition_{i}" for i in range(4)]
+    for child in children.values():
+        assert child.is_finished_ok
+        assert WorkGraph.load(child.pk).max_number_jobs == 1
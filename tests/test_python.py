@@ -257,3 +257,17 @@ def test_PythonJob_copy_files():
         wait=True,
     )
     assert wg.tasks["multiply"].outputs["result"].value.value == 25
+
+
+def test_PythonJob_placement():
+    """Test the placement of a task close to its remote data."""
+    from aiida_workgraph.engine.utils import find_placement
+
+    remote_folder = aiida.orm.RemoteData(
+        computer=aiida.orm.load_computer("localhost"), remote_path="/tmp"
+    )
+    kwargs = {"x": 1, "copy_files": {"copy_1": remote_folder}}
+    assert find_placement(kwargs) == ("localhost", "remote_data")
+    assert find_placement(kwargs, ["localhost"]) == ("localhost", "remote_data")
+    assert find_placement(kwargs, ["other"]) == ("other", "computers")
+    assert find_placement({"x": 1}) == (None, "default")
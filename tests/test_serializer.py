@@ -12,3 +12,166 @@ def test_python_job():
     assert isinstance(new_inputs["a"], aiida.orm.Int)
     assert isinstance(new_inputs["b"], aiida.orm.Float)
     assert isinstance(new_inputs["c"], GeneralData)
+
+
+def test_general_data_cache(monkeypatch):
+    """The value of a stored node is read once, large values are memory-mapped."""
+    import gc
+    from aiida_workgraph.orm import general_data
+    from aiida_workgraph.orm.general_data import GeneralData
+
+    node = GeneralData({"a": [1, 2, 3]})
+    assert node.value == {"a": [1, 2, 3]}
+    node.store()
+    # the value is cached on the node, a value changed in place does not change
+    # the value of the node loaded again
+    loaded = aiida.orm.load_node(node.pk)
+    value = loaded.value
+    assert loaded.value is value
+    value["a"].append(4)
+    assert aiida.orm.load_node(node.pk).value == {"a": [1, 2, 3]}
+    # the cached values are bounded, and released with their nodes
+    monkeypatch.setattr(general_data, "_VALUE_CACHE_SIZE", 1)
+    assert node.value is node.value
+    assert loaded._cached_value is None
+    del node
+    gc.collect()
+    assert len(general_data._VALUE_CACHE) == 0
+    monkeypatch.setattr(general_data, "MMAP_THRESHOLD", 0)
+    node = aiida.orm.load_node(loaded.pk)
+    assert general_data._load_mapped_object(node, "value.pkl")[0] == node.value
+
+
+def test_numpy_array_data():
+    """Numpy arrays are stored as `.npy` files and memory-mapped on read."""
+    import numpy as np
+    from aiida_workgraph.orm import serialize_to_aiida_nodes
+    from aiida_workgraph.orm.array import NumpyArrayData
+
+    array = np.arange(12.0).reshape(3, 4)
+    inputs = {"a": array, "b": {"x": array, "y": array.T}, "c": [array, array]}
+    outputs = serialize_to_aiida_nodes(inputs)
+    for key, value in inputs.items():
+        assert isinstance(outputs[key], NumpyArrayData)
+        assert outputs[key].is_stored
+    node = aiida.orm.load_node(outputs["a"].pk)
+    assert isinstance(node.value, np.memmap)
+    assert np.array_equal(node.value, array)
+    # the arrays are mapped copy-on-write, and not shared between the calls
+    value = node.value
+    value[0, 0] = 100.0
+    assert node.value[0, 0] == 0.0
+    assert aiida.orm.load_node(outputs["a"].pk).value[0, 0] == 0.0
+    value = aiida.orm.load_node(outputs["b"].pk).value
+    assert np.array_equal(value["y"], array.T)
+    assert len(aiida.orm.load_node(outputs["c"].pk).value) == 2
+
+
+def test_deduplicate(monkeypatch):
+    """The stored nodes with the same content are reused when it is enabled."""
+    import warnings
+    from sqlalchemy.exc import SAWarning
+    from aiida_workgraph.orm import serializer
+
+    value = {"x": list(range(10)), "y": "configuration"}
+    node1 = serializer.general_serializer(value, deduplicate=True)
+    node2 = serializer.general_serializer(dict(value), deduplicate=True)
+    assert node2.pk == node1.pk
+    assert serializer.general_serializer(value).pk != node1.pk
+    monkeypatch.setattr(serializer, "DEDUPLICATE", True)
+    assert serializer.serialize_to_aiida_nodes({"a": value})["a"].pk == node1.pk
+    # the same content of a different type is not reused
+    assert serializer.general_serializer([value]).pk != node1.pk
+    # the node is found by its label, without flushing the unstored node
+    node = type(node1)(value)
+    assert node1.label == serializer.get_content_label(node)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", SAWarning)
+        assert serializer.find_same_node(node).pk == node1.pk
+
+
+def test_compression(monkeypatch):
+    """The large payloads are compressed, and read transparently."""
+    import os
+    from aiida_workgraph.orm import compression, general_data
+    from aiida_workgraph.orm.general_data import GeneralData
+
+    value = {"energies": [1.0] * 1000}
+    assert GeneralData(value).base.attributes.get("compression") is None
+    # zlib is not used by default, when zstandard and lz4 are not installed
+    monkeypatch.setattr(compression, "_is_available", lambda method: False)
+    assert compression.choose_method(1 << 30) is None
+    monkeypatch.undo()
+    monkeypatch.setattr(compression, "COMPRESSION_THRESHOLD", 0)
+    monkeypatch.setattr(compression, "COMPRESSION", "zlib")
+    node = GeneralData(value)
+    assert node.base.attributes.get("compression") == "zlib"
+    assert node.value == value
+    # the payloads which do not compress well are stored as they are
+    assert GeneralData(os.urandom(1000)).base.attributes.get("compression") is None
+    node.store()
+    # the compressed objects are not memory-mapped
+    monkeypatch.setattr(general_data, "MMAP_THRESHOLD", 0)
+    assert general_data._load_mapped_object(node, "value.pkl") is None
+    assert aiida.orm.load_node(node.pk).value == value
+
+
+def test_atoms_data():
+    """The atoms are stored in columns, which can be queried and read one by one."""
+    import numpy as np
+    from ase.build import bulk
+    from aiida_workgraph.orm.atoms import AtomsData
+
+    atoms = bulk("NaCl", "rocksalt", a=5.64) * (2, 2, 2)
+    atoms.set_initial_magnetic_moments([1.0] * len(atoms))
+    atoms.info["label"] = "salt"
+    node = AtomsData(atoms).store()
+    assert node.base.attributes.get("natoms") == 16
+    assert node.base.attributes.get("elements") == ["Cl", "Na"]
+    builder = aiida.orm.QueryBuilder()
+    builder.append(
+        AtomsData,
+        filters={"id": node.pk, "attributes.natoms": {">": 10}},
+        project="id",
+    )
+    assert builder.all(flat=True) == [node.pk]
+    node = aiida.orm.load_node(node.pk)
+    assert np.array_equal(node.numbers, atoms.numbers)
+    node.numbers[0] = 0
+    assert np.array_equal(node.numbers, atoms.numbers)
+    assert node._cached_atoms is None
+    new_atoms = node.value
+    assert new_atoms == atoms
+    assert np.allclose(new_atoms.get_initial_magnetic_moments(), 1.0)
+    assert new_atoms.info["label"] == "salt"
+
+
+def test_batch_store():
+    """The nodes are stored in one transaction, which is rolled back on errors."""
+    import pytest
+    from aiida_workgraph.orm.serializer import batch_store, serialize_to_aiida_nodes
+
+    nodes = serialize_to_aiida_nodes({f"x{i}": (i,) for i in range(10)})
+    assert aiida.orm.load_node(nodes["x9"].pk).value == (9,)
+    with pytest.raises(RuntimeError):
+        with batch_store():
+            node = aiida.orm.Int(1).store()
+            raise RuntimeError()
+    builder = aiida.orm.QueryBuilder().append(
+        aiida.orm.Int, filters={"uuid": node.uuid}
+    )
+    assert builder.count() == 0
+
+
+def test_store_node_caching():
+    """Storing a node does not change the configuration of the caching."""
+    import pytest
+    from aiida.manage.caching import enable_caching, get_use_cache
+    from aiida_workgraph.orm.serializer import store_node
+
+    identifier = "aiida.calculations:core.arithmetic.add"
+    with enable_caching(identifier=identifier):
+        store_node(aiida.orm.Int(1))
+        with pytest.raises(Exception):
+            store_node(aiida.orm.Dict({"a": object()}))
+        assert get_use_cache(identifier=identifier)
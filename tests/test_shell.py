@@ -124,3 +124,21 @@ def test_shell_workflow():
     # wg.submit(wait=True, timeout=200)
     wg.run()
     assert job4.outputs["result"].value.value == 20
+
+
+def test_shell_code_placement():
+    """The computer of the placement is only set for a command string, not for a code."""
+    from aiida_workgraph.engine.utils import (
+        get_shell_job_computer,
+        set_shell_job_computer,
+    )
+
+    cat_code = prepare_code("cat")
+    kwargs = {"command": cat_code, "metadata": {"options": {}}}
+    assert get_shell_job_computer(kwargs) == cat_code.computer.label
+    set_shell_job_computer(kwargs, cat_code.computer.label)
+    assert "computer" not in kwargs["metadata"]["options"]
+    kwargs = {"command": "cat"}
+    assert get_shell_job_computer(kwargs) is None
+    set_shell_job_computer(kwargs, "localhost")
+    assert kwargs["metadata"]["options"]["computer"].label == "localhost"
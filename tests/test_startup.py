@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+
+def run_python(code: str) -> None:
+    """Run the code in a new interpreter."""
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+
+
+def test_import_modules() -> None:
+    """Importing the package does not load the widget or the engine of AiiDA."""
+    run_python(
+        "import sys\n"
+        "import aiida_workgraph\n"
+        "assert 'aiida_workgraph.workgraph' not in sys.modules\n"
+        "from aiida_workgraph import WorkGraph, Task, task, build_task\n"
+        "assert 'anywidget' not in sys.modules\n"
+        "assert 'aiida.engine' not in sys.modules\n"
+        "import aiida_workgraph.task\n"
+        "from aiida_workgraph.decorator import task as decorator\n"
+        "assert aiida_workgraph.task is decorator\n"
+    )
+
+
+def test_cli_modules() -> None:
+    """The command line interface only imports a sub command when it is used.
+
+    The help lists the sub commands with their short help, so it imports them,
+    but not the workgraph or the engine of AiiDA.
+    """
+    run_python(
+        "import sys\n"
+        "import time\n"
+        "start = time.time()\n"
+        "from aiida_workgraph.cli.cmd_workgraph import workgraph\n"
+        "assert 'aiida_workgraph.workgraph' not in sys.modules\n"
+        "assert 'aiida_workgraph.cli.cmd_graph' not in sys.modules\n"
+        "workgraph(['--help'], standalone_mode=False)\n"
+        "assert 'aiida_workgraph.cli.cmd_graph' in sys.modules\n"
+        "assert 'aiida_workgraph.workgraph' not in sys.modules\n"
+        "assert 'aiida.engine' not in sys.modules\n"
+        "assert time.time() - start < 10\n"
+    )
@@ -0,0 +1,132 @@
+from aiida_workgraph.utils.storage import (
+    save_workgraph_data,
+    load_workgraph_data,
+    HEADER_KEY,
+    LEGACY_KEY,
+)
+from aiida import orm, load_profile
+
+load_profile()
+
+
+def test_storage_round_trip(wg_calcjob):
+    """Save the workgraph in chunks and load all, some or none of the tasks."""
+    wgdata = wg_calcjob.to_dict()
+    node = orm.WorkflowNode().store()
+    header = save_workgraph_data(node, wgdata)
+    assert node.base.extras.get(HEADER_KEY) == header
+    assert set(header["tasks"]) == set(wgdata["tasks"])
+    data = load_workgraph_data(node)
+    assert data["links"] == wgdata["links"]
+    assert data["tasks"]["add1"]["properties"]["x"]["value"].value == 2
+    data = load_workgraph_data(node, tasks=["add2"])
+    assert list(data["tasks"]) == ["add2"]
+    data = load_workgraph_data(node, header_only=True)
+    assert data["tasks"] == {}
+    assert data["name"] == wgdata["name"]
+
+
+def test_storage_legacy(wg_calcjob):
+    """The workgraph stored in a single extra can still be loaded."""
+    from aiida.orm.utils.serialize import serialize
+
+    wgdata = wg_calcjob.to_dict()
+    node = orm.WorkflowNode().store()
+    node.base.extras.set(LEGACY_KEY, serialize(wgdata))
+    data = load_workgraph_data(node, tasks=["add1"])
+    assert list(data["tasks"]) == ["add1"]
+    save_workgraph_data(node, wgdata)
+    assert LEGACY_KEY not in node.base.extras.keys()
+
+
+def test_storage_executor_registry():
+    """Tasks of the same function share one stored executor."""
+    from aiida_workgraph import WorkGraph, task
+    from aiida_workgraph.utils import get_executor
+
+    @task()
+    def add(x, y):
+        return x + y
+
+    wg = WorkGraph("test_executor_registry")
+    for i in range(3):
+        wg.tasks.new(add, f"add{i}", x=i, y=1)
+    node = orm.WorkflowNode().store()
+    header = save_workgraph_data(node, wg.to_dict())
+    assert len(header["executors"]) == 1
+    data = load_workgraph_data(node)
+    executor = data["tasks"]["add0"]["executor"]
+    assert executor is data["tasks"]["add2"]["executor"]
+    assert get_executor(executor)[0] is get_executor(executor)[0]
+
+
+def test_storage_check_diff(wg_calcjob):
+    """The difference is found from the task hashes in the header."""
+    from aiida_workgraph.utils.analysis import WorkGraphSaver
+
+    node = orm.WorkflowNode().store()
+    save_workgraph_data(node, wg_calcjob.to_dict())
+    saver = WorkGraphSaver(node, wg_calcjob.to_dict())
+    assert saver.check_diff() == (set(), set(), set())
+    wg_calcjob.tasks["add2"].set({"x": orm.Int(5).store()})
+    wg_calcjob.tasks["add3"].position = [100, 100]
+    saver = WorkGraphSaver(node, wg_calcjob.to_dict())
+    assert saver.check_diff() == (set(), {"add2"}, {"add3"})
+
+
+def test_storage_folder_reused():
+    """Saving an unchanged workgraph reuses the folder, the previous folders are kept."""
+    from aiida_workgraph import WorkGraph, task
+    from aiida_workgraph.utils.storage import load_workgraph_header
+
+    @task()
+    def add(x, y):
+        return x + y
+
+    wg = WorkGraph("test_storage_folder_reused")
+    add1 = wg.tasks.new(add, "add1", x=1, y=1)
+    wg.save()
+    header = load_workgraph_header(wg.process)
+    wg.save()
+    assert load_workgraph_header(wg.process)["folder"] == header["folder"]
+    add1.set({"x": 5})
+    wg.save()
+    new_header = load_workgraph_header(wg.process)
+    assert new_header["folder"] != header["folder"]
+    # the folders are linked to the process, so they are exported with it
+    folders = {
+        link.node.uuid
+        for link in wg.process.base.links.get_outgoing(
+            link_label_filter="workgraph_storage_%"
+        ).all()
+    }
+    assert folders == {header["folder"], new_header["folder"]}
+    data = load_workgraph_data(wg.process)
+    assert data["tasks"]["add1"]["properties"]["x"]["value"] == 5
+    assert data["tasks"]["add1"]["metadata"]["hash"]
+    assert data["created"] <= data["lastUpdate"]
+
+
+def test_storage_task_hashes():
+    """The hashes cover wait, timeout and the content of the arrays."""
+    import numpy as np
+    from aiida_workgraph import WorkGraph, task
+    from aiida_workgraph.utils.storage import get_task_hashes
+
+    @task()
+    def add(x, y):
+        return x + y
+
+    array = np.zeros(3)
+    wg = WorkGraph("test_task_hashes")
+    add1 = wg.tasks.new(add, "add1", x=array, y=1)
+    add2 = wg.tasks.new(add, "add2", x=1, y=1)
+    hashes, _ = get_task_hashes(wg.to_dict())
+    assert get_task_hashes(wg.to_dict())[0] == hashes
+    array[0] = 1
+    add2.wait.append(add1)
+    new_hashes, _ = get_task_hashes(wg.to_dict())
+    assert new_hashes["add1"] != hashes["add1"]
+    assert new_hashes["add2"] != hashes["add2"]
+    add1.timeout = 10
+    assert get_task_hashes(wg.to_dict())[0]["add1"] != new_hashes["add1"]
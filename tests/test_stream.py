@@ -0,0 +1,73 @@
+from aiida_workgraph import WorkGraph, task
+from aiida import load_profile
+
+load_profile()
+
+
+def test_stream():
+    """A copy of the downstream task runs for each item of the stream."""
+
+    @task(outputs=[{"identifier": "Stream", "name": "result"}])
+    def generate(n):
+        for i in range(n):
+            yield i
+
+    @task.calcfunction()
+    def square(x):
+        return x**2
+
+    @task.calcfunction()
+    def total(**kwargs):
+        return sum(kwargs.values())
+
+    wg = WorkGraph("test_stream")
+    generate1 = wg.tasks.new(generate, name="generate1", n=3)
+    square1 = wg.tasks.new(square, name="square1")
+    total1 = wg.tasks.new(total, name="total1")
+    wg.links.new(generate1.outputs["result"], square1.inputs["x"])
+    wg.links.new(square1.outputs["result"], total1.inputs["kwargs"])
+    wg.run()
+    assert wg.process.exit_status == 0
+    assert wg.process.base.extras.get("_task_state_square1_stream_2", None)
+    assert wg.tasks["total1"].outputs["result"].value == 5
+
+
+def test_stream_typed_socket():
+    """A stream links to a typed socket, which receives the items of the stream."""
+
+    @task(outputs=[{"identifier": "Stream", "name": "result"}])
+    def generate(n):
+        for i in range(n):
+            yield i
+
+    @task.calcfunction(inputs=[{"identifier": "AiiDAInt", "name": "x"}])
+    def square(x):
+        return x**2
+
+    wg = WorkGraph("test_stream_typed_socket")
+    generate1 = wg.tasks.new(generate, name="generate1", n=2)
+    square1 = wg.tasks.new(square, name="square1")
+    wg.links.new(generate1.outputs["result"], square1.inputs["x"])
+    wg.run()
+    assert wg.process.exit_status == 0
+    assert wg.process.base.extras.get("_task_state_square1_stream_1", None)
+
+
+def test_stream_unsupported_producer():
+    """Only a normal task can produce a stream."""
+    import pytest
+
+    @task.calcfunction(outputs=[{"identifier": "Stream", "name": "result"}])
+    def generate(n):
+        return n
+
+    @task()
+    def square(x):
+        return x**2
+
+    wg = WorkGraph("test_stream_unsupported_producer")
+    generate1 = wg.tasks.new(generate, name="generate1", n=2)
+    square1 = wg.tasks.new(square, name="square1")
+    with pytest.raises(ValueError, match="only a normal task can produce a stream"):
+        wg.links.new(generate1.outputs["result"], square1.inputs["x"])
+    assert len(wg.links) == 0
@@ -0,0 +1,66 @@
+import aiida
+import numpy as np
+import pytest
+from typing import Callable
+
+aiida.load_profile()
+
+
+def test_sweep_instances(decorated_add: Callable) -> None:
+    """Build the instances of a sweep from the template and the parameter table."""
+    from aiida_workgraph import WorkGraph
+    from aiida_workgraph.engine.utils import prepare_for_sweep_instance
+
+    template = WorkGraph(name="template")
+    template.tasks.new(decorated_add, "add1", t=0)
+    wg = WorkGraph(name="test_sweep_instances")
+    sweep = wg.add_sweep(
+        template, {"add1.x": np.arange(3), "add1.y": [1, 2, 3]}, name="sweep1"
+    )
+    assert sweep.node_type.upper() == "SWEEP"
+    with pytest.raises(ValueError, match="not an input of the template"):
+        wg.add_sweep(template, {"add2.x": [1]})
+    with pytest.raises(ValueError, match="same length"):
+        wg.add_sweep(template, {"add1.x": [1], "add1.y": [1, 2]})
+    # a list of rows is converted to columns
+    sweep2 = wg.add_sweep(template, [{"add1.x": 1}, {"add1.x": 2}])
+    assert sweep2.inputs["_parameters"].value == {"add1.x": [1, 2]}
+    task = wg.prepare_inputs(None)["wg"]["tasks"]["sweep1"]
+    table = task["properties"]["_parameters"]["value"]
+    inputs, wgdata = prepare_for_sweep_instance(task, {"add1": {"t": 0}}, table, 2)
+    assert wgdata["name"] == "sweep1__2"
+    assert inputs["metadata"]["call_link_label"] == "sweep1__2"
+    assert wgdata["tasks"]["add1"]["properties"]["x"]["value"] == 2
+    assert type(wgdata["tasks"]["add1"]["properties"]["x"]["value"]) is int
+    assert wgdata["tasks"]["add1"]["properties"]["y"]["value"] == 3
+    # the template is not modified
+    assert (
+        task["executor"]["wgdata"]["tasks"]["add1"]["properties"]["x"]["value"] is None
+    )
+
+
+def test_sweep(decorated_add: Callable) -> None:
+    """Run a template workgraph for each row of a parameter table."""
+    from aiida_workgraph import WorkGraph
+
+    template = WorkGraph(name="template")
+    template.tasks.new(decorated_add, "add1", t=0)
+    wg = WorkGraph(name="test_sweep")
+    wg.max_number_jobs = 2
+    # a task named like an instance does not clash with it
+    wg.tasks.new(decorated_add, "sweep1_0", x=1, y=1, t=0)
+    sweep = wg.add_sweep(
+        template, {"add1.x": [1, 2, 3]}, name="sweep1", **{"add1.y": 1}
+    )
+    wg.run()
+    assert wg.process.is_finished_ok
+    assert sweep.state == "FINISHED"
+    assert wg.tasks["sweep1_0"].outputs["result"].value == 2
+    results = [
+        link
+        for link in wg.process.base.links.get_outgoing().all()
+        if link.link_label.startswith("sweep1__")
+    ]
+    assert len(results) == 3
+    values = {link.node.outputs.group_outputs.add1.result.value for link in results}
+    assert values == {2, 3, 4}
@@ -149,3 +149,150 @@ def test_pause_task_after_submit(wg_calcjob):
     wg.play_tasks(["add2"])
     wg.wait()
     assert wg.tasks["add2"].outputs["sum"].value == 9
+
+
+def test_refresh_changed_tasks(wg_calcfunction):
+    """Only the tasks whose process changed are refreshed."""
+    wg = wg_calcfunction
+    wg.run()
+    assert wg._refresh_changed_tasks() == []
+    wg._task_mtimes = {}
+    for task in wg.tasks:
+        task.state = "PLANNED"
+    assert set(wg._refresh_changed_tasks()) == {"sumdiff1", "sumdiff2", "sumdiff3"}
+    assert wg.tasks["sumdiff2"].state == "FINISHED"
+    wg.wait()
+    assert wg.state == "FINISHED"
+
+
+def test_update_lazy_outputs(wg_calcfunction):
+    """The outputs of the tasks are read from the database on first access."""
+    wg = wg_calcfunction
+    wg.run()
+    socket = wg.tasks["sumdiff3"].outputs["sum"]
+    assert socket._value_loader is not None
+    assert socket.value == 15
+    assert socket._value_loader is None
+    wg.update()
+    assert socket._value_loader is None
+    assert wg.tasks["sumdiff3"].node.pk == wg.tasks["sumdiff3"].pk
+
+
+def test_load_lazy(wg_calcfunction):
+    """The tasks are built from the stored data on first access."""
+    wg_calcfunction.run()
+    wg = WorkGraph.load(wg_calcfunction.pk, lazy=True)
+    assert len(wg.tasks) == 4
+    assert not wg.tasks.is_loaded("sumdiff3")
+    assert wg.tasks.summary("sumdiff3")["state"] == "FINISHED"
+    assert len(wg.lazy_links) == 3
+    assert wg.tasks["sumdiff3"].outputs["sum"].value == 15
+    assert wg.tasks.is_loaded("sumdiff3")
+    assert wg.tasks["sumdiff3"].state == "FINISHED"
+    assert len(wg.links) == 0
+    wg.tasks["sumdiff2"]
+    assert len(wg.links) == 1
+    assert [task.name for task in wg.tasks] == wg.tasks.keys()
+    assert len(wg.links) == 3
+
+
+def test_batch():
+    """Build a workgraph in a batch, and delete a task with its links."""
+    wg = WorkGraph("test_batch")
+    with wg.batch():
+        for i in range(5):
+            task = wg.tasks.new("AiiDAAdd", f"add{i}")
+            if i > 0:
+                wg.links.new(wg.tasks[f"add{i - 1}"].outputs["sum"], task.inputs["x"])
+        assert wg._batch_depth == 1
+        assert wg.links._task_links is None
+    assert wg._batch_depth == 0
+    assert len(wg.links.get_task_links(wg.tasks["add2"])) == 2
+    with pytest.raises(Exception, match="already exist"):
+        wg.tasks.new("AiiDAAdd", "add2")
+    deleted = []
+    wg.links.post_deletion_hooks.append(
+        lambda links, link: deleted.append((link.from_node.name, link.to_node.name))
+    )
+    wg.tasks.delete("add2")
+    assert len(wg.tasks) == 4
+    assert len(wg.links) == 2
+    assert sorted(deleted) == [("add1", "add2"), ("add2", "add3")]
+    assert len(wg.links.get_task_links(wg.tasks["add1"])) == 1
+    assert wg.tasks["add3"].inputs["x"].links == []
+
+
+def test_rename_task_links():
+    """The links of a renamed task are deleted with it."""
+    wg = WorkGraph("test_rename_task_links")
+    add1 = wg.tasks.new("AiiDAAdd", "add1")
+    add2 = wg.tasks.new("AiiDAAdd", "add2")
+    wg.links.new(add1.outputs["sum"], add2.inputs["x"])
+    add1.name = "renamed"
+    wg.tasks.delete("renamed")
+    assert len(wg.links) == 0
+    assert add2.inputs["x"].links == []
+
+
+def test_save_many():
+    """Create the processes of several workgraphs in one transaction."""
+    from aiida_workgraph.utils.storage import load_workgraph_header
+
+    graphs = []
+    for i in range(3):
+        wg = WorkGraph(f"test_save_many_{i}")
+        wg.tasks.new("AiiDAAdd", "add1", x=i, y=1)
+        graphs.append(wg)
+    processes = WorkGraph.save_many(graphs)
+    assert len({process.pk for process in processes}) == 3
+    for wg in graphs:
+        assert wg.process.process_state.value.upper() == "CREATED"
+        assert wg.state == "CREATED"
+        assert load_workgraph_header(wg.process)["tasks"].keys() == {"add1"}
+    with pytest.raises(ValueError, match="already have a process"):
+        WorkGraph.save_many(graphs)
+
+
+def test_prepare_inputs_cache(wg_calcfunction):
+    """Only the changed tasks are serialized again."""
+    wg = wg_calcfunction
+    wg.prepare_inputs(None)
+    prepared = {task.name: task._prepared[1] for task in wg.tasks}
+    wg.tasks["sumdiff2"].set({"x": 5})
+    wg.tasks["sumdiff3"].wait.append("sumdiff1")
+    wgdata = wg.prepare_inputs(None)["wg"]
+    assert wg.tasks["sumdiff1"]._prepared[1] is prepared["sumdiff1"]
+    assert wg.tasks["sumdiff2"]._prepared[1] is not prepared["sumdiff2"]
+    assert wg.tasks["sumdiff3"]._prepared[1] is not prepared["sumdiff3"]
+    assert wgdata["tasks"]["sumdiff2"]["properties"]["x"]["value"] == 5
+    assert wgdata["tasks"]["sumdiff3"]["wait"] == ["sumdiff1"]
+    # the returned data is a copy
+    wgdata["tasks"]["sumdiff1"]["state"] = "FINISHED"
+    assert wg.prepare_inputs(None)["wg"]["tasks"]["sumdiff1"]["state"] == "PLANNED"
+    # a state update does not build the data again
+    wg.tasks["sumdiff1"].state = "FINISHED"
+    wgdata = wg.prepare_inputs(None)["wg"]
+    assert wg.tasks["sumdiff1"]._prepared[1] is prepared["sumdiff1"]
+    assert wgdata["tasks"]["sumdiff1"]["state"] == "FINISHED"
+
+
+def test_prepare_inputs_cache_in_place():
+    """A property value changed in place is serialized again."""
+    import numpy as np
+    from aiida_workgraph import task
+
+    @task()
+    def add(x, y):
+        return x + y
+
+    array = np.zeros(3)
+    wg = WorkGraph("test_prepare_inputs_cache_in_place")
+    add1 = wg.tasks.new(add, "add1", x=array, y=1)
+    wg.prepare_inputs(None)
+    prepared = add1._prepared[1]
+    wg.prepare_inputs(None)
+    assert add1._prepared[1] is prepared
+    array[0] = 1
+    wgdata = wg.prepare_inputs(None)["wg"]
+    assert add1._prepared[1] is not prepared
+    assert wgdata["tasks"]["add1"]["properties"]["x"]["value"][0] == 1